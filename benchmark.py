@@ -0,0 +1,358 @@
+"""Benchmark and regression check for the generation of a whole year.
+
+Runs the same steps as novas-book.py for a fixed set of years, serially and
+without result cache, and measures the time of every stage for every day:
+
+  ephemerides   positions of sun, moon, planets and spring point (without transits)
+  transits      search of the transit times
+  stars         apparent places of the stars of the page
+  format        conversion of the numbers to the strings of the tables
+  render        Jinja rendering of the page
+  output        writing the page to the file
+
+Calls to the NOVAS functions app_planet, sidereal_time, app_star and e_tilt
+are counted and timed (with ephemeris, precession and nutation, used by the
+star reduction) by the profiler of novasbook.profiling, which gives the calls
+per second. Results are written as JSON, so they can be tracked over time.
+
+With --golden, the generated document is compared to a reference
+Ephemeriden_<year>.tex. Pages are matched by their date and rows by their
+labels (hour, star number), so added or removed rows are reported as such
+and do not shift the comparison of the following rows. Angles (degrees and
+minutes) are compared by value, so a carry from 59,9' to the next degree is
+no change. Every cell changing by more than 0.1', every other changed cell
+and every added or removed row is reported, the exit status is 1 if there
+are any.
+
+  python benchmark.py                                   # default years, results in output/benchmark.json
+  python benchmark.py 2024 --golden reference/Ephemeriden_{year}.tex
+"""
+import argparse
+import difflib
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+
+from datetime import date, datetime, timedelta
+
+import numpy
+from novasbook import calculation, formatting, profiling, rendering
+
+__all__ = ['benchmark_year', 'compare_tex', 'novas_calls']
+
+DEFAULT_YEARS = (2000, 2024, 2050)
+STAGES = ('ephemerides', 'transits', 'stars', 'format', 'render', 'output')
+COUNTED_FUNCTIONS = ('app_planet', 'sidereal_time', 'app_star', 'e_tilt', 'ephemeris', 'precession', 'nutation')
+MAX_REPORTED_CELLS = 1000
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def novas_calls(profiler):
+    """Calls and time of the counted NOVAS functions recorded by the profiler, summed over the bodies."""
+    calls = {name: {'calls': 0, 'seconds': 0.0} for name in COUNTED_FUNCTIONS}
+    for (category, name), (count, seconds, longest) in profiler.stats.items():
+        function = name.split('(')[0]
+        if category == 'novas' and function in calls:
+            calls[function]['calls'] += count
+            calls[function]['seconds'] += seconds
+    for summary in calls.values():
+        summary['calls_per_second'] = summary['calls'] / summary['seconds'] if summary['seconds'] > 0 else None
+    return calls
+
+
+def stage_seconds(profiler, name):
+    """Total time of a stage recorded by the profiler so far."""
+    return profiler.stats.get(('stage', name), (0, 0.0, 0.0))[1]
+
+
+def benchmark_year(profiler, year, tex_file, tolerance=1e-6, use_cache=True):
+    """Generates the book for one year into tex_file and returns the timings per day and stage.
+    profiler is the running profiling.Profiler, it is cleared at the start."""
+    profiler.drain()
+    calculation.configure_ephemerides(tolerance, use_cache)
+
+    start_year = time.perf_counter()
+    start = time.perf_counter()
+    jinja = rendering.environment()
+    document_template = jinja.get_template('NJ_mainDocument.jinja.tex')
+    table_eph_day = rendering.page_emitter()
+    period = rendering.book_period(date(year, 1, 1), date(year, 12, 31))
+    document_head, document_tail = document_template.render(period=period, table=rendering.TABLE_PLACEHOLDER).split(rendering.TABLE_PLACEHOLDER)
+    setup_seconds = time.perf_counter() - start
+
+    days = [date(year, 1, 1) + timedelta(days=n) for n in range((date(year, 12, 31) - date(year, 1, 1)).days + 1)]
+    per_day = []
+    with open(tex_file, 'w') as outfile:
+        outfile.write(document_head)
+        for n, dt in enumerate(days):
+            page = (dt.year, dt.month, dt.day, 1 - (n % 2))
+            timing = {'date': dt.isoformat()}
+
+            start = time.perf_counter()
+            transit_seconds = stage_seconds(profiler, 'transits')
+            day_results = calculation.calculate_ephemerides_day(dt.year, dt.month, dt.day, calculation.calculate_delta_TT_UT1(dt.year, dt.month, dt.day))
+            timing['transits'] = stage_seconds(profiler, 'transits') - transit_seconds
+            timing['ephemerides'] = time.perf_counter() - start - timing['transits']
+
+            start = time.perf_counter()
+            day_results, star_positions = calculation.calculate_page(*page, day_results=day_results)
+            timing['stars'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            variables = formatting.format_page(dt, page, day_results, star_positions)
+            timing['format'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            text = table_eph_day.render(variables)
+            timing['render'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            outfile.write(text)
+            timing['output'] = time.perf_counter() - start
+            per_day.append(timing)
+
+        print(document_tail, file=outfile)
+    total_seconds = time.perf_counter() - start_year
+
+    stages = {}
+    for stage in STAGES:
+        seconds = numpy.array([timing[stage] for timing in per_day])
+        stages[stage] = {'total': seconds.sum(), 'mean_per_day': seconds.mean(), 'max_per_day': seconds.max()}
+    return {
+        'year': year,
+        'days': len(days),
+        'seconds': total_seconds,
+        'setup_seconds': setup_seconds,
+        'stages': stages,
+        'calls': novas_calls(profiler),
+        'per_day': per_day,
+    }
+
+
+# Numbers in a cell: integers are compared exactly, decimal numbers (minutes) with the threshold
+NUMBER = re.compile(r'-?\d+(?:,\d+)?')
+DEGREES = re.compile(r'^\d{2,3}$')
+MINUTES = re.compile(r'^(-?\d+,\d)( [NS])?$')
+
+
+def compare_tex(reference_file, output_file, threshold=0.1):
+    """Compares two generated documents cell by cell (cells are separated by '&').
+
+    The documents are aligned before comparing, so an added or removed line does not shift all following rows:
+    pages (ending with \\newpage) are matched by their heading with the date, the rows of matched pages by their
+    labels (hour, star number, texts; see _row_key). Cells are only compared within matched rows.
+    Returns the number of compared cells and a list of changes, each a dictionary with kind ('changed', 'added' or
+    'removed'), line (in output_file), reference_line, column, reference, output and difference (arc minutes, None
+    if not numeric). Added and removed rows or pages have column None."""
+    with open(reference_file) as f:
+        reference_pages = _pages(f.read().splitlines())
+    with open(output_file) as f:
+        output_pages = _pages(f.read().splitlines())
+
+    counter = [0]
+    changes = []
+    pages = difflib.SequenceMatcher(None, [key for key, first, lines in reference_pages],
+                                    [key for key, first, lines in output_pages], autojunk=False)
+    for tag, i1, i2, j1, j2 in pages.get_opcodes():
+        if tag == 'equal':
+            for (_, reference_first, reference_lines), (_, output_first, output_lines) in zip(reference_pages[i1:i2], output_pages[j1:j2]):
+                _compare_rows(reference_lines, output_lines, reference_first, output_first, threshold, counter, changes)
+            continue
+        for _, first, lines in reference_pages[i1:i2]:
+            changes.append(_row_change('removed', None, first, lines[0], None))
+        for _, first, lines in output_pages[j1:j2]:
+            changes.append(_row_change('added', first, None, None, lines[0]))
+    return counter[0], changes
+
+
+def _pages(lines):
+    """Splits a document into pages after every \\newpage. Returns list of (key, number of the first line, lines),
+    the key is the heading with the date (None for pages without, e.g. the front matter)."""
+    pages = []
+    start = 0
+    for n, line in enumerate(lines):
+        if '\\newpage' in line or n == len(lines) - 1:
+            page = lines[start:n + 1]
+            key = next((line.strip() for line in page if '\\large' in line), None)
+            pages.append((key, start + 1, page))
+            start = n + 1
+    return pages
+
+
+def _row_key(line):
+    """Label of a row: cells of integers (hour, star number) and texts as they are, numbers within other cells
+    and angles replaced by '#'."""
+    key = []
+    for column, cell, value in _angle_cells(line):
+        if value is not None:
+            key.append('#')
+        elif cell.isdigit():
+            key.append(cell)
+        else:
+            key.append(NUMBER.sub('#', cell))
+    return tuple(key)
+
+
+def _compare_rows(reference_lines, output_lines, reference_first, output_first, threshold, counter, changes):
+    """Aligns the rows of two matched pages by their labels and compares the cells of matched rows."""
+    rows = difflib.SequenceMatcher(None, [_row_key(line) for line in reference_lines],
+                                   [_row_key(line) for line in output_lines], autojunk=False)
+    for tag, i1, i2, j1, j2 in rows.get_opcodes():
+        if tag == 'replace':
+            # Rows with changed labels at the same place are compared, unless their cells do not match
+            paired = min(i2 - i1, j2 - j1)
+            for i, j in zip(range(i1, i1 + paired), range(j1, j1 + paired)):
+                _compare_cells(reference_lines[i], output_lines[j], reference_first + i, output_first + j, threshold,
+                               counter, changes)
+            i1, j1 = i1 + paired, j1 + paired
+        elif tag == 'equal':
+            for i, j in zip(range(i1, i2), range(j1, j2)):
+                _compare_cells(reference_lines[i], output_lines[j], reference_first + i, output_first + j, threshold,
+                               counter, changes)
+            continue
+        for i in range(i1, i2):
+            changes.append(_row_change('removed', None, reference_first + i, reference_lines[i], None))
+        for j in range(j1, j2):
+            changes.append(_row_change('added', output_first + j, None, None, output_lines[j]))
+
+
+def _compare_cells(reference_line, output_line, reference_n, output_n, threshold, counter, changes):
+    reference_cells = _angle_cells(reference_line)
+    output_cells = _angle_cells(output_line)
+    if len(reference_cells) != len(output_cells):
+        changes.append(_row_change('changed', output_n, reference_n, reference_line, output_line))
+        return
+    for (column, reference_cell, reference_value), (_, output_cell, output_value) in zip(reference_cells, output_cells):
+        counter[0] += 1
+        difference = _cell_difference(reference_cell, reference_value, output_cell, output_value, threshold)
+        if difference is not False:
+            changes.append({'kind': 'changed', 'line': output_n, 'reference_line': reference_n, 'column': column,
+                            'reference': reference_cell, 'output': output_cell, 'difference': difference})
+
+
+def _row_change(kind, line, reference_line, reference, output):
+    return {'kind': kind, 'line': line, 'reference_line': reference_line, 'column': None, 'reference': reference,
+            'output': output, 'difference': None}
+
+
+def _angle_cells(line):
+    """Splits a line into cells. A cell with degrees followed by one with minutes is combined into one angle.
+    Returns list of (column, text, value in arc minutes or None)."""
+    cells = [cell.strip() for cell in line.rstrip().rstrip('\\').split('&')]
+    result = []
+    column = 0
+    while column < len(cells):
+        cell = cells[column]
+        if column + 1 < len(cells) and DEGREES.match(cell) and MINUTES.match(cells[column + 1]):
+            minutes, hemisphere = MINUTES.match(cells[column + 1]).groups()
+            value = int(cell) * 60 + float(minutes.replace(',', '.'))
+            if hemisphere == ' S':
+                value = -value
+            result.append((column, cell + ' ' + cells[column + 1], value))
+            column += 2
+        else:
+            result.append((column, cell, None))
+            column += 1
+    return result
+
+
+def _cell_difference(reference_cell, reference_value, output_cell, output_value, threshold):
+    """False if the cell is unchanged (within threshold), else the difference in arc minutes or None."""
+    if reference_value is not None and output_value is not None:
+        # full circle angles wrap at 360 deg = 21600'
+        difference = (output_value - reference_value + 10800.0) % 21600.0 - 10800.0
+        return difference if abs(difference) > threshold + 1e-9 else False
+    if reference_cell == output_cell:
+        return False
+    reference_numbers = NUMBER.findall(reference_cell)
+    output_numbers = NUMBER.findall(output_cell)
+    if NUMBER.sub('#', reference_cell) != NUMBER.sub('#', output_cell) or len(reference_numbers) != len(output_numbers):
+        return None
+    largest = 0.0
+    for reference_number, output_number in zip(reference_numbers, output_numbers):
+        if ',' in reference_number and ',' in output_number:
+            difference = float(output_number.replace(',', '.')) - float(reference_number.replace(',', '.'))
+            if abs(difference) > threshold + 1e-9 and abs(difference) > abs(largest):
+                largest = difference
+        elif reference_number != output_number:
+            return None
+    return largest if largest != 0.0 else False
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=BASE_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measures the generation of whole years and compares the output to reference documents.')
+    parser.add_argument('years', type=int, nargs='*', default=list(DEFAULT_YEARS), help='years to generate (default: {})'.format(' '.join(map(str, DEFAULT_YEARS))))
+    parser.add_argument('--output', '-o', default='output/benchmark.json', help='file for the results in JSON (default: output/benchmark.json)')
+    parser.add_argument('--tex-dir', default='output/benchmark', help='directory for the generated documents (default: output/benchmark)')
+    parser.add_argument('--golden', metavar='FILE', help='reference document to compare with, {year} is replaced by the year')
+    parser.add_argument('--threshold', type=float, default=0.1, help="largest allowed change of an angle in arc minutes (default: 0.1)")
+    parser.add_argument('--tolerance', type=float, default=1e-6, help='tolerance of the Chebyshev ephemerides cache in degrees (default: 1e-6)')
+    parser.add_argument('--no-ephemeris-cache', dest='ephemeris_cache', action='store_false', help='call NOVAS for every position')
+    parser.add_argument('--per-day', action='store_true', help='include the timings of every day in the JSON file')
+    args = parser.parse_args()
+
+    os.makedirs(args.tex_dir, exist_ok=True)
+    profiler = profiling.enable(trace=False)
+    calculation.open_ephemeris()
+
+    results = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'numpy': numpy.__version__,
+        'machine': platform.machine(),
+        'tolerance': args.tolerance,
+        'ephemeris_cache': args.ephemeris_cache,
+        'years': [],
+    }
+    regressions = False
+    for year in args.years:
+        tex_file = os.path.join(args.tex_dir, 'Ephemeriden_{}.tex'.format(year))
+        result = benchmark_year(profiler, year, tex_file, args.tolerance, args.ephemeris_cache)
+        print('{}: {:.2f} s, {:.1f} ms per day'.format(year, result['seconds'], 1000 * result['seconds'] / result['days']))
+        for stage in STAGES:
+            print('  {:12} {:8.3f} s  (max. {:.1f} ms per day)'.format(stage, result['stages'][stage]['total'], 1000 * result['stages'][stage]['max_per_day']))
+        for name in COUNTED_FUNCTIONS:
+            calls = result['calls'][name]
+            if calls['calls']:
+                print('  {:12} {:8d} calls, {:.0f} per second'.format(name, calls['calls'], calls['calls_per_second']))
+
+        if args.golden is not None:
+            golden = args.golden.format(year=year)
+            if os.path.exists(golden):
+                compared, changes = compare_tex(golden, tex_file, args.threshold)
+                kinds = {kind: sum(change['kind'] == kind for change in changes) for kind in ('changed', 'added', 'removed')}
+                result['golden'] = {'file': golden, 'compared_cells': compared, 'changed_cells': kinds['changed'],
+                                    'added_rows': kinds['added'], 'removed_rows': kinds['removed'],
+                                    'changes': changes[:MAX_REPORTED_CELLS]}
+                print('  golden: {changed} of {compared} cells changed, {added} rows added, {removed} rows removed'.format(
+                    compared=compared, **kinds))
+                for change in changes[:20]:
+                    print('    {kind} line {line} (reference {reference_line}), column {column}: {reference!r} -> {output!r}'.format(**change))
+                regressions = regressions or bool(changes)
+            else:
+                print('  golden: {} not found'.format(golden))
+        if not args.per_day:
+            del result['per_day']
+        results['years'].append(result)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print('results written to ' + args.output)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
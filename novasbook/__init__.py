@@ -0,0 +1,36 @@
+"""Ephemerides for celestial navigation in the style of the German Nautical Yearbook.
+
+The functions of the package are imported on first use, so `import novasbook`
+is fast and has no side effects. The JPL ephemeris (file in the environment
+variable EPHEMERIS_FILE) is opened by the first calculation, Jinja only by
+render().
+
+  >>> from datetime import date, datetime
+  >>> import novasbook
+  >>> gha, dec = novasbook.compute_position('sun', datetime(2024, 6, 21, 12))
+  >>> day = novasbook.compute_day(date(2024, 6, 21))                        # numbers of one day page
+  >>> results = novasbook.compute_range(date(2024, 1, 1), date(2024, 12, 31), jobs=4)
+  >>> novasbook.render(results, 'latex', open('output/Ephemeriden_2024.tex', 'w'))
+"""
+import importlib
+
+__all__ = ['compute_day', 'compute_range', 'compute_position', 'configure_ephemerides', 'render']
+
+# Public name -> module providing it
+_API = {
+    'compute_day': 'calculation',
+    'compute_range': 'calculation',
+    'compute_position': 'calculation',
+    'configure_ephemerides': 'calculation',
+    'render': 'rendering',
+}
+
+
+def __getattr__(name):
+    if name in _API:
+        return getattr(importlib.import_module('.' + _API[name], __name__), name)
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_API))
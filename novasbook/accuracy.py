@@ -0,0 +1,137 @@
+"""Error of the draft accuracy, measured on a sample of the pages.
+
+In draft mode all NOVAS reductions (app_planet, sidereal time, star places)
+run with the reduced accuracy of NOVAS (calculation.ACCURACIES). This is
+much faster and still far more precise than the 0.1' of the tables, but not
+the same. check_accuracy() calculates a spread sample of the pages again with
+full accuracy and reports, per column of the tables, the maximum deviation
+of the draft values (in arc seconds and seconds of time, the tables print
+0.1' and minutes), and how many printed values differ.
+
+  >>> calculation.configure_ephemerides(1e-6, True, calculation.ACCURACIES['draft'])
+  >>> report = check_accuracy(calculation.book_pages(first_day, last_day), 0.05)
+  >>> print(report.summary())
+"""
+from datetime import date
+
+import numpy as np
+
+from .ephemeris_data import BODIES, SUN_EVENTS, MOON_EVENTS
+
+__all__ = ['ErrorReport', 'check_accuracy', 'reference_source', 'sample_pages', 'COLUMNS']
+
+# Columns of the report: (name, field of DAY_DTYPE or STARS_DTYPE, index into the field, factor to the unit, unit,
+# angle (compared modulo 360 degrees))
+COLUMNS = [('GHA aries', 'spr_p', np.s_[:], 3600.0, '"', True)]
+COLUMNS += [('GHA ' + body, 'gha', np.s_[:, n], 3600.0, '"', True) for n, body in enumerate(BODIES)]
+COLUMNS += [('Dec ' + body, 'dec', np.s_[:, n], 3600.0, '"', False) for n, body in enumerate(BODIES)]
+COLUMNS += [('d GHA moon', 'moon_d_gha', np.s_[:], 3600.0, '"', False),
+            ('d Dec moon', 'moon_d_dec', np.s_[:], 3600.0, '"', False),
+            ('HP moon', 'hp_moon', np.s_[:], 3600.0, '"', False),
+            ('transit aries', 'transit_spr_p', np.s_[:], 3600.0, 's', False)]
+COLUMNS += [('transit ' + body, 'transit', np.s_[n], 3600.0, 's', False) for n, body in enumerate(BODIES)]
+COLUMNS += [('diff GHA ' + body, 'diff_gha', np.s_[n], 3600.0, '"', False) for n, body in enumerate(BODIES) if body != 'moon']
+COLUMNS += [('diff Dec ' + body, 'diff_dec', np.s_[n], 3600.0, '"', False) for n, body in enumerate(BODIES) if body != 'moon']
+COLUMNS += [('HP ' + body, 'hp', np.s_[n], 3600.0, '"', False) for n, body in enumerate(BODIES) if body != 'moon']
+COLUMNS += [('SD sun', 'sd_sun', np.s_[...], 3600.0, '"', False),
+            ('age moon', 'age_moon', np.s_[...], 86400.0, 's', False)]
+COLUMNS += [(name, 'sun_events', np.s_[:, n], 3600.0, 's', False) for n, (name, altitude, rising) in enumerate(SUN_EVENTS)]
+COLUMNS += [(name, 'moon_events', np.s_[:, n], 3600.0, 's', False) for n, name in enumerate(MOON_EVENTS)]
+STAR_COLUMNS = [('SHA stars', 'sha', np.s_[:], 3600.0, '"', True), ('Dec stars', 'dec', np.s_[:], 3600.0, '"', False)]
+
+
+# Full accuracy sources of calculation by (tolerance, use_cache), kept for the next books like the ephemerides
+# of calculation itself.
+_reference_sources = {}
+
+
+def reference_source(tolerance, use_cache=True):
+    """Ephemerides in full accuracy (a calculation.Source), separate from the ones of calculation."""
+    from . import calculation
+
+    key = (tolerance, use_cache)
+    if key not in _reference_sources:
+        _reference_sources[key] = calculation.make_source(tolerance, use_cache, calculation.ACCURACIES['full'])
+    return _reference_sources[key]
+
+
+def sample_pages(pages, fraction):
+    """About fraction of the pages, spread evenly over the book (first and last page included)."""
+    if fraction <= 0.0 or not pages:
+        return []
+    count = min(len(pages), max(1, int(np.ceil(len(pages) * fraction))))
+    return [pages[n] for n in np.unique(np.round(np.linspace(0, len(pages) - 1, count)).astype(int)).tolist()]
+
+
+class ErrorReport(object):
+    """Maximum deviation per column of draft against full accuracy, and the number of changed printed values."""
+
+    def __init__(self, fraction=0.0, total_pages=0):
+        self.fraction = fraction
+        self.total_pages = total_pages
+        self.pages = 0
+        self.deviations = {name: [0.0, unit, 0, 0] for name, field, index, factor, unit, angle in COLUMNS + STAR_COLUMNS}
+        self.printed = 0
+        self.printed_changed = 0
+
+    def add(self, draft, full, draft_printed, full_printed):
+        """Compares the results (day_results, star_positions) of one page, and its printed values."""
+        self.pages += 1
+        for columns, draft_record, full_record in ((COLUMNS, draft[0], full[0]), (STAR_COLUMNS, draft[1], full[1])):
+            for name, field, index, factor, unit, angle in columns:
+                a = np.asarray(draft_record[field][index], dtype=float)
+                b = np.asarray(full_record[field][index], dtype=float)
+                difference = a - b
+                if angle:
+                    difference = np.mod(difference + 180.0, 360.0) - 180.0
+                both = ~np.isnan(a) & ~np.isnan(b)
+                deviation = self.deviations[name]
+                if both.any():
+                    deviation[0] = max(deviation[0], float(np.max(np.abs(difference[both]))) * factor)
+                deviation[2] += int(np.count_nonzero(both))
+                deviation[3] += int(np.count_nonzero(np.isnan(a) != np.isnan(b)))     # event in one of them only
+        self.printed += len(full_printed)
+        self.printed_changed += sum(a != b for a, b in zip(draft_printed, full_printed))
+
+    def maximum(self, name):
+        """Maximum deviation of a column in its unit."""
+        return self.deviations[name][0]
+
+    def summary(self):
+        lines = ['Draft accuracy checked against full accuracy on {} of {} pages (fraction {:g})'.format(
+                     self.pages, self.total_pages, self.fraction),
+                 '{:24} {:>14} {:>8} {:>8}'.format('column', 'max. deviation', 'values', 'missing')]
+        for name, (deviation, unit, values, missing) in self.deviations.items():
+            lines.append('{:24} {:12.6f} {:1} {:8d} {:8d}'.format(name, deviation, unit, values, missing))
+        lines.append('printed values changed: {} of {}'.format(self.printed_changed, self.printed))
+        return '\n'.join(lines)
+
+
+def check_accuracy(pages, fraction, progress=None):
+    """Calculates a sample (fraction) of the pages with the current settings of calculation and again with full
+    accuracy, and compares them. The full accuracy uses ephemerides of its own (see reference_source()), the
+    ephemerides of the book are not touched. Returns an ErrorReport.
+    progress(page) is called for every page checked."""
+    from . import calculation, rendering
+    from .formatting import format_page
+
+    report = ErrorReport(fraction, len(pages))
+    sample = sample_pages(pages, fraction)
+    if not sample:
+        return report
+    tolerance, use_cache, accuracy = calculation.settings
+    draft_source = calculation.current_source()
+    full_source = reference_source(tolerance, use_cache)
+    emitter = rendering.page_emitter()
+
+    def calculate(page, source):
+        results = calculation.calculate_page(*page, source=source)     # every page on its own
+        return results, emitter.flatten(format_page(date(*page[:3]), page, *results))[0]
+
+    for page in sample:
+        if progress is not None:
+            progress(page)
+        draft_results, draft_printed = calculate(page, draft_source)
+        full_results, full_printed = calculate(page, full_source)
+        report.add(draft_results, full_results, draft_printed, full_printed)
+    return report
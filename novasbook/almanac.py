@@ -0,0 +1,256 @@
+"""Binary almanac file: the numbers of the day pages for memory-mapped access.
+
+One record of fixed size per day, in the order of the days without gaps: the
+DAY_DTYPE record (hourly GHA and declination of the bodies and the spring
+point, transits, HP, SD, age of the moon, rising and setting), the parity of
+the page and the STARS_DTYPE record of its stars (SHA and declination). The
+record of a day is found by arithmetic, `(jd_ut1 - first_jd) // 1`, and read
+from the mapped file without parsing or copying.
+
+File layout (little endian):
+
+    0     header  HEADER: magic, version, header size, record size, days,
+                  Julian date (UT1) of the first day, length of the layout
+    48    layout  JSON: offset, type and shape of every field of a record
+                  ('day.gha', 'stars.sha', ...), names of the bodies, latitudes
+          padding to HEADER_SIZE (4096)
+    4096  records RECORD_DTYPE, record_size bytes each
+
+The reader needs only numpy, neither NOVAS nor the ephemeris:
+
+  >>> with Almanac('output/Ephemeriden_2024.alm') as almanac:
+  ...     gha, dec = almanac.position('moon', jd_ut1)        # interpolated between the hours, also for arrays
+  ...     record = almanac.day(jd_ut1)                       # DAY_DTYPE record of the day, a view into the file
+  ...     sha, gha, dec = almanac.star(18, jd_ut1)
+  ...     hp = almanac.parallax('moon', jd_ut1)
+
+Writing, e.g. from calculation.iter_pages():
+
+  >>> with open('output/Ephemeriden_2024.alm', 'wb') as f:
+  ...     write_almanac(calculation.compute_range(date(2024, 1, 1), date(2024, 12, 31)), f)
+"""
+import json
+import mmap
+import struct
+
+import numpy as np
+
+from .ephemeris_data import BODIES, DAY_DTYPE, HP_MOON_HOURS, LATITUDES, MOON_EVENTS, STARS_DTYPE, SUN_EVENTS
+
+__all__ = ['Almanac', 'AlmanacWriter', 'write_almanac', 'RECORD_DTYPE', 'MAGIC', 'VERSION', 'HEADER_SIZE']
+
+MAGIC = b'NOVALMNC'
+VERSION = 2
+HEADER = struct.Struct('<8sHHIId16xI')      # 48 bytes, 16 of them reserved
+HEADER_SIZE = 4096                          # records start at a page boundary
+MOON_RADIUS = 0.2725                        # in earth radii: semidiameter of the moon = 0.2725 * HP
+
+# Record of one day, padded to a multiple of 8 bytes
+RECORD_DTYPE = np.dtype({'names': ['day', 'page_is_even', 'stars'],
+                         'formats': [DAY_DTYPE, 'i1', STARS_DTYPE],
+                         'offsets': [0, DAY_DTYPE.itemsize, DAY_DTYPE.itemsize + 1],
+                         'itemsize': (DAY_DTYPE.itemsize + 1 + STARS_DTYPE.itemsize + 7) // 8 * 8})
+
+
+def _fields(dtype, prefix='', offset=0):
+    """Flat list of {name, offset, type, shape} of all fields of dtype, nested names joined by '.'."""
+    fields = []
+    for name in dtype.names:
+        field_dtype, field_offset = dtype.fields[name][:2]
+        if field_dtype.names:
+            fields += _fields(field_dtype, prefix + name + '.', offset + field_offset)
+        else:
+            fields.append({'name': prefix + name, 'offset': offset + field_offset, 'type': field_dtype.base.str,
+                           'shape': list(field_dtype.shape)})
+    return fields
+
+
+def layout():
+    """Description of a record for readers in other languages, stored in the header."""
+    return {'fields': _fields(RECORD_DTYPE), 'bodies': list(BODIES), 'hp_moon_hours': list(HP_MOON_HOURS),
+            'latitudes': list(LATITUDES), 'sun_events': [event[0] for event in SUN_EVENTS],
+            'moon_events': list(MOON_EVENTS), 'units': 'degrees, hours UT1 after 0:00 of the day, NaN if missing'}
+
+
+class AlmanacWriter(object):
+    """Writes the records of consecutive days to outfile (binary, seekable). The header is completed by close()."""
+
+    def __init__(self, outfile):
+        self.outfile = outfile
+        self.first_jd = None
+        self.days = 0
+        self.layout = json.dumps(layout()).encode()
+        if HEADER.size + len(self.layout) > HEADER_SIZE:
+            raise ValueError('Layout of the almanac does not fit into the header')
+        self.start = outfile.tell()
+        outfile.write(bytes(HEADER_SIZE))
+        self.record = np.zeros((), dtype=RECORD_DTYPE)
+
+    def add(self, page, day_results, star_positions):
+        """Appends the day of page (year, month, day, page_is_even). Days must follow each other without gaps."""
+        jd_ut1 = float(day_results['jd_ut1'])
+        if self.first_jd is None:
+            self.first_jd = jd_ut1
+        elif jd_ut1 != self.first_jd + self.days:
+            raise ValueError('Day {}-{:02d}-{:02d} does not follow the last day of the almanac'.format(*page[:3]))
+        self.record['day'] = day_results
+        self.record['page_is_even'] = page[3]
+        self.record['stars'] = star_positions
+        self.outfile.write(self.record.tobytes())
+        self.days += 1
+
+    def close(self):
+        if self.first_jd is None:
+            raise ValueError('Almanac without days')
+        end = self.outfile.tell()
+        self.outfile.seek(self.start)
+        self.outfile.write(HEADER.pack(MAGIC, VERSION, HEADER_SIZE, RECORD_DTYPE.itemsize, self.days, self.first_jd,
+                                       len(self.layout)))
+        self.outfile.write(self.layout)
+        self.outfile.seek(end)
+
+
+def write_almanac(results, outfile, period=None):
+    """Writes results (iterable of (page, day_results, star_positions)) as almanac to outfile (binary, seekable).
+    Backend 'almanac' of rendering.render(); period is not used."""
+    writer = AlmanacWriter(outfile)
+    for page, day_results, star_positions in results:
+        writer.add(page, day_results, star_positions)
+    writer.close()
+
+
+class Almanac(object):
+    """Memory-mapped almanac file. records is a numpy array of RECORD_DTYPE backed by the file."""
+
+    def __init__(self, filename):
+        with open(filename, 'rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, header_size, record_size, days, first_jd, layout_size = HEADER.unpack_from(self.mmap)
+            if magic != MAGIC:
+                raise ValueError('{} is no almanac file'.format(filename))
+            if version != VERSION or record_size != RECORD_DTYPE.itemsize:
+                raise ValueError('{}: almanac version {} (record size {}), this reader reads version {} (record size {})'
+                                 .format(filename, version, record_size, VERSION, RECORD_DTYPE.itemsize))
+            if header_size + days * record_size > len(self.mmap):
+                raise ValueError('{}: almanac file is incomplete'.format(filename))
+        except (ValueError, struct.error):
+            self.mmap.close()
+            raise
+        self.filename = filename
+        self.first_jd = first_jd
+        self.days = days
+        self.layout_size = layout_size
+        self.records = np.frombuffer(self.mmap, dtype=RECORD_DTYPE, count=days, offset=header_size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def close(self):
+        # The map can only be closed when no array uses it any more, else it is closed with the last one
+        self.records = None
+        try:
+            self.mmap.close()
+        except BufferError:
+            pass
+
+    def layout(self):
+        """Description of a record as stored in the header."""
+        return json.loads(self.mmap[HEADER.size:HEADER.size + self.layout_size].decode())
+
+    @property
+    def last_jd(self):
+        """Julian date (UT1) of 24:00 of the last day."""
+        return self.first_jd + self.days
+
+    def _index(self, jd_ut1):
+        """Numbers of the days and hours after 0:00 UT1 of jd_ut1 (arrays). Raises ValueError outside the almanac."""
+        x = np.asarray(jd_ut1, dtype=float) - self.first_jd
+        if np.any(x < 0.0) or np.any(x > self.days):
+            raise ValueError('Date outside the almanac (Julian dates UT1 {} to {})'.format(self.first_jd, self.last_jd))
+        n = np.minimum(np.floor(x).astype(int), self.days - 1)      # 24:00 of the last day is in the last record
+        return n, (x - n) * 24.0
+
+    def day(self, jd_ut1):
+        """DAY_DTYPE record of the day containing jd_ut1 (UT1)."""
+        return self.records['day'][int(self._index(jd_ut1)[0])]
+
+    def position(self, body, jd_ut1):
+        """GHA and declination of body ('sun', 'moon', ..., 'aries' for the spring point) at jd_ut1 (UT1, scalar or
+        array), linearly interpolated between the hours. The declination of the spring point is 0."""
+        n, hours = self._index(jd_ut1)
+        h = np.minimum(np.floor(hours).astype(int), 23)
+        fraction = hours - h
+        days = self.records['day']
+        if body == 'aries':
+            gha0, gha1 = days['spr_p'][n, h], days['spr_p'][n, h + 1]
+            dec0 = dec1 = np.zeros_like(fraction)
+        elif body in BODIES:
+            b = BODIES.index(body)
+            gha0, gha1 = days['gha'][n, h, b], days['gha'][n, h + 1, b]
+            dec0, dec1 = days['dec'][n, h, b], days['dec'][n, h + 1, b]
+        else:
+            raise ValueError('Unknown body {!r}, available: {}'.format(body, ', '.join(BODIES + ('aries',))))
+        # GHA increases by about 15 degrees per hour and passes 360 -> 0
+        gha = np.mod(gha0 + np.mod(gha1 - gha0, 360.0) * fraction, 360.0)
+        dec = dec0 + (dec1 - dec0) * fraction
+        if np.ndim(jd_ut1) == 0:
+            return float(gha), float(dec)
+        return gha, dec
+
+    def star(self, number, jd_ut1):
+        """SHA, GHA and declination of the star with the number of the Nautisches Jahrbuch at jd_ut1 (UT1, scalar or
+        array). SHA and declination are those of the page of the day, or of a neighbouring day if the star is not on
+        it (the pages of even and odd days show different stars). Raises KeyError if the star is in neither."""
+        n = np.atleast_1d(self._index(jd_ut1)[0])
+        stars = self.records['stars']
+        sha = np.full(n.shape, np.nan)
+        dec = np.full(n.shape, np.nan)
+        for offset in (0, -1, 1):
+            m = np.clip(n + offset, 0, self.days - 1)
+            hit = stars['number'][m] == number
+            found = hit.any(axis=1) & np.isnan(sha)
+            column = hit.argmax(axis=1)
+            sha[found] = stars['sha'][m[found], column[found]]
+            dec[found] = stars['dec'][m[found], column[found]]
+        if np.isnan(sha).any():
+            raise KeyError('Star {} is not in the almanac around Julian date {}'.format(
+                number, np.atleast_1d(jd_ut1)[np.isnan(sha)][0]))
+        gha = np.mod(np.atleast_1d(self.position('aries', jd_ut1)[0]) + sha, 360.0)
+        if np.ndim(jd_ut1) == 0:
+            return float(sha[0]), float(gha[0]), float(dec[0])
+        return sha, gha, dec
+
+    def parallax(self, body, jd_ut1):
+        """Horizontal parallax in degrees of body at jd_ut1 (UT1, scalar or array), interpolated linearly between the
+        values of the tables: 4, 12 and 20 h for the moon, 12 h for sun and planets."""
+        days = self.records['day']
+        if body == 'moon':
+            times = (self.first_jd + np.arange(self.days)[:, np.newaxis] + np.array(HP_MOON_HOURS) / 24.0).ravel()
+            values = days['hp_moon'].ravel()
+        elif body in BODIES:
+            times = self.first_jd + np.arange(self.days) + 0.5
+            values = days['hp'][:, BODIES.index(body)]
+        else:
+            raise ValueError('No parallax of {!r}, available: {}'.format(body, ', '.join(BODIES)))
+        self._index(jd_ut1)
+        hp = np.interp(jd_ut1, times, values)
+        return float(hp) if np.ndim(jd_ut1) == 0 else hp
+
+    def semidiameter(self, body, jd_ut1):
+        """Semidiameter in degrees of sun (SD of the tables at 12 h, interpolated) or moon (from its parallax, the
+        radius of the moon is 0.2725 earth radii) at jd_ut1 (UT1, scalar or array). 0 for the planets."""
+        if body == 'sun':
+            self._index(jd_ut1)
+            sd = np.interp(jd_ut1, self.first_jd + np.arange(self.days) + 0.5, self.records['day']['sd_sun'])
+        elif body == 'moon':
+            sd = MOON_RADIUS * np.asarray(self.parallax('moon', jd_ut1))
+        elif body in BODIES:
+            sd = np.zeros(np.shape(jd_ut1))
+        else:
+            raise ValueError('No semidiameter of {!r}, available: {}'.format(body, ', '.join(BODIES)))
+        return float(sd) if np.ndim(jd_ut1) == 0 else sd
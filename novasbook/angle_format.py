@@ -0,0 +1,90 @@
+"""Batch conversion of angles and times to the degree/minute strings of the tables.
+
+Every function takes a whole sequence (list or numpy array of any shape) of values and
+formats all of them with a single string formatting operation, instead of
+one str.format() call per value. Minutes are rounded to 0.1' (or to whole
+minutes for times). If a value rounds up to 60 minutes, the minutes become
+0 and the degrees (or hours) are increased by one. Full-circle angles wrap
+from 360 to 0 degrees.
+
+The decimal separator is a parameter, novas-book passes the one of the
+language of the book (',' for German).
+
+  >>> format_dm_360([359.9999, 12.5])
+  (['000', '012'], ['00,0', '30,0'])
+  >>> format_dm_NS([-0.5, 23.44])
+  (['00', '23'], ['30,0 S', '26,4 N'])
+"""
+import numpy as np
+
+__all__ = ['format_dm_360', 'format_dm_NS', 'format_min', 'format_m', 'format_hm']
+
+
+def format_dm_360(angles, separator=','):
+    """Full-circle angles (0..360) to lists of degree ('ddd') and minute ('mm,m') strings."""
+    angles = np.asarray(angles, dtype=float).ravel()
+    if np.any(angles < 0):
+        raise NameError('Invalid sign for full-circle-angle')
+    degrees, minutes = _split_dm(angles)
+    degrees %= 360
+    return _format_all('%03d', degrees), _format_all('%04.1f', minutes, separator)
+
+
+def format_dm_NS(angles, separator=','):
+    """Declinations (-90..90) to lists of degree ('dd') and minute strings with 'N' or 'S' instead of sign."""
+    angles = np.asarray(angles, dtype=float).ravel()
+    if np.any(np.abs(angles) > 90):
+        raise NameError('Invalid declination angle')
+    degrees, minutes = _split_dm(np.abs(angles))
+    minutes = _format_all('%04.1f', minutes, separator)
+    hemispheres = np.where(angles >= 0, ' N', ' S').tolist()
+    return _format_all('%02d', degrees), [m + h for m, h in zip(minutes, hemispheres)]
+
+
+def format_min(angles, separator=','):
+    """Angles smaller than 1 degree to minutes with sign ('-mm,m')."""
+    angles = np.asarray(angles, dtype=float).ravel()
+    if np.any(np.abs(angles) >= 1.0):
+        raise NameError('Angle larger than 1.0. Conversion to minutes failed.')
+    return _format_all('%5.1f', angles * 60, separator)
+
+
+def format_m(angles, separator=','):
+    """Angles to minutes only, with sign. Values rounding to zero are printed without sign."""
+    angles = np.asarray(angles, dtype=float).ravel()
+    minutes = _format_all('%3.1f', np.abs(angles) * 60)
+    zero = '%3.1f' % 0.0
+    return [('-' + m if negative and m != zero else m).replace('.', separator)
+            for m, negative in zip(minutes, (angles < 0).tolist())]
+
+
+def format_hm(times):
+    """Times in hours (>= 0) to lists of hour ('hh') and minute ('mm') strings."""
+    times = np.asarray(times, dtype=float).ravel()
+    if np.any(times < 0):
+        raise NameError('Invalid sign for time')
+    hours = np.floor(times).astype(int)
+    minutes = _format_all('%02.0f', (times % 1.0) * 60)
+    carry = [m == '60' for m in minutes]
+    hours = (hours + carry).tolist()
+    return _format_all('%02d', hours), ['00' if c else m for m, c in zip(minutes, carry)]
+
+
+def _split_dm(angles):
+    """Integer degrees and minutes, with the carry of minutes that round to 60,0."""
+    degrees = np.floor(angles).astype(int)
+    minutes = (angles % 1.0) * 60
+    # '%.1f' rounds the exact binary value, so compare with the formatted string to find the carries
+    carry = np.array([m == '60.0' for m in _format_all('%04.1f', minutes)], dtype=bool)
+    return degrees + carry, np.where(carry, 0.0, minutes)
+
+
+def _format_all(fmt, values, separator='.'):
+    """Formats all values with one %-operation and returns the list of strings."""
+    values = np.asarray(values).ravel().tolist()
+    if len(values) == 0:
+        return []
+    text = ((fmt + '\n') * len(values)) % tuple(values)
+    if separator != '.':
+        text = text.replace('.', separator)
+    return text.split('\n')[:-1]
@@ -0,0 +1,374 @@
+"""Calculation of the ephemerides of the day pages.
+
+All results are numbers in the records of ephemeris_data (DAY_DTYPE,
+STARS_DTYPE); converting them to strings is done by formatting and render.
+The JPL ephemeris is opened on first use, so importing this module has no
+side effects.
+
+  >>> from datetime import date, datetime
+  >>> from novasbook import compute_day, compute_range, compute_position
+  >>> day = compute_day(date(2024, 1, 1))                  # DAY_DTYPE record
+  >>> gha, dec = compute_position('venus', datetime(2024, 1, 1, 12, 30))
+  >>> results = compute_range(date(2024, 1, 1), date(2024, 12, 31), jobs=4)
+"""
+from collections import namedtuple
+from datetime import timedelta
+from math import atan, pi
+import multiprocessing
+
+import numpy
+
+from novas import compat as novas
+from novas.compat import eph_manager
+
+from . import delta_t, events, profiling, sidereal
+from .ephemeris_cache import ChebyshevEphemeris, NovasEphemeris
+from .ephemeris_data import BODIES, HOURS, HP_MOON_HOURS, MAX_TRANSITS, LATITUDES, SUN_EVENTS, MOON_EVENTS, new_day
+from .lunation import Lunations
+from .result_cache import make_key, ephemeris_identity, object_identity, cat_entry_identity
+from .transit import find_transits
+
+__all__ = ['compute_day', 'compute_range', 'compute_position', 'iter_pages', 'configure_ephemerides', 'open_ephemeris',
+           'calculate_ephemerides_day', 'calculate_page', 'calculate_positions', 'calculate_delta_TT_UT1']
+
+# define novas objects List of (novas_object, planet_name)
+sky_objects = []
+sky_objects.append((novas.make_object(0, 10, 'sun', None), 'sun'))
+sky_objects.append((novas.make_object(0, 11, 'moon', None), 'moon'))
+sky_objects.append((novas.make_object(0, 2, 'venus', None), 'venus'))
+sky_objects.append((novas.make_object(0, 4, 'mars', None), 'mars'))
+sky_objects.append((novas.make_object(0, 5, 'jupiter', None), 'jupiter'))
+sky_objects.append((novas.make_object(0, 6, 'saturn', None), 'saturn'))
+assert tuple(planet_name for (planet, planet_name) in sky_objects) == BODIES    # order of columns in the results
+
+# Source for apparent places of sun, moon and planets. Either the Chebyshev cache (default) or novas itself,
+# both provide app_planet(jd_tt, planet) for single dates and arrays. Set by configure_ephemerides().
+ephemerides = ChebyshevEphemeris()
+
+# Phases of the moon, found with the same ephemerides. Set by configure_ephemerides().
+lunations = Lunations(ephemerides, sky_objects[0][0], sky_objects[1][0])
+
+# Accuracy flag of all NOVAS reductions (app_planet, sidereal time, star places): 0 = full, 1 = reduced. Set by
+# configure_ephemerides(), see ACCURACIES.
+novas_accuracy = 0
+ACCURACIES = {'full': 0, 'draft': 1}
+
+# Settings of the ephemerides: (tolerance, use_cache, accuracy). Part of the keys of the result cache.
+settings = (1e-6, True, 0)
+
+# Everything a page is calculated with: ephemerides, phases of the moon and NOVAS accuracy. The calculation uses the
+# module globals above (current_source()), unless it is given another source, e.g. for a check in full accuracy
+# next to a book in draft accuracy (see accuracy.py). Sources keep their fits, so they are worth keeping.
+Source = namedtuple('Source', 'ephemerides lunations accuracy')
+
+def make_source (tolerance, use_cache=True, accuracy=0):
+    if use_cache:
+        source_ephemerides = ChebyshevEphemeris(tolerance=tolerance, accuracy=accuracy)
+    else:
+        source_ephemerides = NovasEphemeris(accuracy=accuracy)
+    return Source(source_ephemerides, Lunations(source_ephemerides, sky_objects[0][0], sky_objects[1][0]), accuracy)
+
+def current_source ():
+    return Source(ephemerides, lunations, novas_accuracy)
+
+def configure_ephemerides (tolerance, use_cache=True, accuracy=0):
+    global ephemerides, lunations, previous_day, settings, novas_accuracy
+    ephemerides, lunations, novas_accuracy = make_source(tolerance, use_cache, accuracy)
+    settings = (tolerance, use_cache, accuracy)
+    previous_day = None
+
+# Values returned by eph_manager.ephem_open(): (jd_start, jd_end, number). None until opened by open_ephemeris().
+ephemeris_info = None
+
+# Opens the JPL ephemeris database (file in environment variable EPHEMERIS_FILE) once per process
+def open_ephemeris ():
+    global ephemeris_info
+    if ephemeris_info is None:
+        ephemeris_info = eph_manager.ephem_open()
+    return ephemeris_info
+
+# Results of the last day calculated in this process. Its values at 24:00 are the values at 0:00 of the next day,
+# so days calculated in sequence (serially or in the chunks of a worker) share this sample.
+previous_day = None
+
+def calculate_grt_planet (jd_tt, theta, planet, source=None):
+        ra, dec, dis = (source or current_source()).ephemerides.app_planet(jd_tt, planet)
+        return sidereal.hour_angle(theta, ra)   # calculate hour angle from GHA and planet's right ascension
+
+# Calculates transit times of the spring point (planet is None) or a planet from the hourly GHA-samples of the day
+# (hours 0..24), with TT-UT1 of the same hours (delta_TT_UT1, interpolated between them like the Delta T table).
+# Returns list of transit times in hours, the list is empty if there is no transit this day.
+def calculate_transits (year, month, day, delta_TT_UT1, gha_hourly, planet=None, source=None):
+    source = source or current_source()
+    jd_ut1_day = novas.julian_date(year, month, day, 0)     # Calculate Julian date for 0:00 this day.
+    delta_TT_UT1 = list(delta_TT_UT1)
+    def gha_at (time_ut1):
+        jd_ut1 = jd_ut1_day + time_ut1 / 24.0
+        delta = float(numpy.interp(time_ut1, range(HOURS), delta_TT_UT1))
+        theta = sidereal.gast(jd_ut1, delta * 3600.0, source.accuracy)
+        if planet is None:
+            return theta
+        return calculate_grt_planet (jd_ut1 + delta / 24.0, theta, planet, source)
+    return find_transits(gha_hourly, gha_at)
+
+# Find average differences over one day for use in interpolation/correction tables (valid for planetes and sun)
+# from GHA and declination at 0:00 and 24:00. Returns hourly GHA difference and dec-difference in degrees.
+def calculate_avg_differences (grt_start, grt_end, dec_start, dec_end):
+    d_grt = (grt_end - grt_start + 180.0) % 360.0 - 180.0     # change of GHA in 24 h beyond a full turn
+    d_grt_hourly = d_grt / 24.0   # calculate average hourly difference and subtract average sideral change of GRT.
+    d_dec = (dec_end - dec_start) / 24.0
+    return d_grt_hourly, d_dec
+    
+
+    
+def horizontal_parallaxe (distance):      # calculates horizontal parallaxe for body with given distance from earth (unit: AU). Returns HP in degrees
+    return atan(0.0000426343 / distance) * 360 / (2 * pi)  # HP in degrees = atan (earth_raduis[AU] / distance [AU])
+
+# Calculates all ephemerides of sun, moon, planets and spring point for one day, with TT-UT1 for every hour
+# 0..24 (delta_TT_UT1, from calculate_delta_TT_UT1). Returns the numbers in a record of type
+# ephemeris_data.DAY_DTYPE, format_day() converts them to strings for the tables. With another source than the
+# module globals, the day is calculated on its own (nothing shared with previous_day).
+def calculate_ephemerides_day (year, month, day, delta_TT_UT1, source=None):
+    global previous_day
+    own_source = source is not None
+    source = source or current_source()
+    results = new_day()
+    results['year'], results['month'], results['day'] = year, month, day
+    results['delta_TT_UT1'] = delta_TT_UT1
+
+    # Julian dates of TT and UT1 for every hour of the day and 24:00 (= 0:00 next day), which closes the last hour
+    # for the transit search and the hourly differences of the moon. Sidereal time and positions are calculated for
+    # all hours at once. 0:00 is taken from 24:00 of the previous day, if that was calculated just before with
+    # the same TT-UT1 at midnight. Both are calculated for exactly the same Julian dates, so the results are the same.
+    jd_ut1_day = novas.julian_date(year, month, day, 0.0)
+    results['jd_ut1'] = jd_ut1_day
+    hours = numpy.arange(HOURS)
+    jd_ut1 = jd_ut1_day + hours / 24.0
+    jd_tt = jd_ut1 + delta_TT_UT1 / 24.0
+    shared = (not own_source and previous_day is not None and previous_day['jd_ut1'] + 1.0 == jd_ut1_day
+              and previous_day['delta_TT_UT1'][HOURS - 1] == delta_TT_UT1[0])
+    first = 1 if shared else 0
+    if shared:
+        for name in ('spr_p', 'gha', 'dec'):
+            results[name][0] = previous_day[name][HOURS - 1]
+
+    # calculate Greenwich hour angle (GHA) for spring point
+    theta = sidereal.gast(jd_ut1[first:], delta_TT_UT1[first:] * 3600.0, source.accuracy)
+    results['spr_p'][first:] = theta
+
+    # calculate Greenwich hour angle and declination for planets (sun and moon are considered planets)
+    for n_planet, (planet, planet_name) in enumerate(sky_objects):
+        ra, dec, dis = source.ephemerides.app_planet(jd_tt[first:], planet)
+        results['gha'][first:, n_planet] = sidereal.hour_angle(theta, ra)
+        results['dec'][first:, n_planet] = dec
+        if planet_name == 'moon':
+            dis_moon = dis.tolist()
+            # Get horizontal parallaxe at UT1 = 4, 12, 20
+            results['hp_moon'] = [horizontal_parallaxe (dis_moon[time_ut1 - first]) for time_ut1 in HP_MOON_HOURS]
+
+    # Moon needs some more data: Differences to the next hour, taken between the hourly values
+    # Difference to NJ: Difference is given with sign. NJ gives it without sign for moon.
+    # NJ makes rounding errors. This calculation uses higher precision all the way until conversion to string.
+    # Differences of +/- 0.1 min to NJ may occur.
+    n_moon = BODIES.index('moon')
+    grt = results['gha'][:, n_moon]
+    dec = results['dec'][:, n_moon]
+
+    # Hourly declination difference
+    results['moon_d_dec'] = dec[1:] - dec[:-1]
+
+    # Hourly GRT-difference minus "average" hourly difference used for interpolation tables
+    grt_diff = grt[1:] - grt[:-1] - 14.31666667
+    results['moon_d_gha'] = numpy.where(grt_diff < 0, grt_diff + 360.0, grt_diff)
+
+    with profiling.stage('transits', day=(year, month, day)):
+        # Calculate transit time for spring point
+        transit_times = calculate_transits (year, month, day, delta_TT_UT1, results['spr_p'].tolist(), source=source)
+        results['transit_spr_p'][:len(transit_times)] = transit_times[:MAX_TRANSITS]
+
+        # Transit times for planets, average differences and horizontal parallaxe
+        for n_planet, (planet, planet_name) in enumerate(sky_objects):
+            gha_hourly = results['gha'][:, n_planet].tolist()
+            dec_hourly = results['dec'][:, n_planet].tolist()
+            transit_times = calculate_transits (year, month, day, delta_TT_UT1, gha_hourly, planet, source)[:MAX_TRANSITS]
+            results['transit'][n_planet, :len(transit_times)] = transit_times
+            if planet_name != 'moon': 
+                results['diff_gha'][n_planet], results['diff_dec'][n_planet] = calculate_avg_differences (gha_hourly[0], gha_hourly[24], dec_hourly[0], dec_hourly[24])
+                ra, dec, dis = source.ephemerides.app_planet(jd_ut1_day + 0.5, planet)   # use "middle of day" for finding parallaxe
+                results['hp'][n_planet] = horizontal_parallaxe (dis)
+                if planet_name == 'sun':
+                    results['sd_sun'] = atan(0.00465476/dis) * 360 / (2 * pi)
+
+    # Rising, setting and twilight for all latitudes from the hourly GHA and declination. The moon's horizon depends
+    # on its parallax, the one at 12:00 is used for the whole day.
+    with profiling.stage('events', day=(year, month, day)):
+        n_sun = BODIES.index('sun')
+        results['sun_events'] = events.find_events(results['gha'][:, n_sun], results['dec'][:, n_sun], LATITUDES,
+                                                   [altitude for (name, altitude, rising) in SUN_EVENTS],
+                                                   [rising for (name, altitude, rising) in SUN_EVENTS])
+        results['moon_events'] = events.find_events(results['gha'][:, n_moon], results['dec'][:, n_moon], LATITUDES,
+                                                    [events.moon_horizon(results['hp_moon'][1])] * len(MOON_EVENTS), [True, False])
+
+    # Age of the moon at 12:00 UT1: days since the last new moon
+    with profiling.stage('lunation', day=(year, month, day)):
+        results['age_moon'] = source.lunations.age(jd_ut1_day + 0.5 + delta_TT_UT1[12] / 24.0)
+    if not own_source:
+        previous_day = results
+    return results
+
+# Time difference TT - UT1 in hours at every hour 0..24 UT1 of the given day (array), from the Delta T table (see
+# delta_t). TT - UTC (leap seconds + 32.184 s) would ignore UT1 - UTC, which is up to 0.9 s. The value at 24:00 is
+# the one at 0:00 of the next day, so the days fit together at midnight.
+def calculate_delta_TT_UT1 (year, month, day):
+    jd_ut1 = novas.julian_date(year, month, day, 0.0) + numpy.arange(HOURS) / 24.0
+    return delta_t.delta_TT_UT1(jd_ut1) / 3600.0  # time difference in hours
+
+# Calculates everything needed for one day page: ephemerides of sun, moon and planets and the star positions
+# for the page's half of the star list. Depends only on the date and the page parity, so pages can be calculated
+# in any order and in separate processes. Parts that are given (from the result cache) are not calculated again.
+# source: see make_source(), the module globals if None.
+def calculate_page (year, month, day, page_is_even, day_results=None, star_positions=None, source=None):
+    delta_TT_UT1 = calculate_delta_TT_UT1 (year, month, day)
+
+    # Calculate ephemerides for the selected day
+    if day_results is None:
+        with profiling.stage('ephemerides', day=(year, month, day)):
+            day_results = calculate_ephemerides_day (year, month, day, delta_TT_UT1, source)
+
+    # Calculate ephemerides for stars in a two-day-period
+    if star_positions is None:
+        from . import stars
+        with profiling.stage('stars', day=(year, month, day)):
+            star_positions = stars.calculate_star_positions (stars.star_epoch (year, month, day, page_is_even), page_is_even, year,
+                                                             (source or current_source()).accuracy)
+
+    return day_results, star_positions
+
+# Wrapper for Pool.imap, which passes only one argument: tuple (year, month, day, page_is_even, day_results, star_positions)
+# A profiled worker process sends its records along with the results.
+def calculate_page_job (page):
+    results = calculate_page (*page)
+    if profiling.profiler is not None and profiling.profiler.worker:
+        return results + (profiling.profiler.drain(),)
+    return results
+
+# Keys for the result cache: one for the ephemerides of sun, moon and planets, one for the stars of the page.
+# They contain everything the results depend on, so changed inputs never hit outdated results.
+def page_cache_keys (year, month, day, page_is_even, ephemeris_id, tolerance, use_cache, accuracy=0):
+    delta_TT_UT1 = calculate_delta_TT_UT1 (year, month, day).tolist()
+    key_day = make_key('day', (year, month, day), delta_TT_UT1, ephemeris_id, tolerance, use_cache, accuracy,
+                       [(object_identity(planet), planet_name) for (planet, planet_name) in sky_objects])
+    from . import stars
+    key_stars = make_key('stars', (year, month, day), page_is_even, delta_TT_UT1, ephemeris_id, accuracy,
+                         [(star_no, cat_entry_identity(star)) for (star_no, star) in stars.stars_of_page (page_is_even)])
+    return key_day, key_stars
+
+# Every worker process needs its own handle to the ephemerides database and its own ephemerides cache
+def init_worker (tolerance, use_cache, accuracy=0, profile=False):
+    global ephemeris_info
+    if profile:
+        profiling.enable(worker=True)
+    ephemeris_info = eph_manager.ephem_open()
+    configure_ephemerides(tolerance, use_cache, accuracy)
+
+# List of all pages from first_day to last_day (dates): (year, month, day, page_is_even). Page parity alternates,
+# first page is even.
+def book_pages (first_day, last_day):
+    return [(dt.year, dt.month, dt.day, 1 - (n % 2)) for n, dt in
+            enumerate(first_day + timedelta(days=n) for n in range((last_day - first_day).days + 1))]
+
+# Keys of the result cache (key_day, key_stars) for pages with the opened ephemeris and the current settings
+def result_keys (pages):
+    ephemeris_id = ephemeris_identity(*open_ephemeris())
+    return [page_cache_keys(*page, ephemeris_id, *settings) for page in pages]
+
+# Results for all pages from first_day to last_day in order: (page, day_results, star_positions). Pages are
+# calculated when they are needed, in the worker processes of pool (multiprocessing.Pool with initializer
+# init_worker) if given. Results found in cache (result_cache.ResultCache) are not calculated again, new results
+# are stored there. Pages n with skip[n] true are neither looked up nor calculated, they come as (page, None, None).
+def iter_pages (first_day, last_day, pool=None, cache=None, skip=None):
+    from . import stars
+    pages = book_pages (first_day, last_day)
+    if skip is None:
+        skip = [False] * len(pages)
+
+    # Look up results of earlier runs. Only pages with missing parts have to be calculated.
+    cached = [(None, None)] * len(pages)
+    if cache is not None:
+        keys = [None] * len(pages)
+        needed = [n for n in range(len(pages)) if not skip[n]]
+        with profiling.stage('result cache'):
+            for n, page_keys in zip(needed, result_keys ([pages[n] for n in needed])):
+                keys[n] = page_keys
+                cached[n] = (cache.get(page_keys[0]), cache.get(page_keys[1]))
+
+    # Stars of all pages without cached positions, reduced in one pass per page parity. The pages to be calculated
+    # get them with their job.
+    missing_stars = [n for n, (day_results, star_positions) in enumerate(cached) if star_positions is None and not skip[n]]
+    with profiling.stage('stars of all pages'):
+        stars_pages = stars.calculate_stars_pages([pages[n] for n in missing_stars])
+    for n, star_positions in zip(missing_stars, stars_pages):
+        cached[n] = (cached[n][0], star_positions)
+        if cache is not None:
+            cache.put(keys[n][1], star_positions)
+    jobs = [page + cached[n] for n, page in enumerate(pages) if cached[n][0] is None and not skip[n]]
+
+    # imap returns the results in the order of the pages, no matter which worker finished first, so the results
+    # are identical to the ones from a serial run.
+    if pool is not None:
+        calculated = pool.imap(calculate_page_job, jobs, chunksize=8)
+    else:
+        calculated = map(calculate_page_job, jobs)
+
+    # From cache if complete, else the next calculated page
+    for n, (page, (day_results, star_positions)) in enumerate(zip(pages, cached)):
+        if skip[n]:
+            yield page, None, None
+            continue
+        if day_results is None:
+            calculated_page = next(calculated)
+            day_results, star_positions = calculated_page[:2]
+            if len(calculated_page) > 2:
+                profiling.profiler.merge(calculated_page[2])
+            if cache is not None:
+                cache.put(keys[n][0], day_results)
+        yield page, day_results, star_positions
+
+# Ephemerides of sun, moon, planets and spring point for one day (datetime.date). Returns a DAY_DTYPE record.
+def compute_day (day):
+    open_ephemeris()
+    return calculate_ephemerides_day (day.year, day.month, day.day, calculate_delta_TT_UT1 (day.year, day.month, day.day))
+
+# All pages from first_day to last_day (dates), calculated in jobs processes. Returns a list of
+# (page, day_results, star_positions) with page = (year, month, day, page_is_even), as used by render().
+def compute_range (first_day, last_day, jobs=1, cache=None):
+    open_ephemeris()
+    if jobs <= 1:
+        return list(iter_pages (first_day, last_day, cache=cache))
+    with multiprocessing.Pool(jobs, initializer=init_worker, initargs=settings) as pool:
+        return list(iter_pages (first_day, last_day, pool, cache))
+
+# Greenwich hour angle and declination in degrees of one body (name from ephemeris_data.BODIES) at a time UT1
+# (datetime). Only calculates this single position.
+def compute_position (body, when):
+    open_ephemeris()
+    planet = sky_objects[BODIES.index(body)][0]
+    hours = when.hour + when.minute / 60.0 + (when.second + when.microsecond / 1e6) / 3600.0
+    jd_ut1 = novas.julian_date(when.year, when.month, when.day, 0.0) + hours / 24.0
+    delta_TT_UT1 = delta_t.delta_TT_UT1(jd_ut1) / 3600.0
+    theta = sidereal.gast(jd_ut1, delta_TT_UT1 * 3600.0, novas_accuracy)
+    ra, dec, dis = ephemerides.app_planet(jd_ut1 + delta_TT_UT1 / 24.0, planet)
+    return float(sidereal.hour_angle(theta, ra)), dec
+
+# GHA, declination and horizontal parallax in degrees of a body (name from ephemeris_data.BODIES or 'aries' for the
+# spring point) at the Julian dates jd_ut1 (array, UT1) with TT-UT1 delta_TT_UT1 (hours, scalar or array).
+# Vectorized version of compute_position(), the sidereal time uses the interpolated equation of the equinoxes.
+# The spring point has no declination and parallax (NaN).
+def calculate_positions (body, jd_ut1, delta_TT_UT1):
+    jd_ut1 = numpy.asarray(jd_ut1, dtype=float)
+    theta = sidereal.gast(numpy.atleast_1d(jd_ut1), delta_TT_UT1 * 3600.0, novas_accuracy).reshape(jd_ut1.shape)
+    if body == 'aries':
+        return theta, numpy.full(jd_ut1.shape, numpy.nan), numpy.full(jd_ut1.shape, numpy.nan)
+    planet = sky_objects[BODIES.index(body)][0]
+    ra, dec, dis = ephemerides.app_planet(jd_ut1 + delta_TT_UT1 / 24.0, planet)
+    return sidereal.hour_angle(theta, ra), dec, numpy.degrees(numpy.arctan(0.0000426343 / dis))
@@ -0,0 +1,165 @@
+"""Command line of novas-book.py: generates the books for years or date ranges."""
+import argparse
+from datetime import date
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+
+from novas import compat as novas
+
+from . import calculation, delta_t, formatting, profiling
+from .accuracy import check_accuracy
+from .almanac import AlmanacWriter
+from .pdf_build import ChunkWriter, build_pdf
+from .formatting import weekdays
+from .rendering import render_book
+
+__all__ = ['main']
+
+# Books to generate: (file name, first day, last day)
+def book_for_year (year):
+    return ('Ephemeriden_{}.tex'.format(year), date(year, 1, 1), date(year, 12, 31))
+
+def book_for_range (first_day, last_day):
+    return ('Ephemeriden_{}_{}.tex'.format(first_day.isoformat(), last_day.isoformat()), first_day, last_day)
+
+# Prints the progress
+def progress (page):
+    year, month, day, page_is_even = page
+    print ('calculating page for {}, {}.{}.{}'.format(weekdays[date(year, month, day).weekday()], day, month, year))
+
+def progress_pdf (name, start):
+    print ('typesetting {} from page {}'.format(name, start))
+
+def main (argv=None):
+    parser = argparse.ArgumentParser(description='Generates ephemerides in the style of the German Nautical Yearbook.')
+    parser.add_argument('years', metavar='year', type=int, nargs='*', help='years to calculate, one book per year')
+    parser.add_argument('--from', dest='first_day', metavar='DATE', type=date.fromisoformat, help='first day (YYYY-MM-DD) of a book for a date range, needs --to')
+    parser.add_argument('--to', dest='last_day', metavar='DATE', type=date.fromisoformat, help='last day (YYYY-MM-DD) of a book for a date range')
+    parser.add_argument('--jobs', '-j', type=int, default=1, help='number of processes calculating day pages in parallel (default: 1)')
+    parser.add_argument('--tolerance', type=float, default=1e-6, help='maximum error of the Chebyshev ephemerides cache against NOVAS in degrees (default: 1e-6)')
+    parser.add_argument('--accuracy', choices=sorted(calculation.ACCURACIES), default='full', help='full: NOVAS in full accuracy; draft: reduced accuracy of NOVAS for all reductions, faster, for proofs (default: full)')
+    parser.add_argument('--check-fraction', type=float, default=0.05, metavar='FRACTION', help='with --accuracy draft, fraction of the pages calculated again in full accuracy to report the maximum deviation per column (default: 0.05, 0: no check)')
+    parser.add_argument('--no-ephemeris-cache', dest='ephemeris_cache', action='store_false', help='call NOVAS for every position instead of using the Chebyshev cache')
+    parser.add_argument('--profile', action='store_true', help='time every stage and NOVAS call, write output/profile.txt (summary) and output/profile.json (Chrome trace)')
+    parser.add_argument('--events', action='store_true', help='print a table of rising, setting and twilight for a grid of latitudes on every day page (experimental, needs --experimental: the layout has not been typeset with pdflatex yet)')
+    parser.add_argument('--almanac', action='store_true', help='also write a binary almanac file (.alm) of every book for memory-mapped access, see novasbook/almanac.py')
+    parser.add_argument('--pdf', action='store_true', help='typeset the books with pdflatex in chunks of one month, in parallel with --jobs processes; unchanged chunks are not typeset again (experimental, needs --experimental: not yet tried with a full book, and links and the outline of the PDF do not span the months)')
+    parser.add_argument('--latex', default='pdflatex', help='LaTex command for --pdf (default: pdflatex)')
+    parser.add_argument('--experimental', action='store_true', help='allow the experimental options, whose output has not been checked with pdflatex yet: --events, --pdf')
+    parser.add_argument('--cache', metavar='FILE', help='keep calculated results and rendered pages in this SQLite file, later runs rebuild only pages with changed inputs')
+    args = parser.parse_args(argv)
+
+    books = [book_for_year (year) for year in args.years]
+    if (args.first_day is None) != (args.last_day is None):
+        print ('Error: A date range needs both --from and --to.')
+        sys.exit(2)
+    if args.first_day is not None:
+        if args.first_day > args.last_day:
+            print ('Error: First day of the date range is after the last day.')
+            sys.exit(2)
+        books.append(book_for_range (args.first_day, args.last_day))
+    if not books:
+        print ('Error: Nothing to do. Give at least one year or a date range with --from and --to.')
+        sys.exit(2)
+    for (filename, startdate, enddate) in books:
+        if (startdate.year < 1960) or (enddate.year > 2100):
+            print ('Error: Invalid year. Valid range for year: 1960..2100')
+            sys.exit(2)
+    if not 0.0 <= args.check_fraction <= 1.0:
+        print ('Error: Invalid fraction for --check-fraction. Valid range: 0..1')
+        sys.exit(2)
+    if args.jobs < 1:
+        print ('Error: Invalid number of jobs. At least one job is needed.')
+        sys.exit(2)
+    if args.events and not args.experimental:
+        print ('Error: --events is experimental, the table has not been typeset with pdflatex yet. Add --experimental to use it anyway.')
+        sys.exit(2)
+    if args.pdf and not args.experimental:
+        print ('Error: --pdf is experimental, the chunked build has not been tried on a book with pdflatex yet. Add --experimental to use it anyway.')
+        sys.exit(2)
+    if args.pdf and shutil.which(args.latex) is None:
+        print ('Error: {} not found, it is needed for --pdf.'.format(args.latex))
+        sys.exit(2)
+
+    # Everything below is set up once and shared by all books: ephemerides database, Chebyshev fits, Delta T table,
+    # star catalogues, templates, worker processes and result cache. Books are calculated in the given order, so the
+    # last day of a book passes its values at 24:00 to the first day of the next one, if they follow each other.
+    formatting.event_tables = args.events
+    if args.profile:
+        profiling.enable()
+    calculation.open_ephemeris()
+    calculation.configure_ephemerides(args.tolerance, args.ephemeris_cache, calculation.ACCURACIES[args.accuracy])
+    for (filename, startdate, enddate) in books:
+        delta_t.default().prepare(novas.julian_date(startdate.year, startdate.month, startdate.day, 0.0),
+                                  novas.julian_date(enddate.year, enddate.month, enddate.day, 0.0) + 1.0)
+
+    # Calculate pages in parallel if requested
+    pool = None
+    if args.jobs > 1:
+        pool = multiprocessing.Pool(args.jobs, initializer=calculation.init_worker, initargs=calculation.settings + (args.profile,))
+
+    # Results of earlier runs
+    cache = None
+    if args.cache is not None:
+        from .result_cache import ResultCache
+        cache = ResultCache(args.cache)
+
+    # Output files (LaTex)
+    dir_fd = os.open('./output', os.O_RDONLY)
+    def opener(path, flags):
+        return os.open(path, flags, dir_fd=dir_fd)
+
+    # With result cache, only pages with changed inputs are calculated and rendered again
+    for (filename, startdate, enddate) in books:
+        almanac_file = almanac = chunks = None
+        if args.almanac:
+            almanac_file = open(os.path.splitext(filename)[0] + '.alm', 'wb', opener=opener)
+            almanac = AlmanacWriter(almanac_file)
+        if args.pdf:
+            chunks = ChunkWriter(os.path.join('output', os.path.splitext(filename)[0]))
+        with open(filename, 'w', opener=opener) as outfile, profiling.stage('book', file=filename):
+            reused, rebuilt = render_book (startdate, enddate, outfile, pool, cache, progress=progress, almanac=almanac, chunks=chunks)
+        if cache is not None:
+            cache.commit()
+            print ('{}: {} pages reused, {} pages rebuilt'.format(filename, reused, rebuilt))
+        print ('{} written'.format(filename))
+        if almanac is not None:
+            almanac.close()
+            almanac_file.close()
+            print ('{} written'.format(almanac_file.name))
+        if args.accuracy == 'draft' and args.check_fraction > 0.0:
+            with profiling.stage('accuracy check', file=filename):
+                report = check_accuracy (calculation.book_pages (startdate, enddate), args.check_fraction)
+            print ('{}: {}'.format(filename, report.summary()))
+        if chunks is not None:
+            pdf_file = os.path.join('output', os.path.splitext(filename)[0] + '.pdf')
+            try:
+                with profiling.stage('pdf', file=pdf_file):
+                    typeset, skipped = build_pdf (chunks.directory, chunks.names, pdf_file, args.jobs, args.latex, progress=progress_pdf, even=chunks.even)
+            except RuntimeError as error:
+                print ('Error: {}'.format(error))
+                sys.exit(1)
+            print ('{} written: {} chunks typeset, {} unchanged'.format(os.path.basename(pdf_file), typeset, skipped))
+
+    if pool is not None:
+        pool.close()
+        pool.join()
+    if cache is not None:
+        cache.close()
+
+    # Timing of stages and NOVAS calls, of all processes
+    if args.profile:
+        summary = profiling.profiler.summary()
+        print (summary)
+        with open('profile.txt', 'w', opener=opener) as f:
+            print (summary, file=f)
+        with open('profile.json', 'w', opener=opener) as f:
+            json.dump(profiling.profiler.chrome_trace(), f)
+        print ('profile.txt and profile.json written')
+    os.close(dir_fd)
+
+    # Print something to shell
+    print ('done')
@@ -0,0 +1,149 @@
+"""Time difference TT - UT1 (Delta T).
+
+The hours of the tables are UT1, the ephemerides are calculated in TT. The
+difference is taken from a table: an IERS Earth orientation file (finals.all,
+finals2000A.data: UT1-UTC per day, converted with the leap seconds) or a
+table of Delta T like USNO deltat.data (year month day Delta_T). By default
+the table in data/deltat.data is used, the environment variable DELTA_T_FILE
+selects another one. After the end of the table, Delta T comes from the
+polynomials of Espenak and Meeus (NASA Five Millennium Canon of Solar
+Eclipses, 2006), shifted to continue the last value of the table.
+
+This extrapolation is a guess, and so are the books for years after the
+table (data/deltat.data ends with 2025-01-01 at 69.14 s). The polynomial
+rises by about 0.7 s per year up to 2050 (79.4 s in 2040) and faster
+after it (197 s in 2100), while the observed Delta T has been flat or
+slightly falling since 2020. An error of Delta T moves every body by its
+motion in that time at the same UT1: the moon by 0.55" per second, the sun
+and the planets by less than 0.05" per second. The tables print 0.1' (6"),
+so the moon's columns are off by 0.1' once Delta T is wrong by about 11 s,
+around 2040 if Delta T stays where it is, the other columns only near
+2100. For such years, give a table with current predictions (IERS
+finals2000A.data) in DELTA_T_FILE.
+
+The file is read once per process. The values at 0h UT1 of every day of the
+requested range are kept in an array, so a lookup is an index and a linear
+interpolation.
+
+  >>> delta_t = DeltaT()
+  >>> delta_t.prepare(jd_first, jd_last)         # optional, ranges are extended on demand
+  >>> delta_t.at(jd_ut1)                         # TT-UT1 in seconds, scalar or numpy array
+"""
+import os
+from datetime import datetime
+
+import numpy
+
+from . import profiling
+from .leapseconds import dTAI_UTC_from_utc
+
+__all__ = ['DeltaT', 'delta_TT_UT1', 'default', 'load_table', 'delta_t_model', 'DATA_DIR']
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+JD2000 = 2451544.5      # 2000-01-01 0h
+MJD0 = 2400000.5        # Julian date of MJD 0
+BLOCK = 366             # the lookup array is extended in blocks of days
+
+
+def delta_t_model(year):
+    """Delta T in seconds from the polynomials of Espenak and Meeus, year as decimal year (scalar or array)."""
+    y = numpy.asarray(year, dtype=float)
+    t = y - 2000.0
+    return numpy.select(
+        [y < 1961.0, y < 1986.0, y < 2005.0, y < 2050.0],
+        [29.07 + 0.407 * (y - 1950.0) - (y - 1950.0) ** 2 / 233.0 + (y - 1950.0) ** 3 / 2547.0,
+         45.45 + 1.067 * (y - 1975.0) - (y - 1975.0) ** 2 / 260.0 - (y - 1975.0) ** 3 / 718.0,
+         63.86 + 0.3345 * t - 0.060374 * t ** 2 + 0.0017275 * t ** 3 + 0.000651814 * t ** 4 + 0.00002373599 * t ** 5,
+         62.92 + 0.32217 * t + 0.005589 * t ** 2],
+        -20.0 + 32.0 * ((y - 1820.0) / 100.0) ** 2 - 0.5628 * (2150.0 - y))
+
+
+def load_table(filename):
+    """(Julian dates, Delta T in seconds) from an IERS finals file or a USNO deltat.data-like table."""
+    jd = []
+    delta_t = []
+    with open(filename) as f:
+        for line in f:
+            if not line.strip() or line.startswith('#'):
+                continue
+            if len(line.split()) == 4:
+                year, month, day, value = line.split()
+                jd.append(JD2000 + (datetime(int(year), int(month), int(day)) - datetime(2000, 1, 1)).days)
+                delta_t.append(float(value))
+            elif line[58:68].strip():
+                # IERS finals: MJD in columns 8-15, UT1-UTC [s] in columns 59-68 (empty after the predictions)
+                mjd = float(line[7:15])
+                year, month, day = int(line[0:2]), int(line[2:4]), int(line[4:6])
+                year += 1900 if year >= 73 else 2000
+                leapseconds = dTAI_UTC_from_utc(datetime(year, month, day)).seconds
+                jd.append(mjd + MJD0)
+                delta_t.append(32.184 + leapseconds - float(line[58:68]))
+    if len(jd) < 2:
+        raise ValueError('No Delta T table in {}'.format(filename))
+    order = numpy.argsort(jd)
+    return numpy.array(jd)[order], numpy.array(delta_t)[order]
+
+
+class DeltaT(object):
+    """TT - UT1 from a table and the polynomial model beyond it, with a lookup array per day."""
+
+    def __init__(self, filename=None):
+        if filename is None:
+            filename = os.environ.get('DELTA_T_FILE') or os.path.join(DATA_DIR, 'deltat.data')
+        self.filename = filename
+        with profiling.stage('delta_t table'):
+            self.table_jd, self.table_delta_t = load_table(filename)
+        self.first_jd = None
+        self.days = numpy.empty(0)
+
+    def evaluate(self, jd):
+        """Delta T in seconds at Julian dates jd without the lookup array."""
+        jd = numpy.asarray(jd, dtype=float)
+        year = 2000.0 + (jd - JD2000) / 365.25
+        first_jd, last_jd = self.table_jd[0], self.table_jd[-1]
+        inside = numpy.interp(jd, self.table_jd, self.table_delta_t)
+        after = delta_t_model(year) - delta_t_model(2000.0 + (last_jd - JD2000) / 365.25) + self.table_delta_t[-1]
+        before = delta_t_model(year) - delta_t_model(2000.0 + (first_jd - JD2000) / 365.25) + self.table_delta_t[0]
+        return numpy.where(jd > last_jd, after, numpy.where(jd < first_jd, before, inside))
+
+    def prepare(self, first_jd, last_jd):
+        """Calculates the values at 0h UT1 of all days from first_jd to last_jd (and some more)."""
+        first = JD2000 + BLOCK * numpy.floor((first_jd - JD2000) / BLOCK)
+        last = JD2000 + BLOCK * numpy.ceil((last_jd - JD2000) / BLOCK + 1e-9)
+        if self.first_jd is not None:
+            if first >= self.first_jd and last <= self.first_jd + len(self.days) - 1:
+                return
+            first = min(first, self.first_jd)
+            last = max(last, self.first_jd + len(self.days) - 1)
+        self.first_jd = float(first)
+        self.days = self.evaluate(first + numpy.arange(int(last - first) + 1))
+
+    def at(self, jd_ut1):
+        """TT - UT1 in seconds at Julian date(s) jd_ut1 (UT1), interpolated linearly between days."""
+        scalar = numpy.isscalar(jd_ut1)
+        jd_ut1 = numpy.asarray(jd_ut1, dtype=float)
+        if self.first_jd is None or jd_ut1.min() < self.first_jd or jd_ut1.max() >= self.first_jd + len(self.days) - 1:
+            self.prepare(jd_ut1.min(), jd_ut1.max())
+        x = jd_ut1 - self.first_jd
+        n = numpy.floor(x).astype(int)
+        f = x - n
+        delta_t = self.days[n] * (1.0 - f) + self.days[n + 1] * f
+        return float(delta_t) if scalar else delta_t
+
+
+# Table of the process, loaded on first use
+_default = None
+
+
+def default():
+    """The DeltaT of this process (table from DELTA_T_FILE or data/deltat.data)."""
+    global _default
+    if _default is None:
+        _default = DeltaT()
+    return _default
+
+
+def delta_TT_UT1(jd_ut1):
+    """TT - UT1 in seconds at Julian date(s) jd_ut1 (UT1) from the default table."""
+    return default().at(jd_ut1)
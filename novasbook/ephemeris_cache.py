@@ -0,0 +1,167 @@
+"""Chebyshev-fitted cache for apparent places of sun, moon and planets.
+
+novas.app_planet() is a full-precision reduction and by far the most expensive
+call in novas-book. The positions of the bodies are smooth functions of time,
+so they can be evaluated by NOVAS at a few Chebyshev nodes per span of days
+and then be answered for any time within the span by polynomial evaluation.
+
+Spans are aligned to a fixed grid of Julian dates, so the fitted polynomials
+(and therefore all results) do not depend on the order in which times are
+requested. This keeps parallel runs identical to serial runs.
+
+  >>> ephemerides = ChebyshevEphemeris()
+  >>> ra, dec, dis = ephemerides.app_planet(jd_tt, moon)   # like novas.app_planet
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+from novas import compat as novas
+
+from . import profiling
+
+__all__ = ['ChebyshevEphemeris', 'NovasEphemeris']
+
+EPOCH = 2451544.5   # 2000-01-01 0:00, origin of the span grid
+
+
+class ChebyshevEphemeris(object):
+    """Drop-in replacement for novas.app_planet() answering from Chebyshev fits.
+
+    span:      length of one fitted span in days
+    nodes:     number of Chebyshev nodes (= NOVAS evaluations) per span and body
+    tolerance: maximum allowed difference to NOVAS in degrees for RA and Dec
+               (relative for the distance). Every fit is checked against NOVAS
+               at the ends of the span and midway between all nodes (the
+               extrema of the first omitted Chebyshev polynomial, where the
+               error of the interpolation peaks) and must stay below
+               margin * tolerance there. If the check fails, the number of
+               nodes is doubled up to max_nodes. Spans that cannot be fitted
+               within the tolerance even then (Venus and Mercury close to the
+               sun, where the light deflection changes quickly) are answered
+               by NOVAS directly.
+    accuracy:  accuracy flag passed on to novas.app_planet (0 = full, 1 = reduced)
+    max_spans: number of fitted spans kept in memory
+    """
+
+    margin = 0.5    # fraction of the tolerance allowed at the check points, for the error between them
+
+    def __init__(self, span=4.0, nodes=16, tolerance=1e-6, accuracy=0,
+                 max_nodes=64, max_spans=256):
+        self.span = span
+        self.nodes = nodes
+        self.tolerance = tolerance
+        self.accuracy = accuracy
+        self.max_nodes = max_nodes
+        self.max_spans = max_spans
+        self.fits = OrderedDict()
+        self.novas_calls = 0
+
+    def app_planet(self, jd_tt, ss_body):
+        """Apparent place (ra [h], dec [deg], distance [AU]) of ss_body at jd_tt.
+        Accepts a scalar or a numpy array of Julian dates (TT).
+        """
+        if np.isscalar(jd_tt):
+            start, half, coefficients, rows = self.fit(jd_tt, ss_body)
+            if rows is None:
+                return self._novas(jd_tt, ss_body)
+            ra, dec, dis = _clenshaw((jd_tt - start) / half - 1.0, rows)
+            return ra % 24.0, dec, dis
+        jd_tt = np.asarray(jd_tt, dtype=float)
+        result = np.empty((3,) + jd_tt.shape)
+        n_spans = np.floor((jd_tt - EPOCH) / self.span)
+        for n_span in np.unique(n_spans):
+            selected = n_spans == n_span
+            start, half, coefficients, rows = self.fit(EPOCH + n_span * self.span, ss_body)
+            if rows is None:
+                result[:, selected] = np.array([self._novas(jd, ss_body) for jd in jd_tt[selected]]).T
+            else:
+                result[:, selected] = np.polynomial.chebyshev.chebval((jd_tt[selected] - start) / half - 1.0,
+                                                                      coefficients)
+        result[0] %= 24.0
+        return result[0], result[1], result[2]
+
+    def fit(self, jd_tt, ss_body):
+        """Returns (start, half width, coefficients, coefficients as tuples) of the span containing jd_tt.
+        coefficients are None for spans answered by NOVAS directly."""
+        n_span = int((jd_tt - EPOCH) // self.span)
+        key = (ss_body.type, ss_body.number, n_span)
+        fit = self.fits.get(key)
+        if fit is None:
+            with profiling.stage('chebyshev fit'):
+                fit = self._fit_span(EPOCH + n_span * self.span, ss_body)
+            self.fits[key] = fit
+            if len(self.fits) > self.max_spans:
+                self.fits.popitem(last=False)
+        else:
+            self.fits.move_to_end(key)
+        return fit
+
+    def _novas(self, jd_tt, ss_body):
+        self.novas_calls += 1
+        return novas.app_planet(jd_tt, ss_body, self.accuracy)
+
+    def _fit_span(self, start, ss_body):
+        half = self.span / 2.0
+        n = self.nodes
+        while True:
+            # Chebyshev nodes of the first kind and coefficients by discrete cosine transform
+            k = np.arange(n)
+            theta = np.pi * (k + 0.5) / n
+            values = np.array([self._novas(start + half * (1.0 + x), ss_body) for x in np.cos(theta)])
+            values[:, 0] = np.unwrap(values[:, 0] * np.pi / 12.0) * 12.0 / np.pi  # RA continuous over 24h -> 0h
+            coefficients = 2.0 / n * np.cos(np.outer(k, theta)).dot(values)
+            coefficients[0] /= 2.0
+
+            error = self._check(start, half, coefficients, ss_body, np.cos(np.pi * np.arange(n + 1) / n))
+            if error > self.margin * self.tolerance and n < self.max_nodes:
+                n = n * 2
+                continue
+            if error > self.margin * self.tolerance:
+                return start, half, None, None
+            # Plain tuples of floats for the scalar evaluation, which is much faster than numpy for single values
+            return start, half, coefficients, tuple(tuple(float(c) for c in row) for row in coefficients[::-1])
+
+    def _check(self, start, half, coefficients, ss_body, check_points):
+        """Maximum deviation of the fit from NOVAS at the check points (positions in [-1, 1])."""
+        error = 0.0
+        for x in check_points:
+            ra, dec, dis = self._novas(start + half * (1.0 + x), ss_body)
+            ra_fit, dec_fit, dis_fit = np.polynomial.chebyshev.chebval(x, coefficients)
+            d_ra = abs((ra_fit - ra + 12.0) % 24.0 - 12.0) * 15.0
+            error = max(error, d_ra, abs(dec_fit - dec), abs(dis_fit / dis - 1.0))
+        return error
+
+
+def _clenshaw(x, rows):
+    """Evaluates the Chebyshev series for ra, dec and distance at x in [-1, 1].
+    rows are the coefficients in reverse order, one (ra, dec, dis) tuple per degree.
+    """
+    x2 = 2.0 * x
+    b1_ra = b1_dec = b1_dis = 0.0
+    b2_ra = b2_dec = b2_dis = 0.0
+    for c_ra, c_dec, c_dis in rows[:-1]:
+        b1_ra, b2_ra = x2 * b1_ra - b2_ra + c_ra, b1_ra
+        b1_dec, b2_dec = x2 * b1_dec - b2_dec + c_dec, b1_dec
+        b1_dis, b2_dis = x2 * b1_dis - b2_dis + c_dis, b1_dis
+    c_ra, c_dec, c_dis = rows[-1]
+    return (x * b1_ra - b2_ra + c_ra,
+            x * b1_dec - b2_dec + c_dec,
+            x * b1_dis - b2_dis + c_dis)
+
+
+class NovasEphemeris(object):
+    """Same interface as ChebyshevEphemeris, but every position is calculated by NOVAS."""
+
+    def __init__(self, accuracy=0):
+        self.accuracy = accuracy
+        self.novas_calls = 0
+
+    def app_planet(self, jd_tt, ss_body):
+        if np.isscalar(jd_tt):
+            self.novas_calls += 1
+            return novas.app_planet(jd_tt, ss_body, self.accuracy)
+        jd_tt = np.asarray(jd_tt, dtype=float)
+        self.novas_calls += jd_tt.size
+        result = np.array([novas.app_planet(jd, ss_body, self.accuracy) for jd in jd_tt.ravel()])
+        return tuple(result.T.reshape((3,) + jd_tt.shape))
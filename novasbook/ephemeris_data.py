@@ -0,0 +1,78 @@
+"""Numeric data model for the results of one day page.
+
+The calculation produces plain numbers (degrees, hours), stored in numpy
+structured arrays with a fixed layout. Conversion to degree/minute strings
+happens only when a page is rendered. So results can be cached, compared,
+sent between processes and written to other output formats without parsing
+text.
+
+Angles are in degrees, times in hours UT1 after 0:00 of the day. Values that
+do not exist (e.g. a transit on a day without transit) are NaN.
+
+  >>> day = new_day()
+  >>> day['gha'][12, BODIES.index('sun')]      # GHA of the sun at 12:00 UT1
+  >>> days = numpy.stack([day_1, day_2, ...])  # one array for a whole year
+"""
+import numpy as np
+
+__all__ = ['BODIES', 'HOURS', 'HP_MOON_HOURS', 'MAX_TRANSITS', 'STARS_PER_PAGE', 'LATITUDES', 'SUN_EVENTS', 'MOON_EVENTS',
+           'DAY_DTYPE', 'STARS_DTYPE', 'new_day', 'new_stars']
+
+BODIES = ('sun', 'moon', 'venus', 'mars', 'jupiter', 'saturn')   # same order as sky_objects in calculation.py
+HOURS = 25              # 0:00 ... 24:00, the last one is 0:00 of the next day
+HP_MOON_HOURS = (4, 12, 20)
+MAX_TRANSITS = 2        # transits per day and body, bodies faster than the sun can have two
+STARS_PER_PAGE = 25
+
+# Latitudes of the tables of rising, setting and twilight, north positive
+LATITUDES = (60, 55, 50, 45, 40, 30, 20, 10, 0, -10, -20, -30, -40, -50)
+# Events of the sun: (name, altitude of the center in degrees, rising). Sunrise and sunset at -50' (refraction 34'
+# and semidiameter 16'), civil and nautical twilight at -6 and -12 degrees.
+SUN_EVENTS = (('nautical_dawn', -12.0, True), ('civil_dawn', -6.0, True), ('sunrise', -50.0 / 60.0, True),
+              ('sunset', -50.0 / 60.0, False), ('civil_dusk', -6.0, False), ('nautical_dusk', -12.0, False))
+MOON_EVENTS = ('moonrise', 'moonset')
+
+DAY_DTYPE = np.dtype([
+    ('year', 'i2'), ('month', 'i1'), ('day', 'i1'),
+    ('jd_ut1', 'f8'),                               # Julian date of 0:00 UT1
+    ('delta_TT_UT1', 'f8', (HOURS,)),               # hours, at every hour
+    ('spr_p', 'f8', (HOURS,)),                      # GHA of the spring point
+    ('gha', 'f8', (HOURS, len(BODIES))),
+    ('dec', 'f8', (HOURS, len(BODIES))),
+    ('moon_d_gha', 'f8', (HOURS - 1,)),             # change of the moon's GHA to the next hour minus 14 deg 19'
+    ('moon_d_dec', 'f8', (HOURS - 1,)),             # change of the moon's declination to the next hour
+    ('hp_moon', 'f8', (len(HP_MOON_HOURS),)),       # horizontal parallax of the moon at 4, 12, 20 h
+    ('transit_spr_p', 'f8', (MAX_TRANSITS,)),
+    ('transit', 'f8', (len(BODIES), MAX_TRANSITS)),
+    ('diff_gha', 'f8', (len(BODIES),)),             # average hourly change of GHA beyond 15 deg (not for the moon)
+    ('diff_dec', 'f8', (len(BODIES),)),             # average hourly change of declination (not for the moon)
+    ('hp', 'f8', (len(BODIES),)),                   # horizontal parallax at 12:00 (not for the moon)
+    ('sd_sun', 'f8'),                               # semidiameter of the sun
+    ('age_moon', 'f8'),                             # days since new moon
+    ('sun_events', 'f8', (len(LATITUDES), len(SUN_EVENTS))),    # hours at longitude 0 (local mean time)
+    ('moon_events', 'f8', (len(LATITUDES), len(MOON_EVENTS))),
+])
+
+STARS_DTYPE = np.dtype([
+    ('jd_tt', 'f8'),                                # epoch of the star positions
+    ('number', 'i2', (STARS_PER_PAGE,)),            # number in the Nautisches Jahrbuch
+    ('sha', 'f8', (STARS_PER_PAGE,)),               # sidereal hour angle
+    ('dec', 'f8', (STARS_PER_PAGE,)),
+])
+
+
+def new_day():
+    """Empty record for one day, all values NaN."""
+    day = np.zeros((), dtype=DAY_DTYPE)
+    for name in DAY_DTYPE.names:
+        if DAY_DTYPE[name].base.kind == 'f':
+            day[name] = np.nan
+    return day
+
+
+def new_stars():
+    """Empty record for the stars of one page."""
+    stars = np.zeros((), dtype=STARS_DTYPE)
+    for name in ('jd_tt', 'sha', 'dec'):
+        stars[name] = np.nan
+    return stars
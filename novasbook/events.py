@@ -0,0 +1,90 @@
+"""Rising, setting and twilight at the Greenwich meridian for a grid of latitudes.
+
+The altitude of a body follows from its GHA and declination, which are
+calculated for every hour anyway:
+
+    sin h = sin(latitude) sin(dec) + cos(latitude) cos(dec) cos(GHA)
+
+at longitude 0. At other longitudes the times are local mean time, as in the
+Nautical Almanac. The altitudes for all latitudes and hours are one array
+operation. Every hour in which the altitude crosses a threshold brackets an
+event. Within the hour GHA and declination are interpolated linearly, and the
+crossings of all latitudes and thresholds are refined together by regula
+falsi (Illinois variant, as in transit). No NOVAS call is needed.
+
+  >>> times = find_events(gha_hourly, dec_hourly, LATITUDES, [-0.8333, -0.8333], [True, False])
+  >>> times[n_latitude, 0]                        # sunrise in hours, NaN if the sun does not rise
+"""
+import numpy as np
+
+__all__ = ['find_events', 'altitude', 'moon_horizon']
+
+
+def altitude(gha, dec, latitude):
+    """Altitude in degrees at longitude 0 from GHA, declination and latitude in degrees (arrays broadcast)."""
+    latitude = np.radians(latitude)
+    dec = np.radians(dec)
+    sin_h = np.sin(latitude) * np.sin(dec) + np.cos(latitude) * np.cos(dec) * np.cos(np.radians(gha))
+    return np.degrees(np.arcsin(np.clip(sin_h, -1.0, 1.0)))
+
+
+def moon_horizon(hp):
+    """Altitude of the moon's center at rising and setting: parallax, semidiameter and refraction 34'."""
+    return 0.7275 * hp - 34.0 / 60.0
+
+
+def find_events(gha_hourly, dec_hourly, latitudes, altitudes, rising, tolerance=1.0 / 3600.0, max_iterations=20):
+    """Times in hours after the first sample, shape (latitudes, thresholds), NaN where there is no event.
+
+    gha_hourly, dec_hourly: GHA and declination in degrees at hours 0, 1, ..., n (25 samples for one day)
+    latitudes:              latitudes in degrees, north positive
+    altitudes:              thresholds (altitude of the center in degrees)
+    rising:                 per threshold, True for the crossing upwards, False for downwards
+
+    Only the first event of the day is returned: a second one the same day (the moon can rise or set twice a day
+    at high latitudes) is left out, and a day without the event (the moon once a month, the
+    sun in polar day and night) gives NaN. Events exactly at the last sample belong to the next day.
+    """
+    gha = np.asarray(gha_hourly, dtype=float)
+    dec = np.asarray(dec_hourly, dtype=float)
+    latitude = np.asarray(latitudes, dtype=float)[:, None]            # (latitudes, 1)
+    threshold = np.asarray(altitudes, dtype=float)[None, :]           # (1, thresholds)
+    sign = np.where(np.asarray(rising, dtype=bool), 1.0, -1.0)[None, :]
+    step = np.mod(np.diff(gha), 360.0)                                # GHA grows through 360 -> 0
+    hours = len(step)
+
+    # f = sign * (altitude - threshold) is negative before the event and not negative after it
+    f_hourly = sign[:, :, None] * (altitude(gha, dec, latitude[:, :, None]) - threshold[:, :, None])
+    crossing = (f_hourly[:, :, :-1] < 0.0) & (f_hourly[:, :, 1:] >= 0.0)
+    found = crossing.any(axis=2)
+    first = crossing.argmax(axis=2)
+
+    def f_at(t):
+        n = np.clip(np.floor(t).astype(int), 0, hours - 1)
+        fraction = t - n
+        h = altitude(gha[n] + step[n] * fraction, dec[n] + (dec[n + 1] - dec[n]) * fraction, latitude)
+        return sign * (h - threshold)
+
+    # Regula falsi in all brackets at once
+    left = first.astype(float)
+    right = left + 1.0
+    f_left = np.take_along_axis(f_hourly, first[:, :, None], axis=2)[:, :, 0]
+    f_right = np.take_along_axis(f_hourly, first[:, :, None] + 1, axis=2)[:, :, 0]
+    f_right = np.where(found, f_right, 1.0)         # no bracket: any finite values
+    f_left = np.where(found, f_left, -1.0)
+    side = np.zeros(first.shape, dtype=int)
+    t = left
+    for _ in range(max_iterations):
+        t_last = t
+        t = (left * f_right - right * f_left) / (f_right - f_left)
+        if np.all((np.abs(t - t_last) < tolerance) | ~found):
+            break
+        f = np.where(found, f_at(t), -1.0)
+        below = f < 0.0
+        # Same side twice: halve the other end's value (Illinois)
+        f_right = np.where(below & (side == -1), f_right / 2.0, f_right)
+        f_left = np.where(~below & (side == 1), f_left / 2.0, f_left)
+        left, f_left = np.where(below, t, left), np.where(below, f, f_left)
+        right, f_right = np.where(below, right, t), np.where(below, f_right, f)
+        side = np.where(below, -1, 1)
+    return np.where(found & (t < hours), t, np.nan)
@@ -0,0 +1,126 @@
+"""Conversion of the calculated numbers to the strings in the tables.
+
+  >>> planets, transits = format_day(day_results)
+  >>> variables = format_page(dt, page, day_results, star_positions)   # for the template of a day page
+"""
+import numpy
+
+from . import angle_format
+from .ephemeris_data import BODIES, HP_MOON_HOURS, LATITUDES
+
+__all__ = ['format_day', 'format_stars', 'format_events', 'format_page', 'format_transit',
+           'decimal2dm_NS', 'decimal2dm_360', 'decimal2min', 'decimal2hm', 'decimal2m']
+
+weekdays = ['Montag', 'Dienstag', 'Mittwoch', 'Donnerstag', 'Freitag', 'Samstag', 'Sonntag']
+months = ['','Januar', 'Februar', 'März', 'April', 'Mai', 'Juni', 'Juli', 'August', 'September', 'Oktober', 'November', 'Dezember']
+decimal_separator = ','          # in numbers of the tables
+# Print the table of rising, setting and twilight on the day pages (--events, only with --experimental). Off by
+# default: the table has not been typeset with pdflatex yet, and a day page that overflows would move all following
+# pages to the wrong side.
+event_tables = False
+# Rows of the table of rising, setting and twilight, in the order of ephemeris_data.SUN_EVENTS and MOON_EVENTS
+sun_event_names = ['Naut. Dämmerung', 'Bürg. Dämmerung', 'Sonnenaufgang', 'Sonnenuntergang', 'Bürg. Dämmerung', 'Naut. Dämmerung']
+moon_event_names = ['Mondaufgang', 'Monduntergang']
+
+# Single values, the tables use the batch functions of angle_format directly
+# convert float to degrees and minutes, 'N' or 'S' instead of sign
+def decimal2dm_NS (decimal_angle):
+    deg, min = angle_format.format_dm_NS([decimal_angle], decimal_separator)
+    return (deg[0], min[0])
+
+#convert float to degrees and minutes, full circle
+def decimal2dm_360 (decimal_angle):
+    deg, min = angle_format.format_dm_360([decimal_angle], decimal_separator)
+    return (deg[0], min[0])
+
+#convert float to minutes, with sign
+def decimal2min (decimal_angle):
+    return angle_format.format_min([decimal_angle], decimal_separator)[0]
+
+#convert float to hours and minutes
+def decimal2hm (decimal_angle):
+    deg, min = angle_format.format_hm([decimal_angle])
+    return (deg[0], min[0])
+
+#convert float to only minutes with sign
+def decimal2m (decimal_angle):
+    return angle_format.format_m([decimal_angle], decimal_separator)[0]
+
+# Formats the transits of the day as 'hh:mm', or 'hh:mm / hh:mm' if there are two (the spring point once a year),
+# '--:--' if there is none (happens for the moon about once a month)
+def format_transit (transit_times):
+    times = [t for t in transit_times if not numpy.isnan(t)]
+    if not times:
+        return '--:--'
+    hours, minutes = angle_format.format_hm(times)
+    return ' / '.join('{}:{}'.format(h, m) for h, m in zip(hours, minutes))
+
+# Converts the results of calculate_ephemerides_day() to the strings in the tables. Returns list of results per
+# hour and dictionary with transits and daily values as used in the Jinja-template.
+def format_day (results):
+    n_moon = BODIES.index('moon')
+    n_bodies = len(BODIES)
+    # format whole columns at once, results are lists in the order of the flattened arrays
+    spr_p = zip(*angle_format.format_dm_360(results['spr_p'][:24], decimal_separator))
+    gha = list(zip(*angle_format.format_dm_360(results['gha'][:24], decimal_separator)))
+    dec = list(zip(*angle_format.format_dm_NS(results['dec'][:24], decimal_separator)))
+    moon_d_gha = angle_format.format_min(results['moon_d_gha'], decimal_separator)
+    moon_d_dec = angle_format.format_min(results['moon_d_dec'], decimal_separator)
+    hp_moon = dict(zip(HP_MOON_HOURS, angle_format.format_m(results['hp_moon'], decimal_separator)))
+
+    planets = []
+    for time_ut1, spr_p_dm in enumerate(spr_p): # iterate over 24h of UT1 (=lines in final table for one day)
+        planet_results_per_UT1 = {'spr_p': spr_p_dm}
+        for n_planet, planet_name in enumerate(BODIES):
+            n = time_ut1 * n_bodies + n_planet
+            planet_results_per_UT1[planet_name] = (gha[n], dec[n])
+        planet_results_per_UT1['moon'] += (moon_d_gha[time_ut1], moon_d_dec[time_ut1])
+        if time_ut1 in hp_moon:
+            planet_results_per_UT1['hp_moon'] = hp_moon[time_ut1]
+        planets.append(planet_results_per_UT1)
+
+    diff_gha = angle_format.format_m(results['diff_gha'], decimal_separator)
+    diff_dec = angle_format.format_m(results['diff_dec'], decimal_separator)
+    hp = angle_format.format_m(results['hp'], decimal_separator)
+    transits = {'spr_p': format_transit(results['transit_spr_p'].tolist())}
+    for n_planet, planet_name in enumerate(BODIES):
+        transits[planet_name] = format_transit(results['transit'][n_planet].tolist())
+        if n_planet != n_moon:
+            transits['diff_' + planet_name] = (diff_gha[n_planet], diff_dec[n_planet])
+            transits['hp_' + planet_name] = hp[n_planet]
+    transits['r_sun'] = decimal2m(float(results['sd_sun']))
+    transits['age_moon'] = '{:.1f}'.format(float(results['age_moon'])).replace('.', decimal_separator)
+    return planets, transits
+
+# Converts the results of calculate_star_positions() to the strings in the tables: list of (number, SHA, dec)
+def format_stars (star_positions):
+    sha = zip(*angle_format.format_dm_360(star_positions['sha'], decimal_separator))
+    dec = zip(*angle_format.format_dm_NS(star_positions['dec'], decimal_separator))
+    return list(zip(star_positions['number'].tolist(), sha, dec))
+
+# Converts the times of rising, setting and twilight to the table: latitudes as column heads and rows of
+# (name, list of 'hh:mm' per latitude), '--:--' if there is no such event on this day. Only the first event of a
+# kind is in the results (see events.find_events), the legend of the table says so.
+def format_events (results):
+    rows = []
+    for names, times in ((sun_event_names, results['sun_events']), (moon_event_names, results['moon_events'])):
+        times = times.T.ravel()         # row by row: one event, all latitudes
+        valid = ~numpy.isnan(times)
+        hours, minutes = angle_format.format_hm(times[valid])
+        cells = iter(['{}:{}'.format(h, m) for h, m in zip(hours, minutes)])
+        cells = [next(cells) if v else '--:--' for v in valid.tolist()]
+        rows.append([(name, cells[n * len(LATITUDES):(n + 1) * len(LATITUDES)]) for n, name in enumerate(names)])
+    latitudes = ['{} {}'.format(abs(latitude), 'N' if latitude > 0 else 'S') if latitude != 0 else '0' for latitude in LATITUDES]
+    return dict(latitudes=latitudes, columns='c' * len(LATITUDES), sun=rows[0], moon=rows[1])
+
+# Variables for the template of one day page
+def format_page (dt, page, day_results, star_positions):
+    year, month, day, page_is_even = page
+    planets, transits = format_day (day_results)
+    additional_data = {'dayOfYear': dt.timetuple()[7]}
+    # ut1 is used for iterating through list with results from within the Jinja-template
+    variables = dict(year=year, month=months[month], day=day, dayofweek=weekdays[dt.weekday()], d=planets, page_is_even=page_is_even,
+                     ut1=range(24), add=additional_data, transits=transits, s=format_stars (star_positions))
+    if event_tables:
+        variables['events'] = format_events (day_results)
+    return variables
@@ -4,7 +4,7 @@
 i.e., find the number of seconds that must be added to UTC to compute
 TAI for any timestamp at or after the given time[1].
   >>> from datetime import datetime
-  >>> import leapseconds
+  >>> from novasbook import leapseconds
   >>> leapseconds.dTAI_UTC_from_utc(datetime(2005, 1, 1))
   datetime.timedelta(0, 32)
   >>> leapseconds.utc_to_tai(datetime(2015, 7, 1))
@@ -24,13 +24,17 @@ Python 2.6+, Python 3, Jython, Pypy support.
 """
 from __future__ import with_statement
 
+import os
+from bisect import bisect_right
 from collections import namedtuple
 from datetime import datetime, timedelta
 from struct import Struct
 from warnings import warn
 
 __all__ = ['leapseconds', 'LeapSecond',
+           'LeapSecondIndex', 'leapsecond_index', 'reload_leapseconds',
            'dTAI_UTC_from_utc', 'dTAI_UTC_from_tai',
+           'dTAI_UTC_seconds_from_utc_array', 'dTAI_UTC_seconds_from_tai_array',
            'tai_to_utc', 'utc_to_tai',
            'gps_to_utc', 'utc_to_gps',
            'tai_to_gps', 'gps_to_tai']
@@ -167,15 +171,130 @@ def _fallback():
 
 def dTAI_UTC_from_utc(utc_time):
     """TAI time = utc_time + dTAI_UTC_from_utc(utc_time)."""
-    return _dTAI_UTC(utc_time, lambda ls: ls.utc)
+    return leapsecond_index().dTAI_UTC_from_utc(utc_time)
 
 
 def dTAI_UTC_from_tai(tai_time):
     """UTC time = tai_time - dTAI_UTC_from_tai(tai_time)."""
-    return _dTAI_UTC(tai_time, lambda ls: ls.utc + ls.dTAI_UTC)
+    return leapsecond_index().dTAI_UTC_from_tai(tai_time)
 
 
-def _dTAI_UTC(time, leapsecond_to_time, leapseconds=leapseconds):
+def dTAI_UTC_seconds_from_utc_array(utc_times):
+    """Vectorized dTAI_UTC_from_utc() for a whole array of UTC times.
+    *utc_times* is a sequence of datetime objects or a numpy datetime64
+    array. Unlike the scalar lookup, which returns a timedelta, this
+    returns a numpy integer array with TAI-UTC in whole seconds.
+    """
+    return leapsecond_index().dTAI_UTC_seconds_from_utc_array(utc_times)
+
+
+def dTAI_UTC_seconds_from_tai_array(tai_times):
+    """Vectorized dTAI_UTC_from_tai() for a whole array of TAI times,
+    TAI-UTC in whole seconds (numpy integer array)."""
+    return leapsecond_index().dTAI_UTC_seconds_from_tai_array(tai_times)
+
+
+class LeapSecondIndex(namedtuple('LeapSecondIndex',
+                                 'leapseconds utc tai filename mtime '
+                                 'utc_array tai_array seconds_array')):
+    """Immutable, sorted leap second table with O(log n) lookups.
+    *utc* and *tai* are tuples with the transition times of *leapseconds*
+    in UTC and TAI, *filename* and *mtime* identify the tzfile the table
+    was read from (None if the fallback list is used). *utc_array*,
+    *tai_array* and *seconds_array* are the same transitions (without the
+    sentinel) and TAI-UTC in seconds as numpy arrays for the vectorized
+    lookups, built once with the table.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_leapseconds(cls, leapseconds_list, filename=None, mtime=None):
+        import numpy as np
+        leapseconds_list = tuple(leapseconds_list)
+        utc = tuple(ls.utc for ls in leapseconds_list)
+        tai = tuple(ls.utc + ls.dTAI_UTC for ls in leapseconds_list[:-1])
+        # datetime.max (sentinel) does not fit into datetime64[us]
+        utc_array = np.array(utc[:-1], dtype='datetime64[us]')
+        tai_array = np.array(tai, dtype='datetime64[us]')
+        seconds_array = np.array([ls.dTAI_UTC.seconds
+                                  for ls in leapseconds_list[:-1]])
+        return cls(leapseconds_list, utc, tai + (datetime.max,),
+                   filename, mtime, utc_array, tai_array, seconds_array)
+
+    def dTAI_UTC_from_utc(self, utc_time):
+        return self._lookup(self.utc, utc_time)
+
+    def dTAI_UTC_from_tai(self, tai_time):
+        return self._lookup(self.tai, tai_time)
+
+    def dTAI_UTC_seconds_from_utc_array(self, utc_times):
+        return self._lookup_array(self.utc_array, utc_times)
+
+    def dTAI_UTC_seconds_from_tai_array(self, tai_times):
+        return self._lookup_array(self.tai_array, tai_times)
+
+    def _lookup(self, transition_times, time):
+        i = bisect_right(transition_times, time) - 1
+        if i < 0:
+            raise ValueError("Dates before %s are not supported, got %r" % (
+                transition_times[0], time))
+        return self.leapseconds[i].dTAI_UTC
+
+    def _lookup_array(self, transitions, times):
+        import numpy as np
+        times = np.asarray(times, dtype='datetime64[us]')
+        i = np.searchsorted(transitions, times, side='right') - 1
+        if np.any(i < 0):
+            raise ValueError("Dates before %s are not supported, got %r" % (
+                transitions[0], times[i < 0][0]))
+        return self.seconds_array[i]
+
+
+_index = None
+
+
+def leapsecond_index(tzfiles=['/usr/share/zoneinfo/right/UTC',
+                              '/usr/lib/zoneinfo/right/UTC'],
+                     use_fallback=False):
+    """Return the leap second table, reading *tzfiles* only on first use.
+    Call reload_leapseconds() to pick up a changed tzfile.
+    """
+    global _index
+    if _index is None:
+        _index = _load_index(tzfiles, use_fallback)
+    return _index
+
+
+def reload_leapseconds(tzfiles=['/usr/share/zoneinfo/right/UTC',
+                                '/usr/lib/zoneinfo/right/UTC'],
+                       use_fallback=False):
+    """Reread the leap second table if its tzfile has changed (mtime).
+    Returns True if the table was reloaded.
+    """
+    global _index
+    if _index is not None and _index.filename is not None:
+        try:
+            if os.stat(_index.filename).st_mtime == _index.mtime:
+                return False
+        except OSError:
+            pass
+    _index = _load_index(tzfiles, use_fallback)
+    return True
+
+
+def _load_index(tzfiles, use_fallback):
+    for filename in tzfiles:
+        try:
+            mtime = os.stat(filename).st_mtime
+        except OSError:
+            continue
+        return LeapSecondIndex.from_leapseconds(leapseconds([filename]),
+                                                filename, mtime)
+    return LeapSecondIndex.from_leapseconds(
+        leapseconds(tzfiles, use_fallback=use_fallback))
+
+
+def _dTAI_UTC(time, leapsecond_to_time, leapseconds=None):
     """Get TAI-UTC difference in seconds for a given time.
     >>> from datetime import datetime, timedelta
     >>> _dTAI_UTC(datetime(1972, 1, 1), lambda ls: ls.utc)
@@ -193,16 +312,15 @@ def _dTAI_UTC(time, leapsecond_to_time, leapseconds=leapseconds):
     >>> _dTAI_UTC(datetime(2016, 6, 27), lambda ls: ls.utc)
     datetime.timedelta(0, 36)
     """
-    leapseconds_list = leapseconds()
-    transition_times = list(map(leapsecond_to_time, leapseconds_list))
+    if leapseconds is None:
+        leapseconds_list = leapsecond_index().leapseconds
+    else:
+        leapseconds_list = leapseconds()
+    transition_times = list(map(leapsecond_to_time, leapseconds_list[:-1]))
     if time < transition_times[0]:
         raise ValueError("Dates before %s are not supported, got %r" % (
             transition_times[0], time))
-    for i, (start, end) in enumerate(zip(transition_times,
-                                         transition_times[1:])):
-        if start <= time < end:
-            return leapseconds_list[i].dTAI_UTC
-    assert 0
+    return leapseconds_list[bisect_right(transition_times, time) - 1].dTAI_UTC
 
 
 def tai_to_utc(tai_time):
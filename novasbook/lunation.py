@@ -0,0 +1,127 @@
+"""Principal phases of the moon and the moon's age.
+
+The phases are the instants when the apparent ecliptic longitude of the moon
+minus that of the sun (elongation) is 0 (new moon), 90 (first quarter), 180
+(full moon) or 270 degrees (last quarter). The mean synodic month (Meeus,
+Astronomical Algorithms, ch. 49) gives every phase to within a day. All
+phases of a range are then refined together by secant steps on the
+elongation, each step is one array evaluation for the sun and one for the
+moon. With the Chebyshev ephemerides these use the fits of the days around
+the phases, which the tables need anyway.
+
+The phases found so far are kept in a sorted index per phase, the age of the
+moon is the time since the last new moon, found by binary search.
+
+  >>> lunations = Lunations(ephemerides, sun, moon)
+  >>> lunations.age(jd_tt)                                  # days since new moon
+  >>> jd_tt, phase = lunations.phases(jd_first, jd_last)    # phase 0..3, see PHASE_NAMES
+"""
+import numpy as np
+
+__all__ = ['Lunations', 'find_phases', 'elongation', 'PHASE_NAMES', 'SYNODIC_MONTH']
+
+PHASE_NAMES = ('new moon', 'first quarter', 'full moon', 'last quarter')
+SYNODIC_MONTH = 29.530588861        # mean length in days
+MEAN_NEW_MOON = 2451550.09766       # mean new moon 2000-01-06 (JDE), Meeus (49.1)
+LOOKAHEAD = 32.0                    # days the index of new moons is extended beyond the requested date
+
+
+def elongation(ephemerides, sun, moon, jd_tt):
+    """Apparent ecliptic longitude of the moon minus that of the sun in degrees (0..360) at Julian dates jd_tt.
+    The mean obliquity is used, nutation changes the difference by less than a second of arc.
+    """
+    jd_tt = np.asarray(jd_tt, dtype=float)
+    epsilon = np.radians(23.439291 - 0.0130042 * (jd_tt - 2451545.0) / 36525.0)
+    longitudes = []
+    for body in (moon, sun):
+        ra, dec, dis = ephemerides.app_planet(jd_tt, body)
+        ra = np.radians(ra * 15.0)
+        dec = np.radians(dec)
+        longitudes.append(np.arctan2(np.sin(ra) * np.cos(epsilon) + np.tan(dec) * np.sin(epsilon), np.cos(ra)))
+    return np.mod(np.degrees(longitudes[0] - longitudes[1]), 360.0)
+
+
+def find_phases(ephemerides, sun, moon, first_jd, last_jd, phases=(0, 1, 2, 3), tolerance=1e-6, max_iterations=10):
+    """Julian dates (TT) and numbers (0..3) of the given phases from first_jd up to last_jd, sorted by time.
+    tolerance is the remaining error of the elongation in degrees (1e-6 deg is less than 0.01 s).
+    """
+    # Mean phases, with two days margin: the true phases are within a day of them
+    k = np.arange(np.floor((first_jd - 2.0 - MEAN_NEW_MOON) / SYNODIC_MONTH * 4.0),
+                  np.ceil((last_jd + 2.0 - MEAN_NEW_MOON) / SYNODIC_MONTH * 4.0) + 1.0)
+    phase = np.mod(k, 4).astype(int)
+    k = k[np.isin(phase, phases)]
+    phase = phase[np.isin(phase, phases)]
+    target = phase * 90.0
+
+    def error(jd, target):      # elongation minus target, -180..180 deg
+        return np.mod(elongation(ephemerides, sun, moon, jd) - target + 180.0, 360.0) - 180.0
+
+    # Secant steps for all phases at once, converged ones are not evaluated again
+    jd0 = MEAN_NEW_MOON + k / 4.0 * SYNODIC_MONTH
+    jd1 = jd0 + 0.5
+    f0 = error(jd0, target)
+    f1 = error(jd1, target)
+    for iteration in range(max_iterations):
+        active = np.abs(f1) > tolerance
+        if not active.any():
+            break
+        jd2 = jd1[active] - f1[active] * (jd1[active] - jd0[active]) / (f1[active] - f0[active])
+        jd0[active], f0[active] = jd1[active], f1[active]
+        jd1[active] = jd2
+        f1[active] = error(jd2, target[active])
+
+    selected = (jd1 >= first_jd) & (jd1 < last_jd)
+    return jd1[selected], phase[selected]
+
+
+class Lunations(object):
+    """Sorted index of the principal phases, extended on demand.
+
+    ephemerides: provides app_planet(jd_tt, body) for arrays, like calculation.ephemerides
+    sun, moon:   NOVAS objects
+    """
+
+    def __init__(self, ephemerides, sun, moon):
+        self.ephemerides = ephemerides
+        self.sun = sun
+        self.moon = moon
+        self.times = [np.empty(0) for phase in PHASE_NAMES]    # sorted Julian dates (TT) per phase
+        self.covered = [None] * len(PHASE_NAMES)                # (first_jd, last_jd) searched per phase
+
+    def cover(self, first_jd, last_jd, phases=(0, 1, 2, 3)):
+        """Finds the given phases from first_jd up to last_jd, as far as they have not been searched yet."""
+        pieces = {}
+        for phase in phases:
+            if self.covered[phase] is None:
+                missing = [(first_jd, last_jd)]
+            else:
+                first, last = self.covered[phase]
+                missing = [piece for piece in ((first_jd, first), (last, last_jd)) if piece[0] < piece[1]]
+            for piece in missing:
+                pieces.setdefault(piece, []).append(phase)
+        # Phases missing in the same piece are searched together
+        for (first, last), group in pieces.items():
+            jd, found = find_phases(self.ephemerides, self.sun, self.moon, first, last, group)
+            for phase in group:
+                self.times[phase] = np.sort(np.concatenate([self.times[phase], jd[found == phase]]))
+                covered = self.covered[phase] or (first, last)
+                self.covered[phase] = (min(covered[0], first), max(covered[1], last))
+
+    def phases(self, first_jd, last_jd):
+        """Julian dates (TT) and numbers of all principal phases from first_jd up to last_jd, sorted by time."""
+        self.cover(first_jd, last_jd)
+        jd = np.concatenate(self.times)
+        phase = np.concatenate([np.full(len(times), n) for n, times in enumerate(self.times)])
+        selected = (jd >= first_jd) & (jd < last_jd)
+        order = np.argsort(jd[selected])
+        return jd[selected][order], phase[selected][order]
+
+    def age(self, jd_tt):
+        """Age of the moon in days (time since the last new moon) at jd_tt."""
+        # The last new moon is less than 30.5 days ago. The index is extended ahead, so the following days
+        # need no search.
+        covered = self.covered[0]
+        if covered is None or jd_tt - SYNODIC_MONTH - 1.0 < covered[0] or jd_tt >= covered[1]:
+            self.cover(jd_tt - SYNODIC_MONTH - 1.0, jd_tt + LOOKAHEAD, (0,))
+        new_moons = self.times[0]
+        return float(jd_tt - new_moons[np.searchsorted(new_moons, jd_tt, side='right') - 1])
@@ -0,0 +1,109 @@
+"""Fast output of the day pages: the template compiled to text pieces with slots.
+
+The template of a day page has no logic depending on the values in its cells,
+only on the page parity and the fixed hours and rows of the tables. Rendered
+once with a marker in place of every value, it becomes a list of constant text
+pieces and, between them, slots naming the value to insert. A page is then the
+values of format_page(), taken in a fixed order, joined with the pieces:
+no Jinja, no attribute or index lookups per cell.
+
+The compiled form is kept per shape of the variables (values of CONTROL, keys
+of all dictionaries and lengths of all lists). When it is compiled, its output
+for the page at hand is compared with the output of Jinja. If they differ
+(e.g. a template computing with the values), pages of this shape are rendered
+by Jinja as before. A branch on a value itself (say on a transit '--:--')
+could still agree on that page and differ on a later one, so the template
+must not have one; tests/test_page_emitter.py renders every page of a year
+both ways.
+
+  >>> emitter = PageEmitter(jinja.get_template('NJ_tableEphDay.jinja.tex'))
+  >>> text = emitter.render(format_page(dt, page, day_results, star_positions))
+"""
+from operator import itemgetter
+import re
+
+__all__ = ['PageEmitter', 'CONTROL']
+
+# Variables the structure of the page depends on, they are passed to the template as they are
+CONTROL = ('page_is_even', 'ut1')
+
+_MARKER = '\x00{}\x00'
+_MARKER_RE = re.compile('\x00([0-9]+)\x00')
+
+
+def _flatten(value, values, shape):
+    """Appends all values (leaves) in value to values and the keys or lengths of all containers to shape."""
+    if isinstance(value, dict):
+        shape.append(tuple(value))
+        for item in value.values():
+            _flatten(item, values, shape)
+    elif isinstance(value, (list, tuple)):
+        shape.append(len(value))
+        for item in value:
+            _flatten(item, values, shape)
+    else:
+        values.append(value)
+
+
+def _mark(value, values):
+    """Copy of value with markers instead of the leaves, in the order of _flatten(). Appends the leaves to values."""
+    if isinstance(value, dict):
+        return {key: _mark(item, values) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        marked = [_mark(item, values) for item in value]
+        return marked if isinstance(value, list) else tuple(marked)
+    values.append(value)
+    return _MARKER.format(len(values) - 1)
+
+
+class PageEmitter(object):
+    """Renders a Jinja template like template.render(**variables), compiled once per shape of the variables."""
+
+    def __init__(self, template):
+        self.template = template
+        self.compiled = {}          # shape -> (pieces, itemgetter of the values in the slots) or None (use Jinja)
+
+    def flatten(self, variables):
+        """(values, shape) of the variables of a page."""
+        values = []
+        shape = [variables.get(name) for name in CONTROL]
+        for name, value in variables.items():
+            if name not in CONTROL:
+                shape.append(name)
+                _flatten(value, values, shape)
+        return values, tuple(shape)
+
+    def compile(self, variables):
+        """Compiles the template for the shape of variables. Returns (pieces, slots) or None if the result differs
+        from Jinja for these variables."""
+        leaves = []
+        marked = {name: value if name in CONTROL else _mark(value, leaves) for name, value in variables.items()}
+        try:
+            text = self.template.render(**marked)
+        except Exception:           # the template computes with a value, which a marker cannot stand in for
+            return None
+        parts = _MARKER_RE.split(text)
+        pieces = parts[0::2]
+        slots = [int(n) for n in parts[1::2]]
+        compiled = (pieces, itemgetter(*slots) if len(slots) > 1 else lambda values: tuple(values[n] for n in slots))
+        if self.emit(compiled, leaves) != self.template.render(**variables):
+            return None
+        return compiled
+
+    @staticmethod
+    def emit(compiled, values):
+        pieces, slots = compiled
+        text = [pieces[0]] * (2 * len(pieces) - 1)
+        text[1::2] = map(str, slots(values))
+        text[2::2] = pieces[1:]
+        return ''.join(text)
+
+    def render(self, variables):
+        """Text of the template for variables."""
+        values, shape = self.flatten(variables)
+        if shape not in self.compiled:
+            self.compiled[shape] = self.compile(variables)
+        compiled = self.compiled[shape]
+        if compiled is None:
+            return self.template.render(**variables)
+        return self.emit(compiled, values)
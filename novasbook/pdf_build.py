@@ -0,0 +1,235 @@
+"""PDF of a book, typeset in chunks of one month in parallel.
+
+A book is written as independent LaTex documents into a directory of its own
+(output/Ephemeriden_2024/): front.tex with title and introduction, and one
+document per month (2024-01.tex, ...) with the preamble of the book and the
+day pages of the month. The chunks are typeset by pdflatex in parallel and
+merged into one PDF by pdfunite (poppler), or by pdflatex with pdfpages if
+pdfunite is missing.
+
+Page numbers continue over the chunks: every chunk starts at the page given
+as \\chunkstart on the command line of pdflatex. The start pages are taken
+from the page counts of the last build, one page per day is assumed for new
+chunks. If a typeset chunk has another number of pages, the following chunks
+are typeset again with the corrected start pages. The page numbers pdflatex
+reports for the shipped pages are checked to run from the start page without
+gaps, and the first day page of every month to be on the side (even or odd
+page number) its layout is made for.
+
+build.json in the directory keeps per chunk the SHA-256 of the source, the
+start page and the number of pages. A chunk is only typeset again if its
+source or its start page changed, or its PDF is missing.
+
+The build is experimental (--pdf needs --experimental): it has not been run
+on a whole book with pdflatex yet, only tests/test_pdf_build.py on a few
+small chunks where pdflatex is installed. Every chunk is a document of its
+own with the preamble of the book, so links of hyperref, the outline of the
+PDF and page references do not reach into other chunks.
+
+  >>> chunks = ChunkWriter('output/Ephemeriden_2024')
+  >>> render_book(first_day, last_day, outfile, chunks=chunks)    # writes the chunks while writing the book
+  >>> typeset, skipped = build_pdf('output/Ephemeriden_2024', chunks.names, 'output/Ephemeriden_2024.pdf', jobs=4)
+"""
+import hashlib
+import json
+from multiprocessing.pool import ThreadPool
+import os
+import re
+import shutil
+import subprocess
+from warnings import warn
+
+__all__ = ['ChunkWriter', 'build_pdf', 'merge_pdfs', 'typeset', 'FRONT']
+
+FRONT = 'front'                 # name of the chunk with title and introduction
+MANIFEST = 'build.json'
+BEGIN_DOCUMENT = '\\begin{document}'
+_PAGES_RE = re.compile(r'Output written on .*? \((\d+) pages?')
+_SHIPPED_RE = re.compile(r'\[(-?\d+)(?=[\s\]{<])')      # '[12' when page 12 is shipped out
+
+
+class ChunkWriter(object):
+    """Writes the LaTex-documents of the chunks of a book into directory. names are the chunks in page order,
+    even the page parity (page_is_even) of the first day page of every month chunk."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.preamble = None
+        self.tail = None
+        self.names = []
+        self.even = {}
+        self.month = None
+        self.texts = []
+
+    def begin(self, document_head, document_tail):
+        """Writes the front matter: the document around the day pages. Called with the parts of the main template
+        before and after the table."""
+        if BEGIN_DOCUMENT not in document_head:
+            raise ValueError('No {} in the main document'.format(BEGIN_DOCUMENT))
+        self.preamble = document_head[:document_head.index(BEGIN_DOCUMENT)]
+        self.tail = document_tail
+        self._write(FRONT, document_head + document_tail + '\n')
+        self.names = [FRONT]
+
+    def add(self, page, text):
+        """Adds the text of the day page of page (year, month, day, page_is_even)."""
+        if page[:2] != self.month:
+            self._finish()
+            self.month = page[:2]
+            self.even['{}-{:02d}'.format(*self.month)] = page[3]
+        self.texts.append(text)
+
+    def close(self):
+        self._finish()
+
+    def _finish(self):
+        if not self.texts:
+            return
+        name = '{}-{:02d}'.format(*self.month)
+        self._write(name, ''.join([self.preamble, '\\providecommand{\\chunkstart}{1}\n', BEGIN_DOCUMENT, '\n',
+                                   '\\setcounter{page}{\\chunkstart}\n'] + self.texts + [self.tail, '\n']))
+        self.names.append(name)
+        self.texts = []
+
+    def _write(self, name, text):
+        with open(os.path.join(self.directory, name + '.tex'), 'w') as f:
+            f.write(text)
+
+
+def typeset(directory, name, start=1, latex='pdflatex', runs=1, check_numbers=False):
+    """Typesets name.tex in directory, with page numbers from start. Returns the number of pages.
+    Raises RuntimeError if pdflatex fails, its log is in name.log. With check_numbers, also if the page numbers of
+    the shipped pages do not run from start without gaps."""
+    command = [latex, '-interaction=nonstopmode', '-halt-on-error', '-jobname=' + name,
+               '\\def\\chunkstart{{{}}}\\input{{{}.tex}}'.format(start, name)]
+    # Long lines, so the page numbers in the output are not broken
+    environment = dict(os.environ, max_print_line='100000')
+    for run in range(runs):
+        process = subprocess.run(command, cwd=directory, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                 env=environment)
+        if process.returncode != 0:
+            raise RuntimeError('{} failed on {}, see {}'.format(latex, os.path.join(directory, name + '.tex'),
+                                                                 os.path.join(directory, name + '.log')))
+    output = process.stdout.decode(errors='replace')
+    match = _PAGES_RE.search(output)
+    if match is None:
+        raise RuntimeError('{} wrote no pages for {}'.format(latex, os.path.join(directory, name + '.tex')))
+    pages = int(match.group(1))
+    if check_numbers:
+        shipped = [int(number) for number in _SHIPPED_RE.findall(output[:match.start()])]
+        if shipped != list(range(start, start + pages)):
+            raise RuntimeError('Page numbers of {} are {}, expected {} to {}'.format(
+                os.path.join(directory, name + '.pdf'), _ranges(shipped), start, start + pages - 1))
+    return pages
+
+
+def _ranges(numbers):
+    """Short text of a list of page numbers: '3-5, 7'."""
+    ranges = []
+    for number in numbers:
+        if ranges and number == ranges[-1][1] + 1:
+            ranges[-1][1] = number
+        else:
+            ranges.append([number, number])
+    return ', '.join(str(first) if first == last else '{}-{}'.format(first, last) for first, last in ranges) or 'none'
+
+
+
+def merge_pdfs(pdf_files, pdf_file, latex='pdflatex'):
+    """Joins the PDFs into pdf_file with pdfunite, or with pdflatex and pdfpages if there is no pdfunite."""
+    if shutil.which('pdfunite'):
+        subprocess.run(['pdfunite'] + list(pdf_files) + [pdf_file], check=True)
+        return
+    directory = os.path.dirname(os.path.abspath(pdf_files[0]))
+    name = os.path.splitext(os.path.basename(pdf_file))[0] + '-merge'
+    with open(os.path.join(directory, name + '.tex'), 'w') as f:
+        f.write('\\documentclass{article}\n\\usepackage{pdfpages}\n\\begin{document}\n')
+        for pdf in pdf_files:
+            f.write('\\includepdf[pages=-,fitpaper]{{{}}}\n'.format(os.path.relpath(pdf, directory)))
+        f.write('\\end{document}\n')
+    typeset(directory, name, latex=latex)
+    shutil.move(os.path.join(directory, name + '.pdf'), pdf_file)
+
+
+def build_pdf(directory, names, pdf_file, jobs=1, latex='pdflatex', progress=None, even=None):
+    """Typesets the chunks names (front first, then in page order) in directory with jobs processes of pdflatex and
+    merges them into pdf_file. progress(name, start) is called for every chunk to be typeset. even (ChunkWriter.even)
+    gives the page parity of the first day page of the month chunks, a chunk starting on the other side is reported
+    by a RuntimeWarning. Returns (typeset chunks, skipped chunks)."""
+    manifest_file = os.path.join(directory, MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_file):
+        with open(manifest_file) as f:
+            manifest = json.load(f)
+
+    hashes = {}
+    for name in names:
+        with open(os.path.join(directory, name + '.tex'), 'rb') as f:
+            hashes[name] = hashlib.sha256(f.read()).hexdigest()
+
+    # Number of pages of every chunk: from the last build if the source is unchanged, else one page per day (the
+    # front matter is typeset before all others, so its number is known)
+    pages = {}
+    for name in names:
+        entry = manifest.get(name)
+        if entry is not None and entry['hash'] == hashes[name]:
+            pages[name] = entry['pages']
+        else:
+            pages[name] = None
+
+    def up_to_date(name, start):
+        entry = manifest.get(name)
+        return (entry is not None and entry['hash'] == hashes[name] and entry['start'] == start
+                and os.path.exists(os.path.join(directory, name + '.pdf')))
+
+    def run(job):
+        name, start = job
+        # The front matter is typeset twice for the references and outlines of hyperref
+        return name, start, typeset(directory, name, start, latex, runs=2 if name == FRONT else 1, check_numbers=True)
+
+    typeset_chunks = set()
+    pool = ThreadPool(jobs)
+    try:
+        # Every round fixes the start pages at least up to the first chunk with a wrong guess of its pages
+        for _ in range(len(names) + 1):
+            starts = {}
+            start = 1
+            for name in names:
+                starts[name] = start
+                start += pages[name] if pages[name] is not None else _days(directory, name)
+            todo = [(name, starts[name]) for name in names if not up_to_date(name, starts[name])]
+            if not todo:
+                break
+            # The front matter first, it decides the start pages of all chunks
+            if todo[0][0] == FRONT:
+                todo = todo[:1]
+            if progress is not None:
+                for name, start in todo:
+                    progress(name, start)
+            for name, start, n_pages in pool.imap_unordered(run, todo):
+                manifest[name] = {'hash': hashes[name], 'start': start, 'pages': n_pages}
+                pages[name] = n_pages
+                typeset_chunks.add(name)
+            with open(manifest_file, 'w') as f:
+                json.dump(manifest, f, indent=1)
+        else:
+            raise RuntimeError('Page numbers of the chunks in {} do not settle'.format(directory))
+    finally:
+        pool.close()
+        pool.join()
+
+    # The layout of a day page (page_is_even) has to match the side of the page in the twoside book
+    for name, page_is_even in (even or {}).items():
+        if name in starts and (starts[name] % 2 == 0) != bool(page_is_even):
+            warn('{} starts on page {}, but its first day page is laid out for an {} page'.format(
+                os.path.join(directory, name + '.pdf'), starts[name], 'even' if page_is_even else 'odd'), RuntimeWarning)
+
+    merge_pdfs([os.path.join(directory, name + '.pdf') for name in names], pdf_file, latex)
+    return len(typeset_chunks), len(names) - len(typeset_chunks)
+
+
+def _days(directory, name):
+    """Guess of the number of pages of a chunk never typeset: one page per day page in its source."""
+    with open(os.path.join(directory, name + '.tex')) as f:
+        return max(1, f.read().count('\\newpage'))
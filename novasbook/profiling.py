@@ -0,0 +1,179 @@
+"""Instrumentation: time of every pipeline stage and every NOVAS call.
+
+Switched off, every instrumented stage costs one function call and an
+attribute check. enable() starts recording:
+
+  - stages of the pipeline (calculation of a page, ephemerides, transits,
+    stars, formatting, rendering, ...), marked in the code by
+    `with profiling.stage(name, day=...)`
+  - every call of the NOVAS functions, by function and body. The functions
+    are replaced by wrappers in the module novas.compat itself, for all code
+    of the process that calls them from there, not only novasbook (disable()
+    puts the originals back). novasbook calls NOVAS only as attributes of
+    novas.compat, so all of its calls are caught.
+
+At the end, summary() gives a table of calls and times, chrome_trace() the
+records in the Trace Event Format of Chrome (chrome://tracing, Perfetto).
+Worker processes record on their own and send their records with the
+results of every job (see calculation.calculate_page_job).
+
+  >>> profiling.enable()
+  >>> with profiling.stage('ephemerides', day=(2024, 1, 1)):
+  ...     calculate_ephemerides_day(...)
+  >>> print(profiling.profiler.summary())
+  >>> json.dump(profiling.profiler.chrome_trace(), open('output/profile.json', 'w'))
+"""
+import functools
+import os
+import time
+
+from novas import compat as novas
+
+__all__ = ['Profiler', 'enable', 'disable', 'stage', 'NOVAS_FUNCTIONS']
+
+# NOVAS functions used by novasbook
+NOVAS_FUNCTIONS = ('app_planet', 'app_star', 'sidereal_time', 'e_tilt', 'ephemeris', 'precession', 'nutation',
+                   'frame_tie', 'starvectors', 'julian_date', 'cal_date')
+
+# Profiler of this process, None if profiling is off
+profiler = None
+
+
+class Profiler(object):
+    """Statistics (calls, total and maximum time) per (category, name) and, with trace, every single record."""
+
+    def __init__(self, trace=True, worker=False):
+        self.trace = trace
+        self.worker = worker
+        self.origin = time.perf_counter()
+        self.stats = {}
+        self.records = []       # (category, name, start, seconds, pid, args)
+
+    def record(self, category, name, start, seconds, args=None):
+        stat = self.stats.get((category, name))
+        if stat is None:
+            stat = self.stats[(category, name)] = [0, 0.0, 0.0]
+        stat[0] += 1
+        stat[1] += seconds
+        if seconds > stat[2]:
+            stat[2] = seconds
+        if self.trace:
+            self.records.append((category, name, start, seconds, os.getpid(), args))
+
+    def drain(self):
+        """Returns (stats, records) recorded since the last drain() and starts again (for worker processes)."""
+        stats, records = self.stats, self.records
+        self.stats, self.records = {}, []
+        return stats, records
+
+    def merge(self, drained):
+        """Adds the records of drain() of another process."""
+        stats, records = drained
+        for key, (calls, seconds, longest) in stats.items():
+            stat = self.stats.setdefault(key, [0, 0.0, 0.0])
+            stat[0] += calls
+            stat[1] += seconds
+            stat[2] = max(stat[2], longest)
+        self.records.extend(records)
+
+    def summary(self):
+        """Table of all stages and NOVAS calls, sorted by total time."""
+        lines = ['{:10} {:48} {:>8} {:>10} {:>10} {:>10}'.format('category', 'name', 'calls', 'total s', 'mean ms', 'max ms')]
+        for (category, name), (calls, seconds, longest) in sorted(self.stats.items(), key=lambda item: (item[0][0], -item[1][1])):
+            lines.append('{:10} {:48} {:8d} {:10.3f} {:10.4f} {:10.3f}'.format(
+                category, name, calls, seconds, 1000.0 * seconds / calls, 1000.0 * longest))
+        return '\n'.join(lines)
+
+    def chrome_trace(self):
+        """Records as dictionary in the Trace Event Format (complete events, times in microseconds)."""
+        events = []
+        for category, name, start, seconds, pid, args in self.records:
+            event = {'name': name, 'cat': category, 'ph': 'X', 'pid': pid, 'tid': pid,
+                     'ts': (start - self.origin) * 1e6, 'dur': seconds * 1e6}
+            if args:
+                event['args'] = {key: str(value) for key, value in args.items()}
+            events.append(event)
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+class _Stage(object):
+    __slots__ = ('name', 'args', 'start')
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if profiler is not None:
+            profiler.record('stage', self.name, self.start, time.perf_counter() - self.start, self.args)
+        return False
+
+
+class _NoStage(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name, **args):
+    """Context manager timing a stage of the pipeline. args (e.g. day) go into the trace."""
+    if profiler is None:
+        return _NO_STAGE
+    return _Stage(name, args)
+
+
+def _body_name(args):
+    """Name of the NOVAS object (body or star) among the arguments of a call, '' if there is none."""
+    for arg in args:
+        name = getattr(arg, 'name', None) or getattr(arg, 'starname', None)
+        if name:
+            return (name.decode() if isinstance(name, bytes) else name).strip()
+    return ''
+
+
+def _wrap(function_name, function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            if profiler is not None:
+                body = _body_name(args)
+                profiler.record('novas', function_name + '(' + body + ')' if body else function_name, start, seconds)
+    wrapper.unwrapped = function
+    return wrapper
+
+
+def enable(trace=True, worker=False):
+    """Starts recording in this process. Returns the Profiler."""
+    global profiler
+    profiler = Profiler(trace, worker)
+    for function_name in NOVAS_FUNCTIONS:
+        function = getattr(novas, function_name)
+        if not hasattr(function, 'unwrapped'):
+            setattr(novas, function_name, _wrap(function_name, function))
+    return profiler
+
+
+def disable():
+    """Stops recording and restores the NOVAS functions. Returns the last Profiler."""
+    global profiler
+    last, profiler = profiler, None
+    for function_name in NOVAS_FUNCTIONS:
+        function = getattr(novas, function_name)
+        if hasattr(function, 'unwrapped'):
+            setattr(novas, function_name, function.unwrapped)
+    return last
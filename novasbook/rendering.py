@@ -0,0 +1,186 @@
+"""Output of the calculated pages as document.
+
+Jinja is imported when the first document is rendered. The LaTex-templates
+are in the directory templates next to the package. Jinja keeps the compiled
+templates in a bytecode cache (directory in the environment variable
+TEMPLATE_CACHE_DIR, else a directory of Jinja in the temporary directory), so
+later processes do not parse them again. The day pages are written by a
+page_emitter.PageEmitter: the template compiled once to text pieces, filled
+with the values of every page.
+
+  >>> results = compute_range(date(2024, 1, 1), date(2024, 12, 31))
+  >>> with open('output/Ephemeriden_2024.tex', 'w') as outfile:
+  ...     render(results, 'latex', outfile)
+  >>> text = render(results)                        # without outfile: returns the document
+
+render_book() calculates and writes a book incrementally: with a result
+cache, the rendered text of every day page is stored under a key over all its
+inputs, and only pages with changed inputs are calculated and rendered again.
+"""
+from datetime import date
+import hashlib
+import io
+import os
+
+from . import formatting, profiling
+from .formatting import format_page
+from .page_emitter import PageEmitter
+
+__all__ = ['render', 'render_book', 'book_period', 'BACKENDS', 'BINARY_BACKENDS', 'TEMPLATE_DIR']
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+
+# Marks the position of the day pages in the main document, see render_latex()
+TABLE_PLACEHOLDER = '((( table )))'
+
+# Jinja environment, created on first use by environment()
+jinja = None
+# PageEmitter per template name, created on first use by page_emitter()
+emitters = {}
+
+def environment ():
+    global jinja
+    if jinja is None:
+        from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+        cache_dir = os.environ.get('TEMPLATE_CACHE_DIR')
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        jinja = Environment(
+            block_start_string = '((*',                     # Set delimiters to LaTex-conform strings
+            block_end_string= '*))',
+            variable_start_string= '(((',
+            variable_end_string= ')))',
+            comment_start_string= '((=',
+            comment_end_string= '=))',
+            line_statement_prefix= '###',
+            loader=FileSystemLoader(TEMPLATE_DIR),
+            bytecode_cache=FileSystemBytecodeCache(cache_dir or None)
+        )
+    return jinja
+
+# Emitter of the day pages for the template name
+def page_emitter (name='NJ_tableEphDay.jinja.tex'):
+    if name not in emitters:
+        emitters[name] = PageEmitter(environment().get_template(name))
+    return emitters[name]
+
+# Period of a book for the title: 'für das Jahr 2024' or 'vom 1.6.2025 bis 31.5.2027'
+def book_period (first_day, last_day):
+    if first_day == date(first_day.year, 1, 1) and last_day == date(first_day.year, 12, 31):
+        return 'für das Jahr {}'.format(first_day.year)
+    return 'vom {}.{}.{} bis {}.{}.{}'.format(first_day.day, first_day.month, first_day.year, last_day.day, last_day.month, last_day.year)
+
+# Writes the LaTex-document for results (iterable of (page, day_results, star_positions)) to outfile.
+# The main template is rendered around a placeholder for the table. Everything before the placeholder is written
+# first, every day page is written as soon as it arrives from results and the rest of the document at the end.
+# So the whole book never has to be held in memory.
+def render_latex (results, outfile, period):
+    jinja = environment()
+    document_template = jinja.get_template('NJ_mainDocument.jinja.tex')
+    table_eph_day = page_emitter()
+
+    document_head, document_tail = document_template.render(period=period, table=TABLE_PLACEHOLDER).split(TABLE_PLACEHOLDER)
+    outfile.write(document_head)
+    for page, day_results, star_positions in results:
+        dt = date(*page[:3])
+        outfile.write(table_eph_day.render(format_page (dt, page, day_results, star_positions)))
+    print(document_tail, file=outfile)
+
+# Binary almanac for memory-mapped access, see almanac.py
+def render_almanac (results, outfile, period):
+    from .almanac import write_almanac
+    write_almanac(results, outfile, period)
+
+BACKENDS = {'latex': render_latex, 'almanac': render_almanac}
+# Backends writing bytes: outfile has to be opened in binary mode
+BINARY_BACKENDS = {'almanac'}
+
+# Renders results (list or iterator of (page, day_results, star_positions) from compute_range() or
+# calculation.iter_pages()) with the given backend. Writes to outfile if given, else returns the document as string
+# (bytes for the binary backends). period is the text for the title, by default taken from the first and last page.
+def render (results, backend='latex', outfile=None, period=None):
+    if backend not in BACKENDS:
+        raise ValueError('Unknown backend {!r}, available: {}'.format(backend, ', '.join(sorted(BACKENDS))))
+    if period is None:
+        results = list(results)
+        if not results:
+            raise ValueError('Nothing to render')
+        period = book_period (date(*results[0][0][:3]), date(*results[-1][0][:3]))
+    if outfile is None:
+        outfile = io.BytesIO() if backend in BINARY_BACKENDS else io.StringIO()
+        BACKENDS[backend](results, outfile, period)
+        return outfile.getvalue()
+    BACKENDS[backend](results, outfile, period)
+
+# Identity of everything besides the results that goes into the text of a day page: source of the template, source
+# of the code turning results into text (formatting, angle format, page emitter and the Jinja environment here) and
+# names and number format of the tables
+def page_template_identity ():
+    from . import angle_format, page_emitter as emitter_module
+    source_hash = hashlib.sha256()
+    for filename in (os.path.join(TEMPLATE_DIR, 'NJ_tableEphDay.jinja.tex'), formatting.__file__, angle_format.__file__,
+                     emitter_module.__file__, __file__):
+        with open(filename, 'rb') as f:
+            source_hash.update(f.read())
+    return (source_hash.hexdigest(), formatting.decimal_separator, formatting.event_tables, tuple(formatting.weekdays),
+            tuple(formatting.months), tuple(formatting.sun_event_names), tuple(formatting.moon_event_names))
+
+# Writes the LaTex-document for all pages from first_day to last_day to outfile. With a result cache
+# (result_cache.ResultCache), the text of every day page is stored under a key over the keys of its results (date,
+# page parity, TT-UT1 with the leap seconds, bodies, stars of the page, ephemeris and settings) and the template.
+# Pages found there are copied into the document, only the others are calculated (see calculation.iter_pages) and
+# rendered. progress(page) is called for every rebuilt page. With almanac (almanac.AlmanacWriter), the results of all
+# pages are also written to the binary almanac, reused pages then take their results from the cache. With chunks
+# (pdf_build.ChunkWriter), the document is also written as chunks of one month for a parallel build of the PDF.
+# Returns (reused pages, rebuilt pages).
+def render_book (first_day, last_day, outfile, pool=None, cache=None, period=None, progress=None, almanac=None, chunks=None):
+    from . import calculation
+    from .result_cache import make_key
+    jinja = environment()
+    document_template = jinja.get_template('NJ_mainDocument.jinja.tex')
+    table_eph_day = page_emitter()
+    if period is None:
+        period = book_period (first_day, last_day)
+
+    pages = calculation.book_pages (first_day, last_day)
+    page_keys = [None] * len(pages)
+    reused = [False] * len(pages)
+    if cache is not None:
+        template_id = page_template_identity()
+        page_keys = [make_key('page', page, key_day, key_stars, template_id) for page, (key_day, key_stars) in
+                     zip(pages, calculation.result_keys (pages))]
+        with profiling.stage('page cache'):
+            reused = [cache.contains(key) for key in page_keys]
+    results = calculation.iter_pages (first_day, last_day, pool, cache, skip=None if almanac is not None else reused)
+
+    document_head, document_tail = document_template.render(period=period, table=TABLE_PLACEHOLDER).split(TABLE_PLACEHOLDER)
+    outfile.write(document_head)
+    if chunks is not None:
+        chunks.begin(document_head, document_tail)
+    for (page, day_results, star_positions), page_key, page_reused in zip(results, page_keys, reused):
+        if almanac is not None:
+            with profiling.stage('almanac', day=page[:3]):
+                almanac.add(page, day_results, star_positions)
+        if page_reused:
+            with profiling.stage('output', day=page[:3]):
+                text = cache.get(page_key)
+                outfile.write(text)
+                if chunks is not None:
+                    chunks.add(page, text)
+            continue
+        if progress is not None:
+            progress (page)
+        with profiling.stage('format', day=page[:3]):
+            variables = format_page (date(*page[:3]), page, day_results, star_positions)
+        with profiling.stage('render', day=page[:3]):
+            text = table_eph_day.render(variables)
+        with profiling.stage('output', day=page[:3]):
+            if cache is not None:
+                cache.put(page_key, text)
+            outfile.write(text)
+            if chunks is not None:
+                chunks.add(page, text)
+    print(document_tail, file=outfile)
+    if chunks is not None:
+        chunks.close()
+    return sum(reused), len(pages) - sum(reused)
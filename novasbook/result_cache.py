@@ -0,0 +1,111 @@
+"""Persistent cache for calculated page results.
+
+Recalculating a year after a change of the templates or the formatting gives
+exactly the same astronomical results. This module stores the results of
+every page in an SQLite database, keyed by a hash over everything the
+calculation depends on: date, time difference TT-UT1, the definitions of the
+bodies or stars, the identity of the JPL ephemeris file, the calculation
+settings and the source code of the calculation (calculation_identity()). If
+any of them changes, the key changes and the page is calculated again, so
+outdated entries are never used.
+
+  >>> cache = ResultCache('output/results.sqlite')
+  >>> key = make_key('day', (2024, 1, 1), delta_TT_UT1, ephemeris_id)
+  >>> results = cache.get(key)                  # None if not cached
+  >>> cache.put(key, results)
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+
+__all__ = ['ResultCache', 'make_key', 'calculation_identity', 'ephemeris_identity', 'object_identity',
+           'cat_entry_identity']
+
+# Modules of novasbook the cached results are calculated with, their source is part of every key
+CALCULATION_MODULES = ('calculation', 'delta_t', 'ephemeris_cache', 'ephemeris_data', 'events', 'leapseconds',
+                       'lunation', 'result_cache', 'sidereal', 'star_places', 'stars', 'transit')
+
+_calculation_identity = None
+
+
+class ResultCache(object):
+    """Key-value store for page results in an SQLite file. New entries are committed every commit_every puts and
+    by commit() and close(), so an interrupted run keeps most of what it has calculated."""
+
+    def __init__(self, filename, commit_every=100):
+        self.filename = filename
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB)')
+        self.hits = 0
+        self.misses = 0
+        self.commit_every = commit_every
+        self.uncommitted = 0
+
+    def get(self, key):
+        row = self.connection.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pickle.loads(row[0])
+
+    def contains(self, key):
+        """True if key is stored. Does not count as hit or miss."""
+        return self.connection.execute('SELECT 1 FROM results WHERE key = ?', (key,)).fetchone() is not None
+
+    def put(self, key, value):
+        self.connection.execute('INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)',
+                                (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL)))
+        self.uncommitted += 1
+        if self.uncommitted >= self.commit_every:
+            self.commit()
+
+    def commit(self):
+        self.connection.commit()
+        self.uncommitted = 0
+
+    def close(self):
+        self.commit()
+        self.connection.close()
+
+
+def make_key(*parts):
+    """Hash over the representation of all parts and the calculation_identity(). Floats are represented exactly by
+    repr()."""
+    return hashlib.sha256(repr((calculation_identity(),) + parts).encode()).hexdigest()
+
+
+def calculation_identity():
+    """Hash over the source of CALCULATION_MODULES, read once per process. Any change of the calculation changes all
+    keys."""
+    global _calculation_identity
+    if _calculation_identity is None:
+        source_hash = hashlib.sha256()
+        directory = os.path.dirname(os.path.abspath(__file__))
+        for name in CALCULATION_MODULES:
+            with open(os.path.join(directory, name + '.py'), 'rb') as f:
+                source_hash.update(f.read())
+        _calculation_identity = source_hash.hexdigest()
+    return _calculation_identity
+
+
+def ephemeris_identity(jd_start, jd_end, number, filename=None):
+    """Identifies the JPL ephemeris by the values returned from eph_manager.ephem_open() and its file."""
+    if filename is None:
+        filename = os.environ.get('EPHEMERIS_FILE')
+    if filename is not None and os.path.exists(filename):
+        stat = os.stat(filename)
+        return (jd_start, jd_end, number, os.path.basename(filename), stat.st_size, stat.st_mtime)
+    return (jd_start, jd_end, number)
+
+
+def object_identity(ss_body):
+    """Identifies a novas object (sun, moon, planet)."""
+    return (ss_body.type, ss_body.number, ss_body.name)
+
+
+def cat_entry_identity(star):
+    """Identifies a star by all values of its catalog entry."""
+    return (star.starname, star.catalog, star.starnumber, star.ra, star.dec,
+            star.promora, star.promodec, star.parallax, star.radialvelocity)
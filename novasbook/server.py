@@ -0,0 +1,284 @@
+"""Query server for positions at arbitrary instants.
+
+A small asyncio HTTP server (TCP or Unix socket) answering GHA, declination
+and horizontal parallax of sun, moon, planets and spring point ('aries'), and
+SHA, GHA and declination of the stars of the book ('star:<number>', numbers of
+the Nautisches Jahrbuch) for any instant UT1. The ephemeris stays open, and
+the Chebyshev fits of the ephemerides and the equation of the equinoxes stay
+in memory. After warming up, a query needs no NOVAS call for the bodies and
+takes a few tens of microseconds.
+
+  python -m novasbook.server --port 8765               # or --unix /tmp/novasbook.sock
+
+  GET  /position?body=moon&time=2024-06-21T12:30:00    time in ISO format or jd=<Julian date UT1>
+  GET  /positions?body=sun,moon,aries&time=...         several bodies at one instant
+  POST /batch     {"queries": [{"body": "venus", "time": "..."}, ...]}
+  GET  /bodies    names of the bodies and numbers of the stars
+  GET  /metrics   number of requests and latency (mean, percentiles, maximum) per endpoint
+
+Angles are in degrees. The latency is measured from the complete request to
+the serialized response, per endpoint ('unknown' for all other paths). The
+positions are calculated in a worker thread, so a slow query does not hold
+up the other connections.
+"""
+import argparse
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import json
+import time
+from urllib.parse import parse_qs, urlsplit
+
+import numpy
+
+from novas import compat as novas
+
+from . import calculation, delta_t, stars
+from .ephemeris_data import BODIES
+
+__all__ = ['QueryEngine', 'LatencyMetrics', 'QueryServer', 'ENDPOINTS', 'main']
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+# Paths of the endpoints, the metrics count all other paths as 'unknown'. The calculating ones run in the worker thread.
+ENDPOINTS = ('/position', '/positions', '/batch', '/bodies', '/metrics')
+CALCULATING_ENDPOINTS = ('/position', '/positions', '/batch')
+
+
+class LatencyMetrics(object):
+    """Request counts and latencies of the last `samples` requests per endpoint."""
+
+    def __init__(self, samples=10000):
+        self.samples = samples
+        self.latencies = {}
+        self.counts = {}
+        self.errors = {}
+        self.started = time.time()
+
+    def record(self, endpoint, seconds, error=False):
+        if endpoint not in self.latencies:
+            self.latencies[endpoint] = deque(maxlen=self.samples)
+            self.counts[endpoint] = 0
+            self.errors[endpoint] = 0
+        self.latencies[endpoint].append(seconds)
+        self.counts[endpoint] += 1
+        self.errors[endpoint] += bool(error)
+
+    def summary(self):
+        endpoints = {}
+        for endpoint, latencies in self.latencies.items():
+            ms = numpy.array(latencies) * 1000.0
+            p50, p90, p99 = numpy.percentile(ms, [50, 90, 99]).tolist()
+            endpoints[endpoint] = {'requests': self.counts[endpoint], 'errors': self.errors[endpoint],
+                                   'mean_ms': float(ms.mean()), 'p50_ms': p50, 'p90_ms': p90, 'p99_ms': p99,
+                                   'max_ms': float(ms.max())}
+        return {'uptime_s': time.time() - self.started, 'endpoints': endpoints}
+
+
+class QueryEngine(object):
+    """Positions for lists of (body, time). Queries for the same body are calculated together."""
+
+    def __init__(self, tolerance=1e-6):
+        calculation.open_ephemeris()
+        calculation.configure_ephemerides(tolerance)
+
+    def bodies(self):
+        star_numbers = sorted(no for page_is_even in (1, 0) for (no, star) in stars.stars_of_page(page_is_even))
+        return {'bodies': list(BODIES) + ['aries'], 'stars': ['star:{}'.format(no) for no in star_numbers]}
+
+    def warm_up(self, first_day, days):
+        """Calculates all bodies every hour of `days` days from first_day (date), so the fits are ready."""
+        jd_ut1 = novas.julian_date(first_day.year, first_day.month, first_day.day, 0.0) + numpy.arange(24 * days + 1) / 24.0
+        delta_TT_UT1 = delta_t.delta_TT_UT1(jd_ut1) / 3600.0
+        for body in BODIES + ('aries',):
+            calculation.calculate_positions(body, jd_ut1, delta_TT_UT1)
+
+    def positions(self, queries):
+        """queries: list of (body, time), time as datetime (UT1), ISO string or Julian date UT1 (float).
+        Returns a list of dictionaries in the same order. Raises ValueError for invalid queries."""
+        instants = [self._instant(when) for body, when in queries]
+        groups = {}
+        for n, (body, when) in enumerate(queries):
+            groups.setdefault(self._body(body), []).append(n)
+
+        results = [None] * len(queries)
+        for body, selected in groups.items():
+            jd_ut1 = numpy.array([instants[n][0] for n in selected])
+            delta_TT_UT1 = numpy.array([instants[n][1] for n in selected])
+            if isinstance(body, int):
+                values = self._star_positions(body, jd_ut1, delta_TT_UT1, [instants[n][2] for n in selected])
+            else:
+                gha, dec, hp = calculation.calculate_positions(body, jd_ut1, delta_TT_UT1)
+                values = [{'gha': g, 'dec': d, 'hp': h} for g, d, h in zip(gha.tolist(), dec.tolist(), hp.tolist())]
+            for n, value in zip(selected, values):
+                value = {name: (None if isinstance(x, float) and x != x else x) for name, x in value.items()}  # NaN -> null
+                results[n] = dict(body=queries[n][0], jd_ut1=instants[n][0], **value)
+        return results
+
+    def _body(self, body):
+        if not isinstance(body, str):
+            raise ValueError('Invalid body {!r}'.format(body))
+        if body.startswith('star:'):
+            try:
+                star_no = int(body[5:])
+                stars.find_star(star_no)
+            except (ValueError, KeyError):
+                raise ValueError('Unknown star {!r}'.format(body))
+            return star_no
+        if body not in BODIES and body != 'aries':
+            raise ValueError('Unknown body {!r}, available: {}'.format(body, ', '.join(BODIES + ('aries', 'star:<number>'))))
+        return body
+
+    def _instant(self, when):
+        """(jd_ut1, delta_TT_UT1 [h], year) for datetime, ISO string or Julian date."""
+        if isinstance(when, str):
+            try:
+                when = datetime.fromisoformat(when)
+            except ValueError:
+                raise ValueError('Invalid time {!r}, expected ISO format like 2024-06-21T12:30:00'.format(when))
+        if isinstance(when, datetime):
+            if when.tzinfo is not None:
+                when = when.astimezone(timezone.utc).replace(tzinfo=None)
+            hours = when.hour + when.minute / 60.0 + (when.second + when.microsecond / 1e6) / 3600.0
+            jd_ut1 = novas.julian_date(when.year, when.month, when.day, 0.0) + hours / 24.0
+            year = when.year
+        elif isinstance(when, (int, float)) and not isinstance(when, bool):
+            jd_ut1 = float(when)
+            year = novas.cal_date(jd_ut1)[0]
+        else:
+            raise ValueError('Invalid time {!r}'.format(when))
+        if not 1960 <= year <= 2100:
+            raise ValueError('Time outside of 1960..2100')
+        return jd_ut1, delta_t.delta_TT_UT1(jd_ut1) / 3600.0, year
+
+    def _star_positions(self, star_no, jd_ut1, delta_TT_UT1, years):
+        page_is_even, index = stars.find_star(star_no)
+        gha_aries = calculation.calculate_positions('aries', jd_ut1, delta_TT_UT1)[0]
+        jd_tt = jd_ut1 + delta_TT_UT1 / 24.0
+        sha = numpy.empty(len(jd_tt))
+        dec = numpy.empty(len(jd_tt))
+        for year in set(years):
+            selected = numpy.array([y == year for y in years])
+            ra, dec_all = stars.star_catalogue(page_is_even, year).apparent_places(jd_tt[selected])
+            sha[selected] = numpy.mod(360.0 - ra[:, index] * 15.0, 360.0)
+            dec[selected] = dec_all[:, index]
+        gha = numpy.mod(gha_aries + sha, 360.0)
+        return [{'sha': s, 'gha': g, 'dec': d} for s, g, d in zip(sha.tolist(), gha.tolist(), dec.tolist())]
+
+
+class QueryServer(object):
+    """HTTP/1.1 with keep-alive on an asyncio stream server."""
+
+    def __init__(self, engine, metrics=None):
+        self.engine = engine
+        self.metrics = metrics if metrics is not None else LatencyMetrics()
+        # One thread: NOVAS and the ephemerides of calculation are not thread-safe, queries are calculated in turn
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def endpoint(self, target):
+        """Name of the endpoint of a request target, 'unknown' if there is none."""
+        path = urlsplit(target).path
+        return path if path in ENDPOINTS else 'unknown'
+
+    def dispatch(self, method, target, body):
+        """Returns (status, JSON-serializable payload) for one request."""
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            if url.path in ('/position', '/positions'):
+                if method != 'GET':
+                    return 405, {'error': 'Use GET'}
+                if 'body' not in query or ('time' not in query and 'jd' not in query):
+                    return 400, {'error': 'Parameters body and time (or jd) are needed'}
+                when = query['time'] if 'time' in query else float(query['jd'])
+                results = self.engine.positions([(body, when) for body in query['body'].split(',')])
+                return 200, results[0] if url.path == '/position' else {'results': results}
+            if url.path == '/batch':
+                if method != 'POST':
+                    return 405, {'error': 'Use POST'}
+                request = json.loads(body or b'null')
+                queries = request.get('queries') if isinstance(request, dict) else request
+                if not isinstance(queries, list):
+                    return 400, {'error': 'Expected {"queries": [{"body": ..., "time": ...}, ...]}'}
+                return 200, {'results': self.engine.positions(
+                    [(q.get('body'), q.get('time', q.get('jd'))) if isinstance(q, dict) else (None, None) for q in queries])}
+            if url.path == '/bodies':
+                return 200, self.engine.bodies()
+            if url.path == '/metrics':
+                return 200, self.metrics.summary()
+            return 404, {'error': 'Unknown path {}'.format(url.path)}
+        except ValueError as error:         # includes invalid JSON
+            return 400, {'error': str(error)}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                body = await reader.readexactly(length) if length else b''
+
+                start = time.perf_counter()
+                endpoint = self.endpoint(target)
+                try:
+                    if endpoint in CALCULATING_ENDPOINTS:
+                        status, payload = await asyncio.get_running_loop().run_in_executor(
+                            self.executor, self.dispatch, method, target, body)
+                    else:
+                        status, payload = self.dispatch(method, target, body)
+                except Exception as error:
+                    status, payload = 500, {'error': '{}: {}'.format(type(error).__name__, error)}
+                data = json.dumps(payload).encode()
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                writer.write('HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\nConnection: {}\r\n\r\n'.format(
+                    status, STATUS_TEXT[status], len(data), 'keep-alive' if keep_alive else 'close').encode('latin-1') + data)
+                self.metrics.record(endpoint, time.perf_counter() - start, status != 200)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765, unix=None):
+        if unix is not None:
+            server = await asyncio.start_unix_server(self.handle_connection, path=unix)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Answers positions of sun, moon, planets, spring point and stars at any instant UT1.')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='TCP port (default: 8765)')
+    parser.add_argument('--unix', metavar='PATH', help='listen on this Unix socket instead of TCP')
+    parser.add_argument('--tolerance', type=float, default=1e-6, help='maximum error of the Chebyshev ephemerides cache in degrees (default: 1e-6)')
+    parser.add_argument('--warm-up', type=int, default=3, metavar='DAYS', help='days from today to calculate before serving (default: 3)')
+    args = parser.parse_args(argv)
+
+    engine = QueryEngine(args.tolerance)
+    if args.warm_up > 0:
+        engine.warm_up(datetime.now(timezone.utc).date(), args.warm_up)
+    server = QueryServer(engine)
+    print('listening on {}'.format(args.unix if args.unix is not None else '{}:{}'.format(args.host, args.port)))
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Vectorized Greenwich sidereal time and hour angles.
+
+novas.sidereal_time() handles one instant per call. For the tables, the
+spring point and every body need the sidereal time at thousands of hourly
+instants, so this module evaluates it for whole numpy arrays of Julian dates.
+It uses the same equinox-based formula as NOVAS (IERS Conventions 2003:
+Earth rotation angle plus the precession polynomial of Capitaine et al.
+2003). The equation of the equinoxes is a slowly varying function of time.
+It is taken from novas.e_tilt() every half day and interpolated with cubic
+Lagrange polynomials, which is accurate to about 1e-4 arcseconds. The values
+at the nodes are kept, so repeated calls for nearby dates need no NOVAS call.
+
+  >>> theta = gast(jd_ut1_array, delta_t)           # degrees, like novas.sidereal_time(...) * 15
+  >>> gha = hour_angle(theta, ra_array)             # GHA of a body, degrees 0..360
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from novas import compat as novas
+
+__all__ = ['era', 'gmst', 'gast', 'hour_angle', 'check_against_novas']
+
+T0 = 2451545.0      # J2000.0
+
+
+def era(jd_ut1):
+    """Earth rotation angle in degrees for Julian date(s) jd_ut1 (as NOVAS era())."""
+    jd_ut1 = np.asarray(jd_ut1, dtype=float)
+    theta1 = 0.7790572732640 + 0.00273781191135448 * (jd_ut1 - T0)
+    theta = np.fmod(theta1 + np.fmod(jd_ut1, 1.0), 1.0) * 360.0
+    return np.where(theta < 0.0, theta + 360.0, theta)
+
+
+def gmst(jd_ut1, delta_t=0.0):
+    """Greenwich mean sidereal time in degrees. delta_t is TT-UT1 in seconds."""
+    jd_ut1 = np.asarray(jd_ut1, dtype=float)
+    return _sidereal(jd_ut1, delta_t, 0.0)
+
+
+def gast(jd_ut1, delta_t=0.0, accuracy=0):
+    """Greenwich apparent sidereal time in degrees. delta_t is TT-UT1 in seconds.
+    Scalars are calculated with the exact equation of the equinoxes.
+    """
+    if np.isscalar(jd_ut1):
+        jd_tt = jd_ut1 + delta_t / 86400.0
+        return float(_sidereal(jd_ut1, delta_t, novas.e_tilt(jd_tt, accuracy)[2] * 15.0))
+    jd_ut1 = np.asarray(jd_ut1, dtype=float)
+    jd_tt = jd_ut1 + delta_t / 86400.0
+    return _sidereal(jd_ut1, delta_t, _equation_of_equinoxes(jd_tt, accuracy))
+
+
+def hour_angle(theta, ra):
+    """Greenwich hour angle in degrees (0..360) from sidereal time theta [deg] and right ascension ra [h]."""
+    return np.mod(theta - ra * 360.0 / 24.0, 360.0)
+
+
+def check_against_novas(jd_ut1, delta_t=0.0, accuracy=0):
+    """Maximum difference in degrees between gast() and novas.sidereal_time() at the given dates."""
+    jd_ut1 = np.atleast_1d(np.asarray(jd_ut1, dtype=float))
+    reference = np.array([novas.sidereal_time(jd, 0.0, delta_t, 1, 0, accuracy) * 15.0 for jd in jd_ut1])
+    difference = np.mod(gast(jd_ut1, delta_t, accuracy) - reference + 180.0, 360.0) - 180.0
+    return np.max(np.abs(difference))
+
+
+def _sidereal(jd_ut1, delta_t, equation_of_equinoxes):
+    t = (jd_ut1 + delta_t / 86400.0 - T0) / 36525.0
+    seconds = equation_of_equinoxes + 0.014506 + \
+        ((((-0.0000000368 * t - 0.000029956) * t - 0.00000044) * t + 1.3915817) * t + 4612.156534) * t
+    return np.mod(seconds / 3600.0 + era(jd_ut1), 360.0)
+
+
+def _equation_of_equinoxes(jd_tt, accuracy, step=0.5):
+    """Equation of the equinoxes in arcseconds, cubic interpolation between values every step days."""
+    first = (np.floor(np.min(jd_tt) / step) - 1.0) * step
+    last = (np.floor(np.max(jd_tt) / step) + 2.0) * step
+    nodes = first + step * np.arange(int(round((last - first) / step)) + 1)
+    ee = np.array([_equation_of_equinoxes_node(jd, accuracy) for jd in nodes.tolist()])
+
+    i = np.clip(np.floor((jd_tt - first) / step).astype(int), 1, len(nodes) - 3)
+    x = (jd_tt - nodes[i]) / step
+    # Lagrange weights for nodes i-1, i, i+1, i+2
+    return (-x * (x - 1.0) * (x - 2.0) / 6.0 * ee[i - 1]
+            + (x + 1.0) * (x - 1.0) * (x - 2.0) / 2.0 * ee[i]
+            - (x + 1.0) * x * (x - 2.0) / 2.0 * ee[i + 1]
+            + (x + 1.0) * x * (x - 1.0) / 6.0 * ee[i + 2])
+
+
+@lru_cache(maxsize=4096)
+def _equation_of_equinoxes_node(jd_tt, accuracy):
+    return novas.e_tilt(jd_tt, accuracy)[2] * 15.0     # seconds of time -> arcseconds
@@ -0,0 +1,254 @@
+"""Reduction of sights against the almanac, many sights in one pass.
+
+A sight is the time (UT1), the body, the assumed position and the sextant
+altitude Hs. GHA and declination come from an almanac file (almanac.py),
+interpolated between the hours, stars as GHA of the spring point plus SHA.
+All sights are reduced together with numpy:
+
+  observed altitude Ho   Hs - index error - dip of the horizon (1.76' sqrt(height of eye in m)) - refraction
+                         (Bennett, scaled with pressure and temperature) + parallax in altitude (HP cos H)
+                         +/- semidiameter (lower/upper limb of sun and moon)
+  computed altitude Hc   sin Hc = sin lat sin dec + cos lat cos dec cos LHA, LHA = GHA + longitude
+  azimuth Zn             tan Z = -cos dec sin LHA / (cos lat sin dec - sin lat cos dec cos LHA)
+  intercept              Ho - Hc in nautical miles, positive towards the body
+
+fix() finds the position that fits the lines of position of several sights
+best (least squares, iterated from the assumed positions), for many fixes at
+once. Angles are in degrees, latitude north and longitude east positive.
+
+  >>> sights = new_sights(2)
+  >>> sights['jd_ut1'] = ...; sights['body'] = ['sun', 'star:18']; sights['hs'] = ...
+  >>> reduced = reduce_sights(Almanac('output/Ephemeriden_2024.alm'), sights)
+  >>> reduced['intercept'], reduced['zn']
+  >>> fixes = fix(sights, reduced)                     # one fix per value of sights['fix']
+
+From the command line, with a CSV file of sights (columns time, body, lat, lon, hs and optionally index_error,
+height_of_eye, limb, temperature, pressure, fix):
+
+  python -m novasbook.sight_reduction sights.csv --almanac output/Ephemeriden_2024.alm --output reduced.csv --fix
+"""
+import argparse
+import csv
+import sys
+
+import numpy as np
+
+from .almanac import Almanac
+from .ephemeris_data import BODIES
+
+__all__ = ['SIGHT_DTYPE', 'REDUCTION_DTYPE', 'FIX_DTYPE', 'LIMBS', 'new_sights', 'reduce_sights', 'observed_altitude',
+           'altitude_azimuth', 'fix', 'read_sights', 'main']
+
+LIMBS = {'lower': 1, 'center': 0, 'upper': -1}      # sign of the semidiameter correction
+
+SIGHT_DTYPE = np.dtype([
+    ('jd_ut1', 'f8'),                   # Julian date of the sight (UT1)
+    ('body', 'U16'),                    # name from ephemeris_data.BODIES or 'star:<number of the Nautisches Jahrbuch>'
+    ('lat', 'f8'), ('lon', 'f8'),       # assumed position
+    ('hs', 'f8'),                       # sextant altitude
+    ('index_error', 'f8'),              # arc minutes, positive if the sextant reads too high (on the arc)
+    ('height_of_eye', 'f8'),            # meters
+    ('limb', 'i1'),                     # see LIMBS
+    ('temperature', 'f8'),              # degrees Celsius
+    ('pressure', 'f8'),                 # hPa
+    ('fix', 'i4'),                      # sights with the same number belong to one fix
+])
+
+REDUCTION_DTYPE = np.dtype([
+    ('gha', 'f8'), ('dec', 'f8'), ('lha', 'f8'),
+    ('hp', 'f8'), ('sd', 'f8'),         # horizontal parallax and semidiameter used
+    ('ho', 'f8'),                       # observed altitude
+    ('hc', 'f8'), ('zn', 'f8'),         # computed altitude and azimuth at the assumed position
+    ('intercept', 'f8'),                # Ho - Hc in nautical miles
+])
+
+FIX_DTYPE = np.dtype([
+    ('fix', 'i4'),
+    ('lat', 'f8'), ('lon', 'f8'),       # NaN if the lines of position do not cross (less than 2 or all parallel)
+    ('sights', 'i4'),
+    ('rms', 'f8'),                      # root mean square of the remaining intercepts in nautical miles
+    ('iterations', 'i4'),
+])
+
+
+def new_sights(n):
+    """Array of n sights with the defaults: no index error, eye at sea level, lower limb, 10 degrees C, 1010 hPa."""
+    sights = np.zeros(n, dtype=SIGHT_DTYPE)
+    sights['limb'] = LIMBS['lower']
+    sights['temperature'] = 10.0
+    sights['pressure'] = 1010.0
+    return sights
+
+
+def observed_altitude(hs, index_error=0.0, height_of_eye=0.0, hp=0.0, sd=0.0, limb=1, temperature=10.0,
+                      pressure=1010.0):
+    """Observed altitude Ho from the sextant altitude hs (arrays broadcast)."""
+    ha = hs - index_error / 60.0 - 1.76 / 60.0 * np.sqrt(height_of_eye)        # apparent altitude
+    refraction = 1.0 / np.tan(np.radians(ha + 7.31 / (ha + 4.4))) / 60.0 * (pressure / 1010.0) * (283.0 / (273.0 + temperature))
+    h = ha - refraction
+    return h + hp * np.cos(np.radians(h)) + limb * sd
+
+
+def altitude_azimuth(gha, dec, lat, lon):
+    """Computed altitude Hc, azimuth Zn (0..360) and LHA of a body at the position (arrays broadcast)."""
+    lha = np.mod(gha + lon, 360.0)
+    lat, dec, lha_rad = np.radians(lat), np.radians(dec), np.radians(lha)
+    sin_hc = np.sin(lat) * np.sin(dec) + np.cos(lat) * np.cos(dec) * np.cos(lha_rad)
+    hc = np.degrees(np.arcsin(np.clip(sin_hc, -1.0, 1.0)))
+    zn = np.mod(np.degrees(np.arctan2(-np.cos(dec) * np.sin(lha_rad),
+                                      np.cos(lat) * np.sin(dec) - np.sin(lat) * np.cos(dec) * np.cos(lha_rad))), 360.0)
+    return hc, zn, lha
+
+
+def reduce_sights(almanacs, sights):
+    """Reduces sights (array of SIGHT_DTYPE) with the almanac (Almanac) or almanacs (list, e.g. one per year) that
+    contain their times. Returns an array of REDUCTION_DTYPE. Raises ValueError for sights outside the almanacs and
+    unknown bodies, KeyError for stars not in the almanac."""
+    if isinstance(almanacs, Almanac):
+        almanacs = [almanacs]
+    jd = sights['jd_ut1']
+    covering = np.full(len(sights), -1)
+    for k, almanac in enumerate(almanacs):
+        covering[(covering < 0) & (jd >= almanac.first_jd) & (jd <= almanac.last_jd)] = k
+    if (covering < 0).any():
+        raise ValueError('Sight at Julian date {} is outside the almanacs'.format(jd[covering < 0][0]))
+
+    # GHA, declination, parallax and semidiameter: one lookup per almanac and body for all its sights
+    reduced = np.zeros(len(sights), dtype=REDUCTION_DTYPE)
+    for k, almanac in enumerate(almanacs):
+        for body in np.unique(sights['body'][covering == k]).tolist():
+            selected = (covering == k) & (sights['body'] == body)
+            if body.startswith('star:'):
+                sha, reduced['gha'][selected], reduced['dec'][selected] = almanac.star(int(body[5:]), jd[selected])
+            elif body in BODIES:
+                reduced['gha'][selected], reduced['dec'][selected] = almanac.position(body, jd[selected])
+                reduced['hp'][selected] = almanac.parallax(body, jd[selected])
+                reduced['sd'][selected] = almanac.semidiameter(body, jd[selected])
+            else:
+                raise ValueError('Unknown body {!r}, available: {}'.format(body, ', '.join(BODIES + ('star:<number>',))))
+
+    reduced['ho'] = observed_altitude(sights['hs'], sights['index_error'], sights['height_of_eye'], reduced['hp'],
+                                      reduced['sd'], sights['limb'], sights['temperature'], sights['pressure'])
+    reduced['hc'], reduced['zn'], reduced['lha'] = altitude_azimuth(reduced['gha'], reduced['dec'], sights['lat'], sights['lon'])
+    reduced['intercept'] = (reduced['ho'] - reduced['hc']) * 60.0
+    return reduced
+
+
+def fix(sights, reduced, tolerance=0.001, max_iterations=20):
+    """Positions fitting the lines of position of the sights with the same sights['fix'] best (least squares of the
+    intercepts). Starts at the mean assumed position of each fix and moves until the step is below tolerance
+    (nautical miles). All fixes are iterated together. Returns an array of FIX_DTYPE, sorted by fix number."""
+    numbers, group = np.unique(sights['fix'], return_inverse=True)
+    count = np.bincount(group, minlength=len(numbers))
+    lat = np.bincount(group, sights['lat'], len(numbers)) / count
+    lon_rad = np.radians(sights['lon'])
+    lon = np.degrees(np.arctan2(np.bincount(group, np.sin(lon_rad), len(numbers)),
+                                np.bincount(group, np.cos(lon_rad), len(numbers))))
+    active = np.ones(len(numbers), dtype=bool)
+    iterations = np.zeros(len(numbers), dtype=int)
+    for _ in range(max_iterations):
+        hc, zn, lha = altitude_azimuth(reduced['gha'], reduced['dec'], lat[group], lon[group])
+        p = (reduced['ho'] - hc) * 60.0
+        north, east = np.cos(np.radians(zn)), np.sin(np.radians(zn))
+        # Normal equations of p = north * d_north + east * d_east, per fix
+        s_nn = np.bincount(group, north * north, len(numbers))
+        s_ne = np.bincount(group, north * east, len(numbers))
+        s_ee = np.bincount(group, east * east, len(numbers))
+        s_np = np.bincount(group, north * p, len(numbers))
+        s_ep = np.bincount(group, east * p, len(numbers))
+        determinant = s_nn * s_ee - s_ne * s_ne
+        solvable = (count >= 2) & (determinant > 1e-9 * count * count)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            d_north = np.where(solvable, (s_ee * s_np - s_ne * s_ep) / determinant, np.nan)
+            d_east = np.where(solvable, (s_nn * s_ep - s_ne * s_np) / determinant, np.nan)
+        step = np.where(active, 1.0, 0.0)
+        lat = lat + step * d_north / 60.0
+        lon = np.mod(lon + step * d_east / (60.0 * np.cos(np.radians(lat))) + 180.0, 360.0) - 180.0
+        iterations += active
+        active &= np.hypot(d_north, d_east) >= tolerance
+        if not active.any():
+            break
+
+    hc, zn, lha = altitude_azimuth(reduced['gha'], reduced['dec'], lat[group], lon[group])
+    p = (reduced['ho'] - hc) * 60.0
+    fixes = np.zeros(len(numbers), dtype=FIX_DTYPE)
+    fixes['fix'] = numbers
+    fixes['lat'] = lat
+    fixes['lon'] = lon
+    fixes['sights'] = count
+    fixes['rms'] = np.sqrt(np.bincount(group, p * p, len(numbers)) / count)
+    fixes['iterations'] = iterations
+    return fixes
+
+
+def _julian_dates(times):
+    """Julian dates of ISO times (UT1), e.g. 2024-06-21T12:30:00 or 2024-06-21 12:30:00Z."""
+    times = np.array([time.strip().rstrip('Z').replace(' ', 'T') for time in times], dtype='datetime64[us]')
+    return (times - np.datetime64('1970-01-01T00:00:00')) / np.timedelta64(86400, 's') + 2440587.5
+
+
+def read_sights(f):
+    """(sights, rows) from a CSV file with a header line. Columns time (ISO, UT1) or jd, body, lat, lon, hs
+    (degrees), optional index_error (arc minutes), height_of_eye (m), limb (lower, center, upper), temperature (C),
+    pressure (hPa), fix (number). rows are the lines as dictionaries."""
+    rows = list(csv.DictReader(f))
+    sights = new_sights(len(rows))
+    if not rows:
+        return sights, rows
+    columns = rows[0].keys()
+    if 'jd' in columns:
+        sights['jd_ut1'] = [float(row['jd']) for row in rows]
+    else:
+        sights['jd_ut1'] = _julian_dates([row['time'] for row in rows])
+    sights['body'] = [row['body'].strip().lower() for row in rows]
+    for name in ('lat', 'lon', 'hs', 'index_error', 'height_of_eye', 'temperature', 'pressure', 'fix'):
+        if name in columns:      # empty cells keep the default
+            sights[name] = [float(row[name]) if row[name].strip() else default
+                            for row, default in zip(rows, sights[name].tolist())]
+    if 'limb' in columns:
+        sights['limb'] = [LIMBS[row['limb'].strip().lower() or 'lower'] for row in rows]
+    return sights, rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Reduces sights (CSV) against almanac files of novas-book.py --almanac.')
+    parser.add_argument('sights', help='CSV file with columns time, body, lat, lon, hs and optionally index_error, height_of_eye, limb, temperature, pressure, fix ("-" for standard input)')
+    parser.add_argument('--almanac', action='append', required=True, metavar='FILE', help='almanac file (.alm), may be given several times')
+    parser.add_argument('--output', '-o', metavar='FILE', help='CSV file for the sights with gha, dec, ho, hc, zn and intercept (default: standard output)')
+    parser.add_argument('--fix', action='store_true', help='print the least squares fix of the sights of every fix number')
+    args = parser.parse_args(argv)
+
+    if args.sights == '-':
+        sights, rows = read_sights(sys.stdin)
+    else:
+        with open(args.sights, newline='') as f:
+            sights, rows = read_sights(f)
+    almanacs = [Almanac(filename) for filename in args.almanac]
+    try:
+        reduced = reduce_sights(almanacs, sights)
+    except (ValueError, KeyError) as error:
+        print('Error: {}'.format(error.args[0]), file=sys.stderr)
+        sys.exit(2)
+
+    out = open(args.output, 'w', newline='') if args.output else sys.stdout
+    columns = list(rows[0].keys()) if rows else []
+    writer = csv.writer(out)
+    writer.writerow(columns + ['gha', 'dec', 'ho', 'hc', 'zn', 'intercept'])
+    for row, values in zip(rows, reduced[['gha', 'dec', 'ho', 'hc', 'zn', 'intercept']].tolist()):
+        writer.writerow([row[column] for column in columns] + ['{:.4f}'.format(value) for value in values[:5]] +
+                        ['{:.2f}'.format(values[5])])
+    if out is not sys.stdout:
+        out.close()
+
+    # Fixes after the table, on standard error if the table is on standard output
+    if args.fix:
+        report = sys.stderr if out is sys.stdout else sys.stdout
+        print('{:>5} {:>10} {:>11} {:>7} {:>8}'.format('fix', 'lat', 'lon', 'sights', 'rms nm'), file=report)
+        for number, lat, lon, count, rms, iterations in fix(sights, reduced).tolist():
+            print('{:5d} {:10.4f} {:11.4f} {:7d} {:8.2f}'.format(number, lat, lon, count, rms), file=report)
+    for almanac in almanacs:
+        almanac.close()
+
+
+if __name__ == '__main__':
+    main()
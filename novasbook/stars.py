@@ -0,0 +1,144 @@
+"""Fixed stars of the day pages.
+
+Even and odd pages show different sets of 25 stars. The positions of all
+stars of a year are reduced together with star_places.StarCatalogue, one
+vectorized pass for the even and one for the odd pages.
+
+  >>> from novasbook import stars
+  >>> positions = stars.calculate_star_positions(jd_tt, page_is_even=1, year=2024)
+"""
+import numpy
+
+from novas import compat as novas
+
+from . import calculation
+from .calculation import calculate_delta_TT_UT1
+from .ephemeris_data import STARS_DTYPE
+from .star_places import StarCatalogue
+
+# It is not easy to find data for all stars from the same catalog. Wikipedia entries use different catalogs for the entries. Most important
+# is that coordinats are referenced for Epoch J2000 and Equinox J2000.0 (ICRS). 
+# Entries for catalog and catalog number are left empty.
+# tuple for stars: (no_in_Nautisches_Jahrbuch, novas-entry)
+stars_even_page = [
+    #                                                                                                     motion       motion     parallax radial velocity
+    #                               Name                            Cat  No     Ra[h]        Dec[deg]    Ra[mas/a]   Dec [mas/a]    [mas]    [km/s]
+    (1,  novas.make_cat_entry ("Alpha Andromedae (Alpheratz)    ", "", 0,   0.139794444,  +29.09044444,   +135.68,    -162.95,      33.62,  -10.6)),
+    (3,  novas.make_cat_entry ("Alpha Phoenicis                 ", "", 0,   0.438069833,  -42.30598719,   +233.05,    -356.3,       38.5,   +74.6)),
+    (4,  novas.make_cat_entry ("Alpha Cassiopeiae (Schedir)     ", "", 0,   0.675122527,  +56.53733111,   +50.88,     -32.13,       14.29,  -4.31)),
+    (5,  novas.make_cat_entry ("Beta Ceti (Deneb Kaitos)        ", "", 0,   0.726491916,  -17.98660631,   +232.55,    +31.99,       33.86,  +12.9)),
+    (8,  novas.make_cat_entry ("Alpha Eridani (Achernar)        ", "", 0,   1.628568189,  -57.23675281,   +87.00,     -38.24,       23.39,  +16.0)),
+    (11, novas.make_cat_entry ("Alpha Arietis (Hamal)           ", "", 0,   2.119557139,  +23.46241756,   +188.55,    -148.08,      49.56,  +14.2)),
+    (12, novas.make_cat_entry ("Alpha Ceti (Menkar)             ", "", 0,   3.037991667,  +4.08975,       -10.41,     -76.85,       13.09,  -26.08)),
+    (14, novas.make_cat_entry ("Alpha Persei (Mirfak)           ", "", 0,   3.405380556,  +49.86119444,   +23.75,     -26.23,       6.44,   -2.0)),
+    (16, novas.make_cat_entry ("Alpha Tauri (Aldebaran)         ", "", 0,   4.598677778,  +16.50930556,   +63.45,     -188.94,      48.94,  +54.2)),
+    (17, novas.make_cat_entry ("Beta Orionis (Rigel)            ", "", 0,   5.242305556,  -8.203611111,   +1.87,      -0.56,        3.2352, +25.0)),
+    (18, novas.make_cat_entry ("Alpha Aurigae (Capella)         ", "", 0,   5.278152778,  +45.998,        +75.52,     -427.11,      76.2,   +29.9)),
+    (19, novas.make_cat_entry ("Gamma Orionis (Bellatrix)       ", "", 0,   5.41885,      +6.349694444,   -8.11,      -12.88,       12.92,  +18.2)),
+    (24, novas.make_cat_entry ("Alpha Orionis (Beteigeuze)      ", "", 0,   5.919530556,  +7.407055556,   +27.54,     +11.30,       5.95,   +21.9)),
+    (27, novas.make_cat_entry ("Alpha Carinae (Canopus)         ", "", 0,   6.399197222,  -52.69566667,   +19.93,     +23.24,       10.55,  +20.3)),
+    (29, novas.make_cat_entry ("Alpha Canis Majoris (Sirius)    ", "", 0,   6.752472222,  -16.71611667,   -546.01,    -1223.07,     379.21, -5.50)),
+    (30, novas.make_cat_entry ("Epsilon Canis Majoris (Adhara)  ", "", 0,   6.977111111,  -28.97194444,   +2.63,      +2.29,        7.57,   +27.3)),
+    (33, novas.make_cat_entry ("Alpha Canis Minoris (Procyon)   ", "", 0,   7.655033194,  +5.225,         -714.59,    -1036.8,      284.56, -3.2)),
+    (34, novas.make_cat_entry ("Beta Geminorum (Pollux)         ", "", 0,   7.755263853,  +28.02619889,   -626.55,    -45.8,        96.54,  +3.23)),
+    (35, novas.make_cat_entry ("Epsilon Carinae (Avior)         ", "", 0,   8.375277778,  -59.50944444,   -25.5,      +22.1,        5.39,   +11.6)),
+    (36, novas.make_cat_entry ("Lambda Verlorum (Alsuhail)      ", "", 0,   9.133266667,  -43.43258333,   -24.01,     +13.52,       5.99,   +17.6)),
+    (37, novas.make_cat_entry ("Beta Carinae (Miaplacidus)      ", "", 0,   9.219994444,  -69.71722222,   -156.47,    +108.95,      28.82,  -5.1)),
+    (38, novas.make_cat_entry ("Alpha Hydrae (Alphard)          ", "", 0,   9.459788889,  -8.658611111,   -15.23,     +34.37,       18.09,  -4.7)),
+    (39, novas.make_cat_entry ("Alpha Leonis (Regulus)          ", "", 0,   10.13953056,  +11.96722222,   -248.73,    +5.59,        41.13,  +5.9)),
+    (41, novas.make_cat_entry ("Alpha Ursae majoris (Dubhe)     ", "", 0,   11.06213889,  +61.75111111,   -134.11,    -34.70,       26.54,  -9.4)),
+    (42, novas.make_cat_entry ("Beta Leonis (Denebola)          ", "", 0,   11.81766111,  +14.57205556,   -497.68,    -114.76,      90.91,  -0.2))
+]
+
+stars_odd_page = [
+    #                                                                                                     motion       motion     parallax radial velocity
+    #                               Name                            Cat  No     Ra[h]        Dec[deg]    Ra[mas/a]   Dec [mas/a]    [mas]    [km/s]
+    (43, novas.make_cat_entry ("Alpha Crucis (Acrux)            ", "", 0,   12.44330556,  -63.09908333,   -35.83,     -14.86,       10.17,  -11.2)),
+    (44, novas.make_cat_entry ("Gamma Crucis (Gacrux)           ", "", 0,   12.51943333,  -57.11321333,   +28.23,     -265.08,      36.83,  +20.6)),
+    (46, novas.make_cat_entry ("Epsilon Ursae majoris (Alioth)  ", "", 0,   12.90048611,  +55.95983333,   +111.91,    -8.24,        39.51,  -12.7)),
+    (49, novas.make_cat_entry ("Alpha Virginis (Spica)          ", "", 0,   13.41988889,  -11.16133333,   -42.35,     -30.67,       13.06,  +1.0)),
+    (50, novas.make_cat_entry ("Eta Ursae majoris (Benetnasch)  ", "", 0,   13.79234444,  +49.31327778,   -121.17,    -14.91,       31.38,  -13.4)),
+    (51, novas.make_cat_entry ("Beta Centauri (Agena)           ", "", 0,   14.06372222,  -60.37305556,   -33.27,     -23.16,       8.32,   +9.59)),
+    (53, novas.make_cat_entry ("Alpha Bootis (Arcturus)         ", "", 0,   14.26101944,  +19.18241667,   -1093.39,   -2000.06,     88.83,  -5.2)),
+    (54, novas.make_cat_entry ("Alpha Centauri (Toliman)        ", "", 0,   14.66013889,  -60.833975,     -3678.19,   +481.85,      737.0,  -22.3)),
+    (56, novas.make_cat_entry ("Alpha Librae (Zubenelgenubi)    ", "", 0,   14.84797222,  -16.04166667,   -105.68,    -68.4,        43.03,  -23.47)),
+    (57, novas.make_cat_entry ("Beta Ursae minoris (Kochab)     ", "", 0,   14.84509167,  +74.1555,       -32.61,     +11.42,       24.91,  +16.9)),
+    (59, novas.make_cat_entry ("Alpha Corona Borealis (Alphecca)", "", 0,   15.57813889,  +26.71469444,   +120.27,    -89.58,       43.46,  +1.7)),
+    (61, novas.make_cat_entry ("Alpha Scorpii (Antares)         ", "", 0,   16.49012806,  -26.43200278,   -10.16,     -23.21,       5.4,    -3.4)),
+    (62, novas.make_cat_entry ("Alpha Trinanguli australis (Atria)", "", 0, 16.81108333,  -69.02772222,   +17.99,     -31.58,       8.35,   -3.0)),
+    (64, novas.make_cat_entry ("Lambda Scorpii (Shaula)         ", "", 0,   17.56013889,  -37.10388889,   -8.53,      -30.80,       5.71,   -3.0)),
+    (65, novas.make_cat_entry ("Alpha Ophiuchi (Ras Alhague)    ", "", 0,   17.58224167,  +12.56002778,   +108.07,    -221.57,      67.13,  +11.7)),
+    (67, novas.make_cat_entry ("Gamma Draconis (Eltanin)        ", "", 0,   17.94344444,  +51.48888889,   -8.48,      -22.79,       21.14,  -28.0)),
+    (68, novas.make_cat_entry ("Epsilon Sagitarii (Kau Australis)", "", 0,  18.40286111,  -34.38472222,   -39.42,     -124.2,       22.76,  -15.0)),
+    (69, novas.make_cat_entry ("Alpha Lyrae (Wega)              ", "", 0,   18.61565,     +38.78369444,   +200.94,    +286.23,      130.23, -20.6)),
+    (71, novas.make_cat_entry ("Alpha Aquilae (Atair)           ", "", 0,   19.84638889,  +8.868333333,   +536.23,    +385.29,      194.95, -26.6)),
+    (72, novas.make_cat_entry ("Alpha Pavonis (Peacock)         ", "", 0,   20.42746111,  -56.73508333,   +6.9,       -86.02,       18.24,  +2.0)),
+    (73, novas.make_cat_entry ("Alpha Cygni (Deneb)             ", "", 0,   20.69053194,  +45.28033889,   +1.56,      +1.55,        2.31,   -4.9)),
+    (75, novas.make_cat_entry ("Epsilon Pegasi (Enif)           ", "", 0,   21.73643333,  +9.875,         +26.92,     +0.44,        4.73,   +3.4)),
+    (76, novas.make_cat_entry ("Alpha Gruis (Al Nair)           ", "", 0,   22.13721944,  -46.96097222,   +128.0,     -148.0,       32.16,  +11.8)),
+    (78, novas.make_cat_entry ("Alpha Piscis autralis (Formalhaut)", "", 0, 22.96084722,  -29.62225,      +328.95,    -164.67,      129.81, +6.5)),
+    (80, novas.make_cat_entry ("Alpha Pegasi (Markab)           ", "", 0,   23.07936111,  +15.20527778,   +60.4,      -41.3,        24.46,  -2.7))
+]
+
+# List of (no_in_Nautisches_Jahrbuch, novas-entry) for even or odd pages
+def stars_of_page (page_is_even):
+    return stars_even_page if page_is_even == 1 else stars_odd_page
+
+# Page parity and position in the list of the page for a star number of the Nautisches Jahrbuch.
+# Raises KeyError for unknown numbers.
+def find_star (star_no):
+    for page_is_even in (1, 0):
+        for n, (no, star) in enumerate(stars_of_page (page_is_even)):
+            if no == star_no:
+                return page_is_even, n
+    raise KeyError('Unknown star number {}'.format(star_no))
+
+# Star catalogues of the even and odd pages, prepared once per year (positions propagated to the middle of the year),
+# NOVAS accuracy and process. Key: (page_is_even, year, accuracy)
+star_catalogues = {}
+
+def star_catalogue (page_is_even, year, accuracy=None):
+    if accuracy is None:
+        accuracy = calculation.novas_accuracy
+    key = (page_is_even, year, accuracy)
+    if key not in star_catalogues:
+        stars = stars_of_page (page_is_even)
+        star_catalogues[key] = StarCatalogue([star for (star_no, star) in stars], epoch=novas.julian_date(year, 7, 1, 0.0),
+                                             accuracy=accuracy)
+    return star_catalogues[key]
+
+# Calculates apparent positions of all 25 stars of even or odd pages for the given julian date(s). Returns a record of
+# type ephemeris_data.STARS_DTYPE for every date, all dates and stars are reduced in one vectorized pass. accuracy is
+# the NOVAS accuracy, calculation.novas_accuracy if None.
+def calculate_star_positions (jd_tt, page_is_even, year, accuracy=None):
+    stars = stars_of_page (page_is_even)
+    ra, dec = star_catalogue(page_is_even, year, accuracy).apparent_places(jd_tt)
+    star_positions = numpy.empty(numpy.shape(jd_tt), dtype=STARS_DTYPE)
+    star_positions['jd_tt'] = jd_tt
+    star_positions['number'] = [star_no for (star_no, star) in stars]
+    star_positions['sha'] = 360.0 - (ra * 360.0 / 24.0)  # Calculate sidereal hour angle (SHA) from right ascension and convert from hours to degrees.
+    star_positions['dec'] = dec
+    return star_positions
+
+# Calculate Julian Date for stars. The star-data changes slowly and is always used for two day in the final tables.
+# Therefore the time is chosen to be in the middle of such a 2-day-period.
+# DIRTY: Just added 23.5 h the Gregorian date. (delta_TT <= 24.0 h)
+def star_epoch (year, month, day, page_is_even):
+    delta_TT_UT1 = calculate_delta_TT_UT1 (year, month, day)[0]
+    if page_is_even == 1:
+        return novas.julian_date(year, month, day, delta_TT_UT1 + 23.5)
+    else:
+        return novas.julian_date(year, month, day, delta_TT_UT1)
+
+# Star positions for a list of pages (year, month, day, page_is_even). The pages of the same year and parity are
+# calculated together, so the reduction of all pages needs two passes per year.
+def calculate_stars_pages (pages):
+    groups = {}
+    for n, (year, month, day, page_is_even) in enumerate(pages):
+        groups.setdefault((page_is_even, year), []).append(n)
+    star_positions = [None] * len(pages)
+    for (page_is_even, year), selected in groups.items():
+        jd_tt = numpy.array([star_epoch(*pages[n]) for n in selected])
+        for n, positions in zip(selected, calculate_star_positions(jd_tt, page_is_even, year)):
+            star_positions[n] = positions
+    return star_positions
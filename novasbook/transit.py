@@ -0,0 +1,65 @@
+"""Find meridian transits (upper culminations at Greenwich) from hourly samples
+of the Greenwich hour angle (GHA).
+
+The GHA of every body grows by roughly 15 degrees per hour and wraps from 360
+to 0 degrees at the transit. The hourly samples, which are calculated for the
+tables anyway, bracket every transit of the day. Within a bracket the GHA is
+almost linear in time, so a safeguarded secant step (Illinois variant of
+regula falsi) converges in two or three evaluations.
+
+  >>> find_transits([350.0, 5.0], lambda hour: 350.0 + 15.0 * hour - 360.0 * (hour > 2.0 / 3.0))
+  [0.6666666666666666]
+"""
+
+__all__ = ['find_transits']
+
+
+def find_transits(gha_hourly, gha_at, tolerance=1.0 / 3600.0, max_iterations=20):
+    """Returns the list of transit times in hours after the first sample.
+
+    gha_hourly: GHA in degrees at hours 0, 1, ..., n (n+1 samples, i.e. 25 for one day)
+    gha_at:     function returning the GHA in degrees for a time in hours
+    tolerance:  accuracy of the transit time in hours (default: 1 s)
+
+    A day can have no transit (the moon's transits are about 24 h 50 min apart)
+    or, for bodies moving faster than the sun, more than one. Transits exactly
+    at the last sample belong to the next day.
+    """
+    transits = []
+    for hour in range(len(gha_hourly) - 1):
+        if gha_hourly[hour] > gha_hourly[hour + 1]:   # GHA wrapped from 360 to 0 within this hour
+            transit = _find_root(gha_at, hour, gha_hourly[hour] - 360.0, hour + 1, gha_hourly[hour + 1],
+                                 tolerance, max_iterations)
+            if transit < len(gha_hourly) - 1:
+                transits.append(transit)
+    return transits
+
+
+def _find_root(gha_at, left, f_left, right, f_right, tolerance, max_iterations):
+    """Root of GHA(t) - 360 between left (f_left < 0) and right (f_right >= 0)."""
+    side = 0
+    transit = left
+    for _ in range(max_iterations):
+        transit_last = transit
+        transit = (left * f_right - right * f_left) / (f_right - f_left)
+        if abs(transit - transit_last) < tolerance or right - left < tolerance:
+            break
+        f = _unwrap(gha_at(transit))
+        if f < 0.0:
+            left, f_left = transit, f
+            if side == -1:      # same side twice: halve the other end's value (Illinois)
+                f_right /= 2.0
+            side = -1
+        else:
+            right, f_right = transit, f
+            if side == 1:
+                f_left /= 2.0
+            side = 1
+    return transit
+
+
+def _unwrap(gha):
+    """GHA - 360 before the transit, GHA after it: continuous across the bracket."""
+    if gha > 180.0:
+        return gha - 360.0
+    return gha
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def ephemeris():
+    """The module globals of calculation with the JPL ephemeris opened. Skips the test if EPHEMERIS_FILE is not set."""
+    if not os.path.isfile(os.environ.get('EPHEMERIS_FILE', '')):
+        pytest.skip('EPHEMERIS_FILE is not set')
+    from novasbook import calculation
+    calculation.open_ephemeris()
+    calculation.configure_ephemerides(1e-6, True, calculation.ACCURACIES['full'])
+    return calculation
@@ -0,0 +1,47 @@
+import pytest
+
+from novasbook import angle_format
+from novasbook.calculation import calculate_avg_differences
+from novasbook.formatting import decimal2dm_360, decimal2dm_NS, decimal2hm, decimal2m, decimal2min
+
+
+def test_minutes_rounding_to_60_carry_to_the_degrees():
+    assert decimal2dm_360(10.0 + 59.95 / 60.0) == ('011', '00,0')
+    assert decimal2dm_NS(10.0 + 59.96 / 60.0) == ('11', '00,0 N')
+    assert decimal2dm_NS(-(10.0 + 59.96 / 60.0)) == ('11', '00,0 S')
+    assert decimal2dm_360(10.0 + 59.94 / 60.0) == ('010', '59,9')
+
+
+def test_full_circle_wraps_to_zero():
+    assert decimal2dm_360(359.0 + 59.96 / 60.0) == ('000', '00,0')
+    with pytest.raises(NameError):
+        decimal2dm_360(-0.1)
+
+
+def test_minutes_only():
+    # format_m has no degrees to carry into: 59.95' are printed as 60,0'
+    assert decimal2m(59.95 / 60.0) == '60,0'
+    assert decimal2m(-59.96 / 60.0) == '-60,0'
+    assert decimal2m(-0.0004 / 60.0) == '0,0'          # no '-0,0'
+    assert decimal2min(-0.25) == '-15,0'
+
+
+def test_hours_and_minutes_carry():
+    assert decimal2hm(11.0 + 59.6 / 60.0) == ('12', '00')
+    assert decimal2hm(11.0 + 59.4 / 60.0) == ('11', '59')
+
+
+def test_batch_equals_single_values():
+    angles = [0.0, 12.5, 10.0 + 59.95 / 60.0, 359.9999]
+    degrees, minutes = angle_format.format_dm_360(angles, ',')
+    assert list(zip(degrees, minutes)) == [decimal2dm_360(angle) for angle in angles]
+    assert angle_format.format_dm_360([], ',') == ([], [])
+
+
+def test_hourly_difference_across_360():
+    # GHA from 359.5 to 0.54 degrees in 24 h: 1.04 degrees beyond the full turn. The first versions subtracted
+    # without wrapping and printed -897,4'.
+    d_gha, d_dec = calculate_avg_differences(359.5, 0.54, 10.0, 10.0)
+    assert decimal2m(d_gha) == '2,6'
+    assert decimal2m(calculate_avg_differences(0.54, 359.5, 10.0, 10.0)[0]) == '-2,6'
+    assert d_dec == 0.0
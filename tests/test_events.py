@@ -0,0 +1,65 @@
+import math
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from novasbook import formatting
+from novasbook.ephemeris_data import LATITUDES, MOON_EVENTS, SUN_EVENTS
+from novasbook.events import altitude, find_events
+
+
+def hourly(gha_start, gha_rate, dec, hours=24):
+    """GHA and declination at hours 0..hours of a body moving by gha_rate degrees per hour."""
+    hour = np.arange(hours + 1)
+    return np.mod(gha_start + gha_rate * hour, 360.0), np.full(hours + 1, float(dec))
+
+
+def test_rising_and_setting_on_the_equator():
+    gha, dec = hourly(180.0, 15.0, 0.0)                 # rises at 6:00, sets at 18:00
+    times = find_events(gha, dec, [0.0], [0.0, 0.0], [True, False])
+    assert times[0] == pytest.approx([6.0, 18.0], abs=1.0 / 3600.0)
+
+
+def test_only_the_first_event_of_a_day():
+    # GHA faster than 15 degrees per hour: the body rises twice in 24 hours
+    gha, dec = hourly(260.0, 16.0, 0.0)                 # rises at 0:37:30 and 23:07:30
+    rising = [hour for hour in range(24) if altitude(gha[hour], 0.0, 0.0) < 0.0 <= altitude(gha[hour + 1], 0.0, 0.0)]
+    assert len(rising) == 2
+    times = find_events(gha, dec, [0.0], [0.0], [True])
+    assert times[0, 0] == pytest.approx(10.0 / 16.0, abs=1.0 / 3600.0)
+
+
+def test_no_event():
+    # Polar night at 70 N and a body rising just after 24:00
+    gha, dec = hourly(180.0, 15.0, -23.0)
+    assert np.isnan(find_events(gha, dec, [70.0], [-50.0 / 60.0], [True])[0, 0])
+    gha, dec = hourly(279.1, 14.5, 0.0)                 # rises at 0:12 on the next day
+    assert np.isnan(find_events(gha, dec, [0.0], [0.0], [True])[0, 0])
+
+
+def test_table_shows_missing_events():
+    sun_events = np.full((len(LATITUDES), len(SUN_EVENTS)), 6.5)
+    moon_events = np.full((len(LATITUDES), len(MOON_EVENTS)), 12.25)
+    moon_events[LATITUDES.index(0), 0] = math.nan
+    table = formatting.format_events({'sun_events': sun_events, 'moon_events': moon_events})
+    moonrise = table['moon'][0][1]
+    assert moonrise[LATITUDES.index(0)] == '--:--'
+    assert moonrise[LATITUDES.index(10)] == '12:15'
+    assert table['sun'][0][1] == ['06:30'] * len(LATITUDES)
+
+
+def test_a_day_without_moonrise_every_month(ephemeris):
+    # The moon rises about 50 minutes later every day, so once in a lunation a day has no moonrise
+    n_equator = LATITUDES.index(0)
+    days = [date(2024, 1, 1) + timedelta(days=n) for n in range(31)]
+    moonrises = []
+    for day in days:
+        results = ephemeris.calculate_ephemerides_day(day.year, day.month, day.day,
+                                                      ephemeris.calculate_delta_TT_UT1(day.year, day.month, day.day),
+                                                      ephemeris.current_source())
+        moonrises.append(float(results['moon_events'][n_equator, 0]))
+    missing = [n for n, time in enumerate(moonrises) if math.isnan(time)]
+    assert len(missing) == 1
+    n = missing[0]
+    assert moonrises[n - 1] > 23.0 and moonrises[n + 1] < 1.0
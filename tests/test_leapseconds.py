@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from novasbook import leapseconds
+
+
+def test_utc_boundary_2017():
+    assert leapseconds.dTAI_UTC_from_utc(datetime(2016, 12, 31, 23, 59, 59)) == timedelta(seconds=36)
+    assert leapseconds.dTAI_UTC_from_utc(datetime(2017, 1, 1)) == timedelta(seconds=37)
+
+
+def test_tai_boundary_2017():
+    # 2016-12-31 23:59:60 UTC is 2017-01-01 00:00:36 TAI
+    assert leapseconds.dTAI_UTC_from_tai(datetime(2017, 1, 1, 0, 0, 35)) == timedelta(seconds=36)
+    assert leapseconds.dTAI_UTC_from_tai(datetime(2017, 1, 1, 0, 0, 37)) == timedelta(seconds=37)
+    assert leapseconds.tai_to_utc(datetime(2017, 1, 1, 0, 0, 37)) == datetime(2017, 1, 1)
+    assert leapseconds.utc_to_tai(datetime(2016, 12, 31, 23, 59, 59)) == datetime(2017, 1, 1, 0, 0, 35)
+
+
+def test_arrays_match_scalar_lookup():
+    times = [datetime(1972, 1, 1), datetime(2016, 12, 31, 23, 59, 59), datetime(2017, 1, 1), datetime(2024, 6, 1)]
+    seconds = leapseconds.dTAI_UTC_seconds_from_utc_array(times)
+    assert seconds.tolist() == [10, 36, 37, 37]
+    assert seconds.tolist() == [leapseconds.dTAI_UTC_from_utc(time).seconds for time in times]
+    tai = np.array(['2017-01-01T00:00:35', '2017-01-01T00:00:37'], dtype='datetime64[us]')
+    assert leapseconds.dTAI_UTC_seconds_from_tai_array(tai).tolist() == [36, 37]
+
+
+def test_fallback_list_agrees():
+    index = leapseconds.LeapSecondIndex.from_leapseconds(leapseconds._fallback())
+    assert index.dTAI_UTC_from_utc(datetime(2017, 1, 1)) == timedelta(seconds=37)
+    assert index.dTAI_UTC_seconds_from_utc_array([datetime(2016, 12, 31)]).tolist() == [36]
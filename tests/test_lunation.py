@@ -0,0 +1,22 @@
+from datetime import datetime
+
+import pytest
+
+from novasbook.lunation import PHASE_NAMES
+
+
+def julian_date(time):
+    return (time - datetime(2000, 1, 1, 12)).total_seconds() / 86400.0 + 2451545.0
+
+
+def test_new_moon_2024_01_11(ephemeris):
+    # New moon 2024-01-11 11:57 UT, TT-UT1 69.2 s
+    jd_tt, phase = ephemeris.lunations.phases(julian_date(datetime(2024, 1, 10)), julian_date(datetime(2024, 1, 13)))
+    assert [PHASE_NAMES[p] for p in phase] == ['new moon']
+    assert jd_tt[0] == pytest.approx(julian_date(datetime(2024, 1, 11, 11, 57)) + 69.2 / 86400.0, abs=60.0 / 86400.0)
+
+
+def test_age_of_the_moon(ephemeris):
+    new_moon = julian_date(datetime(2024, 1, 11, 11, 58))
+    assert ephemeris.lunations.age(new_moon + 10.0) == pytest.approx(10.0, abs=0.01)
+    assert ephemeris.lunations.age(new_moon - 1.0) == pytest.approx(28.5, abs=0.1)
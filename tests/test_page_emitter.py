@@ -0,0 +1,36 @@
+from datetime import date
+
+import pytest
+
+from novasbook import formatting, rendering
+from novasbook.page_emitter import PageEmitter
+
+
+def test_emitter_equals_jinja_for_a_simple_template():
+    template = rendering.environment().from_string('T (((t.a))) / (((t.b)))\n### for x in xs\n(((x))),\n### endfor\n')
+    emitter = PageEmitter(template)
+    for variables in ({'t': {'a': '00:02', 'b': '23:58'}, 'xs': [1, 2]}, {'t': {'a': '--:--', 'b': ''}, 'xs': [3, 4]}):
+        assert emitter.render(variables) == template.render(**variables)
+    assert len(emitter.compiled) == 1
+
+
+def test_template_computing_with_values_falls_back_to_jinja():
+    template = rendering.environment().from_string('(((value + 1)))')
+    emitter = PageEmitter(template)
+    assert emitter.render({'value': 1}) == '2'
+    assert emitter.compiled == {(None, None, 'value'): None}
+
+
+@pytest.mark.parametrize('event_tables', [False, True])
+def test_every_page_of_a_year_equals_jinja(ephemeris, monkeypatch, event_tables):
+    # The compiled form is checked against Jinja once per shape, this checks all pages of a year
+    monkeypatch.setattr(formatting, 'event_tables', event_tables)
+    template = rendering.environment().get_template('NJ_tableEphDay.jinja.tex')
+    emitter = PageEmitter(template)
+    pages = 0
+    for page, day_results, star_positions in ephemeris.iter_pages(date(2024, 1, 1), date(2024, 12, 31)):
+        variables = formatting.format_page(date(*page[:3]), page, day_results, star_positions)
+        assert emitter.render(variables) == template.render(**variables), page
+        pages += 1
+    assert pages == 366
+    assert None not in emitter.compiled.values()
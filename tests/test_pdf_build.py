@@ -0,0 +1,78 @@
+import json
+import os
+import shutil
+import warnings
+
+import pytest
+
+from novasbook import pdf_build
+from novasbook.pdf_build import ChunkWriter, build_pdf
+
+DAYS = [(2023, 12, 30, 0), (2023, 12, 31, 1), (2024, 1, 1, 0)]     # on pages 3, 4 and 5 after two front pages
+
+
+def write_chunks(directory, front='Titel\n\\newpage\nEinleitung\n'):
+    """Small book: front matter and the day pages of two months, one page each."""
+    chunks = ChunkWriter(str(directory))
+    chunks.begin('\\documentclass[twoside]{article}\n\\begin{document}\n' + front, '\\end{document}')
+    for page in DAYS:
+        chunks.add(page, 'Tag {2}.{1}.{0}\n\\newpage\n'.format(*page))
+    chunks.close()
+    return chunks
+
+
+def test_chunks(tmp_path):
+    chunks = write_chunks(tmp_path)
+    assert chunks.names == ['front', '2023-12', '2024-01']
+    assert chunks.even == {'2023-12': 0, '2024-01': 0}
+    with open(os.path.join(str(tmp_path), '2023-12.tex')) as f:
+        text = f.read()
+    assert text.startswith('\\documentclass[twoside]{article}\n\\providecommand{\\chunkstart}{1}\n\\begin{document}\n'
+                           '\\setcounter{page}{\\chunkstart}\n')
+    assert 'Tag 30.12.2023' in text and 'Tag 31.12.2023' in text and 'Tag 1.1.2024' not in text
+
+
+def test_shipped_page_numbers():
+    output = ('(./2023-12.tex (/usr/share/texlive/texmf-dist/tex/latex/base/article.cls\n'
+              'Document Class: article 2021/10/04 v1.4n Standard LaTeX document class\n)'
+              ' [3{/var/lib/texmf/fonts/map/pdftex/updmap/pdftex.map}] [4] (./2023-12.aux) )'
+              '</usr/share/texlive/texmf-dist/fonts/type1/public/amsfonts/cm/cmr10.pfb>\n'
+              'Output written on 2023-12.pdf (2 pages, 15311 bytes).\n')
+    assert pdf_build._SHIPPED_RE.findall(output) == ['3', '4']
+    assert pdf_build._ranges([3, 4, 5, 7]) == '3-5, 7'
+
+
+@pytest.mark.skipif(shutil.which('pdflatex') is None, reason='pdflatex is not installed')
+def test_build_pdf(tmp_path):
+    chunks = write_chunks(tmp_path)
+    pdf_file = os.path.join(str(tmp_path), 'book.pdf')
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert build_pdf(chunks.directory, chunks.names, pdf_file, jobs=2, even=chunks.even) == (3, 0)
+    with open(os.path.join(chunks.directory, 'build.json')) as f:
+        manifest = json.load(f)
+    assert [(manifest[name]['start'], manifest[name]['pages']) for name in chunks.names] == [(1, 2), (3, 2), (5, 1)]
+    assert os.path.getsize(pdf_file) > 0
+    # Nothing changed: nothing to typeset
+    assert build_pdf(chunks.directory, chunks.names, pdf_file, even=chunks.even) == (0, 3)
+
+
+@pytest.mark.skipif(shutil.which('pdflatex') is None, reason='pdflatex is not installed')
+def test_build_pdf_moves_the_months_after_a_longer_front(tmp_path):
+    chunks = write_chunks(tmp_path)
+    build_pdf(chunks.directory, chunks.names, os.path.join(str(tmp_path), 'book.pdf'))
+    chunks = write_chunks(tmp_path, front='Titel\n\\newpage\nEinleitung\n\\newpage\nInhalt\n')
+    with pytest.warns(RuntimeWarning, match='laid out for an odd page'):
+        assert build_pdf(chunks.directory, chunks.names, os.path.join(str(tmp_path), 'book.pdf'),
+                         even=chunks.even) == (3, 0)
+    with open(os.path.join(chunks.directory, 'build.json')) as f:
+        manifest = json.load(f)
+    assert [manifest[name]['start'] for name in chunks.names] == [1, 4, 6]
+
+
+def test_pdf_needs_experimental(capsys):
+    from novasbook import cli
+    with pytest.raises(SystemExit) as exit:
+        cli.main(['2024', '--pdf'])
+    assert exit.value.code == 2
+    assert '--experimental' in capsys.readouterr().out
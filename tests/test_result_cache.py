@@ -0,0 +1,21 @@
+from novasbook import result_cache
+from novasbook.result_cache import ResultCache, make_key
+
+
+def test_put_and_get(tmp_path):
+    cache = ResultCache(str(tmp_path / 'results.sqlite'), commit_every=2)
+    key = make_key('day', (2024, 1, 1), [69.2])
+    assert cache.get(key) is None
+    cache.put(key, {'gha': 1.5})
+    assert cache.get(key) == {'gha': 1.5}
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.close()
+    assert ResultCache(str(tmp_path / 'results.sqlite')).contains(key)
+
+
+def test_keys_depend_on_the_calculation_source(monkeypatch):
+    key = make_key('day', (2024, 1, 1), [69.2])
+    assert make_key('day', (2024, 1, 1), [69.2]) == key
+    assert make_key('day', (2024, 1, 2), [69.2]) != key
+    monkeypatch.setattr(result_cache, '_calculation_identity', 'changed calculation')
+    assert make_key('day', (2024, 1, 1), [69.2]) != key
@@ -0,0 +1,67 @@
+import asyncio
+import json
+import time
+
+from novasbook.server import QueryServer
+
+
+class SlowEngine(object):
+    """Stands in for QueryEngine: every position takes `seconds`."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def positions(self, queries):
+        time.sleep(self.seconds)
+        return [{'body': body, 'gha': 0.0, 'dec': 0.0} for body, when in queries]
+
+    def bodies(self):
+        return {'bodies': ['sun'], 'stars': []}
+
+
+async def get(port, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write('GET {} HTTP/1.1\r\nConnection: close\r\n\r\n'.format(path).encode('latin-1'))
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(body)
+
+
+def run_server(server, client):
+    async def main():
+        tcp_server = await asyncio.start_server(server.handle_connection, '127.0.0.1', 0)
+        async with tcp_server:
+            return await client(tcp_server.sockets[0].getsockname()[1])
+    return asyncio.run(main())
+
+
+def test_metrics_count_unknown_paths_together():
+    server = QueryServer(SlowEngine(0.0))
+
+    async def client(port):
+        statuses = [(await get(port, path))[0] for path in ('/a', '/b?x=1', '/c/d', '/bodies')]
+        return statuses, (await get(port, '/metrics'))[1]
+
+    statuses, metrics = run_server(server, client)
+    assert statuses == [404, 404, 404, 200]
+    assert set(metrics['endpoints']) == {'unknown', '/bodies'}
+    assert metrics['endpoints']['unknown']['requests'] == 3
+    assert metrics['endpoints']['unknown']['errors'] == 3
+
+
+def test_slow_query_does_not_block_other_connections():
+    server = QueryServer(SlowEngine(1.0))
+
+    async def client(port):
+        query = asyncio.ensure_future(get(port, '/position?body=sun&jd=2460310.5'))
+        await asyncio.sleep(0.1)
+        start = time.perf_counter()
+        status, metrics = await get(port, '/metrics')
+        waited = time.perf_counter() - start
+        return (await query), status, waited
+
+    (status, position), metrics_status, waited = run_server(server, client)
+    assert (status, position['body'], metrics_status) == (200, 'sun', 200)
+    assert waited < 0.5
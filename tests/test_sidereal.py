@@ -0,0 +1,14 @@
+import numpy as np
+
+from novasbook import sidereal
+
+
+def test_gast_against_novas():
+    jd_ut1 = 2460310.5 + np.linspace(0.0, 366.0, 40)
+    for accuracy in (0, 1):
+        assert sidereal.check_against_novas(jd_ut1, 69.2, accuracy) * 3600.0 < 1e-3
+
+
+def test_hour_angle_wraps():
+    assert sidereal.hour_angle(10.0, 23.0) == 25.0
+    assert sidereal.hour_angle(350.0, 0.0) == 350.0
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from novasbook.sight_reduction import REDUCTION_DTYPE, altitude_azimuth, fix, new_sights
+
+
+def sights_at(lat, lon, bodies, assumed, fix_number=0):
+    """Sights of bodies (GHA, declination) without errors, as observed at lat, lon, from the assumed position."""
+    sights = new_sights(len(bodies))
+    sights['lat'], sights['lon'] = assumed
+    sights['fix'] = fix_number
+    reduced = np.zeros(len(bodies), dtype=REDUCTION_DTYPE)
+    reduced['gha'], reduced['dec'] = np.array(bodies).T
+    reduced['ho'], zn, lha = altitude_azimuth(reduced['gha'], reduced['dec'], lat, lon)
+    return sights, reduced
+
+
+def test_fix_from_two_sights():
+    sights, reduced = sights_at(50.0, -20.0, [(30.0, 20.0), (60.0, -10.0)], (50.5, -19.3))
+    fixes = fix(sights, reduced)
+    assert len(fixes) == 1
+    assert fixes['lat'][0] == pytest.approx(50.0, abs=1e-4)
+    assert fixes['lon'][0] == pytest.approx(-20.0, abs=1e-4)
+    assert fixes['sights'][0] == 2
+    assert fixes['rms'][0] < 0.01
+
+
+def test_several_fixes_at_once():
+    first = sights_at(50.0, -20.0, [(30.0, 20.0), (60.0, -10.0), (350.0, 45.0)], (49.0, -21.0), 1)
+    second = sights_at(-33.9, 151.2, [(220.0, -50.0), (180.0, 10.0)], (-34.0, 151.0), 2)
+    sights = np.concatenate([first[0], second[0]])
+    reduced = np.concatenate([first[1], second[1]])
+    fixes = fix(sights, reduced)
+    assert fixes['fix'].tolist() == [1, 2]
+    assert fixes['lat'] == pytest.approx([50.0, -33.9], abs=1e-4)
+    assert fixes['lon'] == pytest.approx([-20.0, 151.2], abs=1e-4)
+
+
+def test_single_sight_gives_no_fix():
+    sights, reduced = sights_at(50.0, -20.0, [(30.0, 20.0)], (50.5, -19.3))
+    assert np.isnan(fix(sights, reduced)['lat'][0])
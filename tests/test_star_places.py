@@ -0,0 +1,11 @@
+import numpy as np
+import pytest
+
+from novasbook import star_places, stars
+
+
+@pytest.mark.parametrize('page_is_even, accuracy', [(True, 0), (False, 1)])
+def test_apparent_places_against_novas(ephemeris, page_is_even, accuracy):
+    catalogue = stars.star_catalogue(page_is_even, 2024, accuracy)
+    jd_tt = 2460310.5 + np.linspace(0.0, 366.0, 5)
+    assert star_places.check_against_novas(catalogue, jd_tt) < 1e-3
@@ -0,0 +1,88 @@
+import math
+
+import numpy as np
+import pytest
+
+from novasbook.formatting import format_day, format_transit
+from novasbook.transit import find_transits
+
+
+def gha_moving(start, rate):
+    """GHA in degrees of a body starting at start (hour 0) and moving by rate degrees per hour."""
+    return lambda hour: (start + rate * hour) % 360.0
+
+
+def test_one_transit():
+    gha_at = gha_moving(180.0, 15.0)
+    transits = find_transits([gha_at(hour) for hour in range(25)], gha_at)
+    assert transits == [pytest.approx(12.0, abs=1.0 / 3600.0)]
+
+
+def test_two_transits():
+    # Slightly faster than the sun: upper transit just after 0:00 and again just before 24:00
+    gha_at = gha_moving(359.5, 15.04)
+    transits = find_transits([gha_at(hour) for hour in range(25)], gha_at)
+    assert transits == [pytest.approx(0.5 / 15.04, abs=1.0 / 3600.0), pytest.approx(360.5 / 15.04, abs=1.0 / 3600.0)]
+
+
+def test_no_transit():
+    # The moon falls behind by about 50 minutes a day, some days have no upper transit
+    gha_at = gha_moving(0.5, 14.49)
+    assert find_transits([gha_at(hour) for hour in range(25)], gha_at) == []
+
+
+def test_format_transit():
+    assert format_transit([12.5, math.nan]) == '12:30'
+    assert format_transit([2.0 / 60.0, 23.0 + 58.0 / 60.0]) == '00:02 / 23:58'
+    assert format_transit([math.nan, math.nan]) == '--:--'
+
+
+def test_saturn_transits_twice_on_2024_09_08(ephemeris):
+    delta_TT_UT1 = ephemeris.calculate_delta_TT_UT1(2024, 9, 8)
+    planets, transits = format_day(ephemeris.calculate_ephemerides_day(2024, 9, 8, delta_TT_UT1, ephemeris.current_source()))
+    assert transits['saturn'] == '00:02 / 23:58'
+
+
+def exact_transit(ephemeris, year, month, day, planet, left, right):
+    """Transit between the hours left and right by bisection to a microsecond, independent of find_transits."""
+    from novas import compat as novas
+    from novasbook import sidereal
+    jd_ut1_day = novas.julian_date(year, month, day, 0.0)
+    delta_TT_UT1 = ephemeris.calculate_delta_TT_UT1(year, month, day)
+
+    def gha(hour):
+        delta = float(np.interp(hour, range(len(delta_TT_UT1)), delta_TT_UT1))
+        theta = sidereal.gast(jd_ut1_day + hour / 24.0, delta * 3600.0, 0)
+        return ephemeris.calculate_grt_planet(jd_ut1_day + (hour + delta) / 24.0, theta, planet)
+
+    while right - left > 1e-6 / 3600.0:
+        middle = (left + right) / 2.0
+        if gha(middle) > 180.0:
+            left = middle
+        else:
+            right = middle
+    return (left + right) / 2.0
+
+
+@pytest.mark.parametrize('year, month, day', [(2024, 1, 3), (2024, 3, 20), (2024, 9, 8), (2024, 12, 6)])
+def test_transits_against_bisection(ephemeris, year, month, day):
+    results = ephemeris.calculate_ephemerides_day(year, month, day, ephemeris.calculate_delta_TT_UT1(year, month, day),
+                                                  ephemeris.current_source())
+    for n_planet, (planet, planet_name) in enumerate(ephemeris.sky_objects):
+        for transit in results['transit'][n_planet]:
+            if not np.isnan(transit):
+                hour = math.floor(transit)
+                assert transit == pytest.approx(exact_transit(ephemeris, year, month, day, planet, hour, hour + 1),
+                                                abs=1.0 / 3600.0), planet_name
+
+
+def test_transit_is_rounded_to_the_nearest_minute(ephemeris):
+    # Upper transit of the moon on 2024-01-03 at 05:21:29.85 UT1. The bisection of the first versions returned the
+    # end of its last 5 s interval, 05:21:30.2, and printed 05:22.
+    moon = ephemeris.sky_objects[1][0]
+    transit = exact_transit(ephemeris, 2024, 1, 3, moon, 5.0, 6.0)
+    assert transit * 3600.0 == pytest.approx(5 * 3600 + 21 * 60 + 29.85, abs=0.05)
+    results = ephemeris.calculate_ephemerides_day(2024, 1, 3, ephemeris.calculate_delta_TT_UT1(2024, 1, 3),
+                                                  ephemeris.current_source())
+    planets, transits = format_day(results)
+    assert transits['moon'] == '05:21'